@@ -0,0 +1,117 @@
+"""
+Synthetic DSP corpus generator.
+生成用于性能测试的 DSP 文件
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from dspy_tool.dsp_codec.file import DspFile
+
+PYTHON_LINES = [
+    "robot_ctrl.set_mode(rm_define.robot_mode_free)",
+    "chassis_ctrl.move_with_distance(0, {value})",
+    "gimbal_ctrl.rotate_with_degree(rm_define.gimbal_right, {value})",
+    "led_ctrl.set_top_led(rm_define.armor_top_all, 255, {value}, 0, rm_define.effect_always_on)",
+    "time.sleep({value})",
+    "    # block comment {value}",
+    "#block {value}",
+]
+
+# "中文变量" 等中文标识符在 DSP 文件中的转义形式
+CHINESE_IDENTIFIERS = [
+    "_E4_B8_AD_E6_96_87_E5_8F_98_E9_87_8F",
+    "_E9_80_9F_E5_BA_A6",
+    "_E8_A7_92_E5_BA_A6",
+]
+
+SCRATCH_BLOCK = (
+    '<block type="robot_set_mode" id="{id}" x="{value}" y="{value}">'
+    '<field name="mode">free</field><next></next></block>'
+)
+
+# name -> (python code lines, scratch blocks, chinese identifiers)
+PROFILES = {
+    "small": (40, 0, False),
+    "medium": (2_000, 200, False),
+    "huge": (200_000, 0, False),
+    "chinese": (2_000, 0, True),
+    "scratch": (200, 50_000, False),
+}
+
+
+def make_python_code(rng: random.Random, lines: int, chinese: bool = False) -> str:
+    code = []
+    for _ in range(lines):
+        line = rng.choice(PYTHON_LINES).format(value=rng.randint(0, 360))
+        if chinese and rng.random() < 0.3:
+            line = f"{rng.choice(CHINESE_IDENTIFIERS)} = {rng.randint(0, 100)}"
+        code.append(line)
+    return "\n".join(code)
+
+
+def make_scratch_description(rng: random.Random, blocks: int) -> str:
+    if not blocks:
+        return ""
+    return (
+        "<xml>"
+        + "".join(
+            SCRATCH_BLOCK.format(id=f"{rng.getrandbits(64):016x}", value=rng.randint(0, 999))
+            for _ in range(blocks)
+        )
+        + "</xml>"
+    )
+
+
+def make_dsp_file(profile: str, index: int = 0, seed: int = 0) -> DspFile:
+    """Build one DspFile of the given profile, deterministic for a seed."""
+    lines, blocks, chinese = PROFILES[profile]
+    rng = random.Random(f"{seed}-{profile}-{index}")
+    dsp_file = DspFile.new_with_python_code(
+        "bench", f"{profile} {index}", make_python_code(rng, lines, chinese)
+    )
+    dsp_file.dji.code.scratch_description = make_scratch_description(rng, blocks)
+    return dsp_file
+
+
+def generate_files(root: Path, profile: str, count: int, seed: int = 0) -> List[Path]:
+    """Write ``count`` files of ``profile`` into ``root``."""
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        file_name = f"{profile}_{index:05d}.dsp"
+        make_dsp_file(profile, index, seed).save(str(root), file_name)
+        paths.append(root / file_name)
+    return paths
+
+
+def generate_tree(
+    root: Path, depth: int, fanout: int, files_per_dir: int, seed: int = 0
+) -> List[Path]:
+    """Write a directory tree of small files, ``fanout`` sub directories per level."""
+    paths = []
+    directories = [root]
+    for level in range(depth + 1):
+        next_directories = []
+        for number, directory in enumerate(directories):
+            directory.mkdir(parents=True, exist_ok=True)
+            for index in range(files_per_dir):
+                file_name = f"tree_{level}_{number}_{index}.dsp"
+                make_dsp_file("small", index, seed).save(str(directory), file_name)
+                paths.append(directory / file_name)
+            if level < depth:
+                next_directories.extend(directory / f"d{i}" for i in range(fanout))
+        directories = next_directories
+    return paths
+
+
+def generate_corpus(root: Path, scale: float = 1.0, seed: int = 0) -> Dict[str, List[Path]]:
+    """Generate the full benchmark corpus below ``root``."""
+    counts = {"small": 200, "medium": 20, "huge": 2, "chinese": 20, "scratch": 5}
+    corpus = {
+        profile: generate_files(root / profile, profile, max(1, int(count * scale)), seed)
+        for profile, count in counts.items()
+    }
+    corpus["tree"] = generate_tree(root / "tree", 4, 3, max(1, int(2 * scale)), seed)
+    return corpus
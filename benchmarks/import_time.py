@@ -0,0 +1,105 @@
+"""
+Import-time budget check for the command line entry points.
+命令行启动耗时检查
+
+Runs each entry point under ``python -X importtime`` and fails if the total
+import time exceeds its budget, or if a module that the command does not need
+(textual, the cipher backends, multiprocessing, ...) was imported.
+
+Each command is run ``--runs`` times and the fastest run is compared with the
+budget, so a busy machine does not fail the check. ``tests/test_import_time.py``
+runs the same checks under pytest.
+
+Usage:
+    python benchmarks/import_time.py [--scale SCALE] [--runs RUNS]
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_RUNS = 5
+
+# (name, arguments for ``python -m``, budget in ms, modules that must not be imported)
+CHECKS: List[Tuple[str, List[str], float, List[str]]] = [
+    (
+        "dsp-codec --version",
+        ["dspy_tool.cli.dsp_codec", "--version"],
+        40,
+        ["Crypto", "cryptography", "xml.etree.ElementTree", "multiprocessing", "asyncio", "textual"],
+    ),
+    (
+        "dsp-fm --version",
+        ["dspy_tool.cli.file_manager", "--version"],
+        60,
+        ["Crypto", "cryptography", "textual", "pyperclip", "multiprocessing"],
+    ),
+    (
+        "dsp-fm --dsp-dirs",
+        ["dspy_tool.cli.file_manager", "--dsp-dirs"],
+        60,
+        ["Crypto", "cryptography", "textual", "pyperclip", "multiprocessing"],
+    ),
+]
+
+
+def import_times(args: List[str]) -> Dict[str, int]:
+    """Return the cumulative import time in us of each top-level import."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        times[name.rstrip()] = int(cumulative)
+    return times
+
+
+def check(command: List[str], forbidden: List[str], runs: int = DEFAULT_RUNS) -> Tuple[float, List[str]]:
+    """Return the fastest total import time in ms over ``runs`` runs, and the forbidden modules imported."""
+    best = float("inf")
+    bad: List[str] = []
+    for _ in range(runs):
+        times = import_times(command)
+        # Top-level imports are the ones without indentation.
+        best = min(best, sum(t for module, t in times.items() if not module.startswith("  ")) / 1e3)
+        imported = {module.strip() for module in times}
+        bad = [
+            f
+            for f in forbidden
+            if any(module == f or module.startswith(f + ".") for module in imported)
+        ]
+    return best, bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the CLI entry points.")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply every budget, e.g. for slow machines."
+    )
+    parser.add_argument(
+        "--runs", type=int, default=DEFAULT_RUNS, help=f"runs per command, the fastest counts. (defaults to {DEFAULT_RUNS})"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for name, command, budget, forbidden in CHECKS:
+        total, bad = check(command, forbidden, args.runs)
+        ok = total <= budget * args.scale and not bad
+        failed |= not ok
+        print(f"[{' OK ' if ok else 'FAIL'}] {name:<24} {total:7.1f} ms (budget {budget * args.scale:.0f} ms)")
+        if bad:
+            print(f"       unexpected imports: {', '.join(bad)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Benchmark suite for dspy_tool.
+性能测试
+
+Usage:
+    python benchmarks/run.py [--corpus DIR] [--scale SCALE] [--output FILE]
+                             [--compare FILE] [--only PATTERN]
+
+Results are written as JSON so that runs from different releases can be
+compared with ``--compare``.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import dspy_tool  # noqa: E402
+from corpus import generate_corpus  # noqa: E402
+from dspy_tool.cli.utils.scanner import DspScanner  # noqa: E402
+from dspy_tool.dsp_codec.file import DspFile, decrypt_cbc, verify_signatures  # noqa: E402
+from dspy_tool.dsp_codec.internal import Dji  # noqa: E402
+
+REPEAT = 5
+MIN_TIME = 0.2
+
+
+class Runner:
+    """Collect benchmark results, skipping the ones not matching ``only``."""
+
+    def __init__(self, only: Optional[str] = None):
+        self.only = only
+        self.results: List[Dict] = []
+
+    def run(
+        self,
+        name: str,
+        func: Callable[[], object],
+        size: int = 0,
+        number: Optional[int] = None,
+        repeat: int = REPEAT,
+    ):
+        if self.only and not fnmatch.fnmatch(name, self.only):
+            return
+        timer = timeit.Timer(func)
+        if number is None:
+            number, elapsed = timer.autorange()
+            if elapsed < MIN_TIME:
+                number = max(1, int(number * MIN_TIME / max(elapsed, 1e-9)))
+        times = [t / number for t in timer.repeat(repeat, number)]
+        result = {
+            "name": name,
+            "size": size,
+            "number": number,
+            "repeat": repeat,
+            "min": min(times),
+            "median": statistics.median(times),
+            "throughput": size / min(times) if size else None,
+        }
+        self.results.append(result)
+        throughput = f"{result['throughput'] / 2**20:9.1f} MiB/s" if size else ""
+        print(f"{name:<40} {result['min'] * 1e3:11.3f} ms {throughput}")
+
+
+def _uncached_signature(dsp_file: DspFile) -> str:
+    dsp_file._signature = None
+    return dsp_file.calc_signature()
+
+
+def bench_stages(runner: Runner, corpus: Dict[str, List[Path]]):
+    for profile in ("small", "medium", "huge", "chinese", "scratch"):
+        path = corpus[profile][0]
+        raw = path.read_bytes()
+        plain = DspFile.decode_dsp(raw)
+        xml_string = plain.decode()
+        dsp_file = DspFile.load(str(path))
+        dsp_file.get_python_code()
+        dsp_file.dji.code.scratch_description
+
+        runner.run(f"stage.read.{profile}", path.read_bytes, len(raw))
+        runner.run(f"stage.decode_dsp.{profile}", lambda: DspFile.decode_dsp(raw), len(raw))
+        runner.run(f"stage.encode_dsp.{profile}", lambda: DspFile.encode_dsp(plain), len(plain))
+        runner.run(f"stage.from_xml_bytes.{profile}", lambda: Dji.from_xml_bytes(plain), len(plain))
+        runner.run(
+            f"stage.from_xml_string.{profile}", lambda: Dji.from_xml_string(xml_string), len(plain)
+        )
+        runner.run(f"stage.get_xml_string.{profile}", dsp_file.dji.get_xml_string, len(plain))
+        runner.run(
+            f"stage.calc_signature.{profile}", lambda: _uncached_signature(dsp_file), len(plain)
+        )
+        runner.run(f"stage.calc_signature_cached.{profile}", dsp_file.calc_signature, len(plain))
+        runner.run(f"file.load.{profile}", lambda: DspFile.load(str(path)), len(raw))
+        runner.run(f"file.load_header.{profile}", lambda: DspFile.load_header(str(path)), len(raw))
+        runner.run(f"file.get_dsp_data.{profile}", dsp_file.get_dsp_data, len(plain))
+        runner.run(
+            f"file.verify_signatures.{profile}",
+            lambda: list(verify_signatures([str(path)])),
+            len(raw),
+        )
+
+
+def bench_parallel_decrypt(runner: Runner, size: int = 64 << 20):
+    """Scaling of the chunked AES-CBC decryption with the number of threads."""
+    cipher_text = os.urandom(size)
+    buffer = bytearray(size)
+    jobs = 1
+    while True:
+        runner.run(
+            f"decrypt.jobs_{jobs}",
+            lambda jobs=jobs: decrypt_cbc(cipher_text, buffer, jobs=jobs),
+            size,
+            number=1,
+        )
+        if jobs >= (os.cpu_count() or 1):
+            break
+        jobs = min(jobs * 2, os.cpu_count() or 1)
+
+
+def bench_scan(runner: Runner, root: Path):
+    runner.run("scan.cold", lambda: list(DspScanner().scan([root])))
+    scanner = DspScanner()
+    list(scanner.scan([root]))
+    runner.run("scan.warm", lambda: list(DspScanner(state=scanner.new_state).scan([root])))
+
+
+def _run_cli(*args: str, env: Optional[Dict[str, str]] = None):
+    subprocess.run(
+        [sys.executable, "-m", *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env=env,
+    )
+
+
+def bench_cli(runner: Runner, corpus: Dict[str, List[Path]], root: Path):
+    with tempfile.TemporaryDirectory() as output:
+        small = str(corpus["small"][0])
+        runner.run("cli.dsp_codec.version", lambda: _run_cli("dspy_tool.cli.dsp_codec", "-v"), number=1)
+        runner.run(
+            "cli.dsp_codec.decode_stdout",
+            lambda: _run_cli("dspy_tool.cli.dsp_codec", small, "-s"),
+            number=1,
+        )
+        runner.run(
+            "cli.dsp_codec.batch_decode",
+            lambda: _run_cli("dspy_tool.cli.dsp_codec", str(root / "small"), "-o", output),
+            number=1,
+            repeat=3,
+        )
+        home = Path(output, "home")
+        home.mkdir()
+        (home / ".dspy_tool.toml").write_text(
+            f'[FileManagerConfig]\ndsp_dirs = ["{(root / "tree").as_posix()}"]\n'
+        )
+        env = dict(os.environ, HOME=str(home), USERPROFILE=str(home))
+        runner.run(
+            "cli.dsp_fm.update",
+            lambda: _run_cli("dspy_tool.cli.file_manager", "-u", env=env),
+            number=1,
+            repeat=3,
+        )
+        runner.run(
+            "cli.dsp_fm.list",
+            lambda: _run_cli("dspy_tool.cli.file_manager", "-l", env=env),
+            number=1,
+        )
+
+
+def compare(results: List[Dict], baseline_file: Path):
+    baseline = {r["name"]: r for r in json.loads(baseline_file.read_text())["results"]}
+    print(f"\n{'benchmark':<40} {'baseline':>11} {'current':>11} {'ratio':>7}")
+    for result in results:
+        old = baseline.get(result["name"])
+        if old:
+            ratio = result["min"] / old["min"]
+            print(
+                f"{result['name']:<40} {old['min'] * 1e3:8.3f} ms {result['min'] * 1e3:8.3f} ms {ratio:6.2f}x"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dspy_tool benchmark suite")
+    parser.add_argument("--corpus", type=str, help="the corpus dir. (defaults to a temp dir)")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale the corpus size.")
+    parser.add_argument("--output", type=str, help="write the results to this JSON file.")
+    parser.add_argument("--compare", type=str, help="compare with a previous JSON result file.")
+    parser.add_argument("--only", type=str, help="only run benchmarks matching this glob.")
+    parser.add_argument("--no-cli", action="store_true", help="skip the end-to-end CLI benchmarks.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(args.corpus or temp_dir)
+        start = time.perf_counter()
+        corpus = generate_corpus(root, args.scale)
+        print(f"Generated corpus in {root} ({time.perf_counter() - start:.1f}s)\n")
+
+        runner = Runner(args.only)
+        bench_stages(runner, corpus)
+        bench_parallel_decrypt(runner)
+        bench_scan(runner, root)
+        if not args.no_cli:
+            bench_cli(runner, corpus, root)
+
+    report = {
+        "meta": {
+            "version": dspy_tool.__version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": args.scale,
+        },
+        "results": runner.results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(runner.results, Path(args.compare))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Write and unpack DSP bundles from the command line.
+DSP 程序包命令
+
+``dsp-codec INPUT... --bundle OUT.dspb`` encodes the inputs straight into one
+bundle, and ``dsp-codec unbundle OUT.dspb`` writes its programs back out as
+.dsp files the RoboMaster app can open.
+"""
+
+import argparse
+import io
+import os
+import sys
+from collections import deque
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from dspy_tool.cli import dsp_codec
+from dspy_tool.dsp_codec.archive import open_binary
+from dspy_tool.dsp_codec.bundle import Bundle, BundleWriter
+from dspy_tool.dsp_codec.file import DspFile
+from dspy_tool.dsp_codec.timings import stage
+
+# (name, dsp data, title, guid)
+BundleItem = Tuple[str, bytes, str, str]
+
+
+def _encode_file(input_file_path: Path, name: str, args: dict) -> BundleItem:
+    if input_file_path.suffix == ".py":
+        with stage("read") as timer, open(input_file_path, "r", encoding="utf-8") as file:
+            python_code = file.read()
+            timer.size = len(python_code)
+        dsp_file = dsp_codec.build_dsp_file(python_code, "", **args)
+        attribute = dsp_file.dji.attribute
+        return name, dsp_file.get_dsp_data(), attribute.title, attribute.guid
+    # A .dsp file is bundled as it is; reading its header also checks it.
+    with stage("read") as timer, open_binary(input_file_path) as file:
+        dsp_data = file.read()
+        timer.size = len(dsp_data)
+    attribute = DspFile.read_attribute(io.BytesIO(dsp_data))
+    return name, dsp_data, attribute.title, attribute.guid
+
+
+def _encode_bundle_item(
+    input_file_path: Path,
+    name: str,
+    args: dict,
+    timings: bool = False,
+    cache_dir: Union[Path, None] = None,
+) -> Tuple[Tuple[Path, bool, str], Optional[BundleItem], list]:
+    recorder = dsp_codec._init_worker(timings, cache_dir)
+    try:
+        if recorder is None:
+            item = _encode_file(input_file_path, name, args)
+        else:
+            with recorder.file(input_file_path):
+                item = _encode_file(input_file_path, name, args)
+    except Exception as e:
+        result = (input_file_path, False, f"{type(e).__name__}: {e}")
+        item = None
+    else:
+        result = (input_file_path, True, "")
+    return result, item, recorder.records if timings and recorder is not None else []
+
+
+def process_bundle(
+    inputs: List[str],
+    bundle_path: Path,
+    jobs: Union[int, None],
+    title: str,
+    creator: str,
+    delete_comments: bool,
+    process_chinese: bool,
+) -> List[Tuple[Path, bool, str]]:
+    """Encode every file matched by ``inputs`` into the bundle at ``bundle_path``.
+
+    ``.py`` files are encoded and ``.dsp`` files are added as they are, named
+    by their path below the input folder. Files are encoded on a process pool
+    and written to the bundle in input order as they finish, with a bounded
+    number in flight. A failing file is reported in the result and left out.
+    """
+    args = {
+        "title": title,
+        "creator": creator,
+        "delete_comments": delete_comments,
+        "process_chinese": process_chinese,
+    }
+    tasks = [
+        (file, file.relative_to(root).with_suffix(".dsp").as_posix(), args)
+        for file, root in dsp_codec.collect_input_files(inputs)
+    ]
+    results: List[Tuple[Path, bool, str]] = []
+    if not tasks:
+        return results
+    recorder = dsp_codec.get_recorder()
+
+    with BundleWriter(str(bundle_path)) as writer:
+
+        def write(output: Tuple[Tuple[Path, bool, str], Optional[BundleItem], list]):
+            result, item, records = output
+            if recorder is not None:
+                recorder.records.extend(records)
+            if item is not None:
+                try:
+                    with stage("write", len(item[1])):
+                        writer.add_data(*item)
+                except ValueError as e:
+                    result = (result[0], False, str(e))
+            results.append(dsp_codec._print_batch_result(result))
+
+        if jobs == 1 or len(tasks) <= 1:
+            for task in tasks:
+                write(_encode_bundle_item(*task))
+            return results
+        # Imported here: multiprocessing is slow to import and only batch mode needs it.
+        from concurrent.futures import ProcessPoolExecutor
+
+        cache_dir = dsp_codec._cache_dir()
+        window = (jobs or os.cpu_count() or 1) * dsp_codec.STREAM_WINDOW_PER_JOB
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            pending: deque = deque()
+            for task in tasks:
+                pending.append(executor.submit(_encode_bundle_item, *task, recorder is not None, cache_dir))
+                while pending and (pending[0].done() or len(pending) >= window):
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="dsp-codec unbundle",
+        description="Write the programs of a DSP bundle as .dsp files.",
+    )
+    parser.add_argument("bundle", type=str, help="the bundle file.")
+    parser.add_argument(
+        "names", type=str, nargs="*", help="the programs to write. (defaults to all)"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="the output file path. (defaults to current dir)",
+        default=".",
+    )
+    parser.add_argument(
+        "-l", "--list", action="store_true", help="list the programs instead of writing them."
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        bundle = Bundle(args.bundle)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    with bundle:
+        missing = [name for name in args.names if name not in bundle]
+        if missing:
+            parser.error(f"Not in the bundle: {', '.join(missing)}")
+        entries = [bundle.entry(name) for name in args.names] or bundle.entries
+        if args.list:
+            for entry in entries:
+                print(f"{entry.name}\t{entry.title}\t{entry.guid}\t{entry.size}")
+            return
+        try:
+            for path in bundle.extract(args.output, entries):
+                print(f"[ OK ] {path}")
+        except ValueError as e:
+            print(f"[FAIL] {e}")
+            sys.exit(1)
+        print(f"Unbundled {len(entries)} files to {args.output}.")
@@ -0,0 +1,159 @@
+"""
+Thin client for the dsp-daemon.
+dsp-daemon 客户端
+
+``dsp-codec-client`` takes the same arguments as ``dsp-codec``. When a daemon
+is running the command is executed there, which saves the interpreter start-up
+and imports of every call; otherwise it runs in-process like ``dsp-codec``.
+
+This module is imported on every call, so it only uses the standard library
+modules needed to talk to the daemon.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, List, Optional
+
+# Written by the daemon while it is running: {"port": ..., "pid": ..., "token": ...}
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".dspy_tool_cache", "daemon.json")
+CONNECT_TIMEOUT = 0.5
+# Same as dsp_codec.DECODE_CACHE_ENV, which is too slow to import here.
+DECODE_CACHE_ENV = "DSPY_TOOL_DECODE_CACHE"
+# dsp-codec options run in this process instead of the daemon.
+LOCAL_OPTIONS = ("--stdin", "--watch")
+LOCAL_SHORT_OPTIONS = "w"
+# dsp-codec short options taking a value.
+VALUE_SHORT_OPTIONS = "oftcjb"
+
+
+class DaemonError(Exception):
+    """An error response from the daemon."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class DaemonClient:
+    """JSON-RPC 2.0 client, one JSON object per line over a localhost socket."""
+
+    def __init__(self, sock: socket.socket, token: str):
+        self.sock = sock
+        self.token = token
+        self.file = sock.makefile("rwb")
+        self._next_id = 0
+
+    @classmethod
+    def connect(cls, state_file: str = STATE_FILE) -> Optional["DaemonClient"]:
+        """Connect to the running daemon, or return None if there is none."""
+        try:
+            with open(state_file, encoding="utf-8") as file:
+                state = json.load(file)
+            sock = socket.create_connection(("127.0.0.1", state["port"]), CONNECT_TIMEOUT)
+        except (OSError, ValueError, KeyError):
+            return None
+        sock.settimeout(None)
+        return cls(sock, state["token"])
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def call(self, method: str, **params: Any) -> Any:
+        """Call ``method`` on the daemon and return its result.
+
+        Raises:
+            DaemonError: The daemon returned an error
+            ConnectionError: The daemon went away
+        """
+        self._next_id += 1
+        request = {
+            "jsonrpc": "2.0",
+            "id": self._next_id,
+            "method": method,
+            "params": params,
+            "token": self.token,
+        }
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise DaemonError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+
+def call(method: str, **params: Any) -> Any:
+    """Call ``method`` on the daemon, or run it in-process if no daemon is running."""
+    client = DaemonClient.connect()
+    if client is not None:
+        try:
+            with client:
+                return client.call(method, **params)
+        except ConnectionError:
+            pass
+    from dspy_tool.cli.dsp_daemon import dispatch
+
+    return dispatch(method, params)
+
+
+def _runs_locally(argv: List[str]) -> bool:
+    """Return True if the command line must run in this process, not the daemon."""
+    if argv[:1] in (["sync"], ["unbundle"]):
+        return True
+    for arg in argv:
+        if arg == "--":
+            break
+        if arg.startswith("--"):
+            # argparse also accepts unambiguous prefixes such as --wat.
+            name = arg.split("=", 1)[0]
+            if len(name) > 3 and any(option.startswith(name) for option in LOCAL_OPTIONS):
+                return True
+        elif arg.startswith("-"):
+            # A cluster of short flags such as -sw; the rest of it after an
+            # option taking a value is that value.
+            for char in arg[1:]:
+                if char in LOCAL_SHORT_OPTIONS:
+                    return True
+                if char in VALUE_SHORT_OPTIONS:
+                    break
+    return False
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    # The daemon cannot read this process's stdin, so --stdin always runs here,
+    # and so do the sync and unbundle commands, which its parser does not know,
+    # and --watch, which never returns and would tie up a daemon worker.
+    client = None if _runs_locally(argv) else DaemonClient.connect()
+    if client is not None:
+        # The --cache default comes from this process's environment, not the
+        # daemon's; an explicit --cache or --no-cache later in argv still wins.
+        cache = os.environ.get(DECODE_CACHE_ENV, "0") not in ("", "0")
+        daemon_argv = ["--cache" if cache else "--no-cache"] + argv
+        try:
+            with client:
+                result: Dict[str, Any] = client.call("dsp_codec", argv=daemon_argv, cwd=os.getcwd())
+        except ConnectionError:
+            pass
+        else:
+            sys.stdout.write(result["stdout"])
+            sys.stderr.write(result["stderr"])
+            sys.exit(result["exit_code"])
+    from dspy_tool.cli.dsp_codec import main as dsp_codec_main
+
+    dsp_codec_main(argv)
+
+
+if __name__ == "__main__":
+    main()
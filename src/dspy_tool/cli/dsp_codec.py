@@ -1,11 +1,23 @@
 import argparse
 import datetime
+import os
 import re
+import sys
+from collections import deque
 from pathlib import Path
-from typing import Union, Tuple
-from urllib.parse import unquote
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, List, TextIO, Union, Tuple
 
-from dspy_tool.dsp_codec.file import DspFile
+from dspy_tool.dsp_codec.file import DspFile, map_file
+from dspy_tool.dsp_codec.internal.attribute import ATTRIBUTE_FIELDS
+from dspy_tool.dsp_codec.internal.parser import find_python_code
+from dspy_tool.dsp_codec.internal.serializer import CDATA_END, CDATA_END_SPLIT
+from dspy_tool.dsp_codec.timings import Timings, get_recorder, set_recorder, stage
+
+if TYPE_CHECKING:
+    from dspy_tool.dsp_codec.cache import DecodeCache
+
+# The chinese, archive, cache, glob and json modules are imported where they
+# are used: ``dsp-codec --version`` and argument errors must start fast.
 
 __version__ = "0.1.1"
 
@@ -15,7 +27,45 @@ DELETE_COMMENTS_RE = r" *?#block.*?\n"
 
 PYTHON_CODE_RE = r"<python_code><!\[CDATA\[(.*?)\]\]><\/python_code>"
 
-CHINSES_RE = r"((_[0-9A-F]{2}){3})"
+# Byte version of the pattern above, used on the decoded buffer directly.
+DELETE_COMMENTS_BYTES_RE = re.compile(DELETE_COMMENTS_RE.encode())
+
+RAW_XML_HEAD = b"<dji><attribute>"
+
+BATCH_SUFFIXES = (".py", ".dsp")
+
+GLOB_MAGIC_RE = re.compile(r"[*?[]")
+
+# Set to 1 to turn the decode cache on without passing --cache.
+DECODE_CACHE_ENV = "DSPY_TOOL_DECODE_CACHE"
+
+# Items read from stdin per read() call with --null.
+STREAM_READ_SIZE = 1 << 16
+# Items in flight per worker in stream mode; bounds memory on endless input.
+STREAM_WINDOW_PER_JOB = 4
+
+
+def build_dsp_file(
+    python_code: str,
+    file_name: str,
+    title: str,
+    creator: str,
+    delete_comments: bool,
+    process_chinese: bool,
+    guid: str = "",
+) -> DspFile:
+    """Create a DSP file from python code, applying the --pc and --dc transforms."""
+    if process_chinese:
+        from dspy_tool.dsp_codec.chinese import encode_chinese, strip_annotations
+
+        with stage("process_chinese", len(python_code)):
+            python_code = encode_chinese(strip_annotations(python_code))
+    dsp_file = DspFile.new_with_python_code(creator, title, python_code, file_name, guid)
+    if delete_comments:
+        python_code = dsp_file.get_python_code()
+        with stage("delete_comments", len(python_code)):
+            dsp_file.dji.code.python_code = re.sub(DELETE_COMMENTS_RE, "", python_code)
+    return dsp_file
 
 
 def process_py_file(
@@ -28,6 +78,7 @@ def process_py_file(
     std_out: bool,
     delete_comments: bool,
     process_chinese: bool,
+    guid: str = "",
 ) -> Union[str, None]:
     if not file_name:
         file_name = DspFile.get_file_name(input_file_path.name)
@@ -35,20 +86,21 @@ def process_py_file(
         not file_name.endswith(".xml") and raw
     ):
         file_name = f"{file_name}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-    with open(input_file_path, "r", encoding="utf-8") as file:
+    with stage("read") as timer, open(input_file_path, "r", encoding="utf-8") as file:
         python_code = file.read()
-    dsp_file = DspFile.new_with_python_code(creator, title, python_code, file_name)
-    if delete_comments:
-        python_code = dsp_file.get_python_code()
-        dsp_file.dji.code.python_code = re.sub(DELETE_COMMENTS_RE, "", python_code)
+        timer.size = len(python_code)
+    dsp_file = build_dsp_file(python_code, file_name, title, creator, delete_comments, process_chinese, guid)
     if raw:
+        with stage("xml_serialize"):
+            xml_data = dsp_file.dji.get_xml_string()
         if std_out:
-            return dsp_file.dji.get_xml_string()
+            return xml_data
         else:
             if not file_name.endswith(".xml"):
                 file_name += "_raw.xml"
-            with open(output_file_path / file_name, "wb") as file:
-                file.write(dsp_file.dji.get_xml_string().encode(encoding="utf-8"))
+            xml_data = xml_data.encode(encoding="utf-8")
+            with stage("write", len(xml_data)), open(output_file_path / file_name, "wb") as file:
+                file.write(xml_data)
     else:
         if std_out:
             return dsp_file.get_dsp_data().decode(encoding="utf-8")
@@ -75,52 +127,683 @@ def process_dsp_file(
         not file_name.endswith(".xml") and raw
     ):
         file_name = f"{file_name}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-    with input_file_path.open("rb") as file:
-        dsp_data = file.read().decode(encoding="utf-8")
-        if not dsp_data.startswith("<dji><attribute>"):
-            dsp_data = DspFile.decode_dsp(dsp_data.encode(encoding="utf-8")).decode(
-                encoding="utf-8"
-            )
+    from dspy_tool.dsp_codec.archive import open_binary
+    from dspy_tool.dsp_codec.cache import get_cache
+
+    cache = get_cache()
+    code_span = None
+    with open_binary(input_file_path) as file, map_file(file) as raw_data:
+        if raw_data[: len(RAW_XML_HEAD)] == RAW_XML_HEAD:
+            # Timed as "read" by map_file already.
+            dsp_data = bytearray(raw_data)
+        elif cache is None:
+            dsp_data = DspFile.decode_dsp_buffer(raw_data)
+        else:
+            dsp_data, code_span = DspFile.decode_dsp_cached(raw_data, cache)
     if delete_comments:
-        dsp_data = re.sub(DELETE_COMMENTS_RE, "", dsp_data)
+        with stage("delete_comments", len(dsp_data)):
+            dsp_data = DELETE_COMMENTS_BYTES_RE.sub(b"", dsp_data)
+        code_span = None
+    if raw or process_chinese:
+        # Only the text transforms need the whole document as str.
+        dsp_data = dsp_data.decode(encoding="utf-8")
     if process_chinese:
-        for line in dsp_data.split("\n"):
-            if decode_chinese(line)[0]:
-                dsp_data = dsp_data.replace(
-                    line, line + "  ## " + " -> ".join(decode_chinese(line))
-                )
+        from dspy_tool.dsp_codec.chinese import annotate_chinese
+
+        with stage("process_chinese", len(dsp_data)):
+            dsp_data = annotate_chinese(dsp_data)
     if raw:
         if std_out:
             return dsp_data
         else:
             if not file_name.endswith(".xml"):
                 file_name += "_raw.xml"
-            with open(output_file_path / file_name, "wb") as file:
+            with stage("write", len(dsp_data)), open(output_file_path / file_name, "wb") as file:
                 file.write(dsp_data.encode(encoding="utf-8"))
     else:
-        code = re.findall(PYTHON_CODE_RE, dsp_data, re.S)
-        if not code:
+        with stage("python_code", len(dsp_data)):
+            if isinstance(dsp_data, str):
+                match = re.search(PYTHON_CODE_RE, dsp_data, re.S)
+                code = None if match is None else match.group(1)
+            else:
+                if code_span is None:
+                    code_span = find_python_code(dsp_data)
+                code = None if code_span is None else dsp_data[slice(*code_span)].decode(encoding="utf-8")
+        if code is None:
             print("No python code found in the dsp file.")
             return ""
+        code = code.replace(CDATA_END_SPLIT, CDATA_END)
         if std_out:
-            return code[0]
+            return code
         else:
             if not file_name.endswith(".py"):
                 file_name += ".py"
-            with open(output_file_path / file_name, "w", encoding="utf-8") as file:
-                file.write(code[0])
+            with stage("write", len(code)), open(
+                output_file_path / file_name, "w", encoding="utf-8"
+            ) as file:
+                file.write(code)
 
 
 def decode_chinese(data: str) -> Tuple[str, str]:
-    origin = re.findall(CHINSES_RE, data)
-    return "".join([i[0] for i in origin]), "".join(
-        [unquote(i[0].replace("_", "%")) for i in origin]
-    )
+    from dspy_tool.dsp_codec.chinese import find_chinese
+
+    return find_chinese(data)
+
+
+def _glob_root(pattern: str) -> Path:
+    parts = []
+    for part in Path(pattern).parts:
+        if GLOB_MAGIC_RE.search(part):
+            break
+        parts.append(part)
+    return Path(*parts) if parts else Path(".")
+
+
+def collect_input_files(inputs: List[str]) -> Iterator[Tuple[Path, Path]]:
+    """Yield ``(file, root)`` pairs for every ``.py``/``.dsp`` file in the inputs.
+
+    ``root`` is the directory the file's relative output path is computed from,
+    so the input tree can be mirrored into the output directory.
+    """
+    seen = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            root = path
+            files = sorted(path.rglob("*"))
+        elif path.is_file():
+            root = path.parent
+            files = [path]
+        else:
+            import glob
+
+            root = _glob_root(item)
+            files = sorted(Path(i) for i in glob.glob(item, recursive=True))
+        for file in files:
+            if file.suffix not in BATCH_SUFFIXES or not file.is_file():
+                continue
+            key = file.resolve()
+            if key in seen:
+                continue
+            seen.add(key)
+            yield file, root
+
+
+def _cache_dir() -> Union[Path, None]:
+    """Return the directory of the decode cache, for opening it in worker processes."""
+    from dspy_tool.dsp_codec.cache import get_cache
+
+    cache = get_cache()
+    return None if cache is None else cache.cache_dir
+
+
+def _init_worker(timings: bool, cache_dir: Union[Path, None]) -> Union[Timings, None]:
+    # In a worker process ``timings`` installs a fresh recorder whose records are
+    # sent back; in-process the caller's recorder (if any) is used directly.
+    if timings:
+        set_recorder(Timings())
+    # A forked worker inherits the caller's decode cache, a spawned one opens it.
+    if cache_dir is not None:
+        from dspy_tool.dsp_codec.cache import DecodeCache, get_cache, set_cache
+
+        if get_cache() is None:
+            set_cache(DecodeCache(cache_dir))
+    return get_recorder()
+
+
+def _process_batch_item(
+    input_file_path: Path,
+    output_file_path: Path,
+    args: dict,
+    timings: bool = False,
+    cache_dir: Union[Path, None] = None,
+) -> Tuple[Tuple[Path, bool, str], list]:
+    recorder = _init_worker(timings, cache_dir)
+    if recorder is None:
+        return _process_batch_file(input_file_path, output_file_path, args), []
+    with recorder.file(input_file_path):
+        result = _process_batch_file(input_file_path, output_file_path, args)
+    return result, recorder.records if timings else []
+
+
+def _process_batch_file(
+    input_file_path: Path, output_file_path: Path, args: dict
+) -> Tuple[Path, bool, str]:
+    try:
+        output_file_path.mkdir(parents=True, exist_ok=True)
+        if input_file_path.suffix == ".py":
+            process_py_file(input_file_path, output_file_path, "", **args)
+        else:
+            ret = process_dsp_file(input_file_path, output_file_path, "", **args)
+            if ret == "":
+                return input_file_path, False, "No python code found"
+    except Exception as e:
+        return input_file_path, False, f"{type(e).__name__}: {e}"
+    return input_file_path, True, ""
+
+
+def _print_batch_result(result: Tuple[Path, bool, str]) -> Tuple[Path, bool, str]:
+    file, ok, error = result
+    if ok:
+        print(f"[ OK ] {file}")
+    else:
+        print(f"[FAIL] {file}: {error}")
+    return result
+
+
+def process_batch(
+    inputs: List[str],
+    output_file_path: Path,
+    jobs: Union[int, None],
+    title: str,
+    creator: str,
+    raw: bool,
+    delete_comments: bool,
+    process_chinese: bool,
+) -> List[Tuple[Path, bool, str]]:
+    """Process every file matched by ``inputs`` and mirror the tree into ``output_file_path``.
+
+    Files are fanned out over a process pool with ``jobs`` workers; a failing
+    file is reported in the result instead of aborting the run.
+    """
+    args = {
+        "title": title,
+        "creator": creator,
+        "raw": raw,
+        "std_out": False,
+        "delete_comments": delete_comments,
+        "process_chinese": process_chinese,
+    }
+    tasks = [
+        (file, output_file_path / file.parent.relative_to(root), args)
+        for file, root in collect_input_files(inputs)
+    ]
+    results = []
+    if jobs == 1 or len(tasks) <= 1:
+        for task in tasks:
+            result, _ = _process_batch_item(*task)
+            results.append(_print_batch_result(result))
+        return results
+    # Imported here: multiprocessing is slow to import and only batch mode needs it.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    recorder = get_recorder()
+    cache_dir = _cache_dir()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(_process_batch_item, *task, recorder is not None, cache_dir)
+            for task in tasks
+        ]
+        for future in as_completed(futures):
+            result, records = future.result()
+            if recorder is not None:
+                recorder.records.extend(records)
+            results.append(_print_batch_result(result))
+    return results
+
+
+def describe_dsp_file(dsp_file: DspFile) -> Dict[str, Any]:
+    """Return the file name, attributes and python code of a DSP file as JSON values."""
+    attribute = dsp_file.dji.attribute
+    values = {
+        "creation_date": attribute.creation_date.isoformat(),
+        "modify_time": attribute.modify_time.isoformat(),
+        "firmware_version_dependency": attribute.firmware_version_dependency.value,
+        "code_type": attribute.code_type.value,
+    }
+    return {
+        "file_name": dsp_file.file_name,
+        "attribute": {name: values.get(name, getattr(attribute, name)) for name in ATTRIBUTE_FIELDS},
+        "python_code": dsp_file.get_python_code(),
+    }
+
+
+def read_stream_items(stream: BinaryIO, null: bool = False) -> Iterator[bytes]:
+    """Yield the newline (or NUL) separated items of ``stream`` as they arrive.
+
+    Empty items are skipped, and a trailing ``\\r`` is dropped from newline
+    separated items.
+    """
+    if not null:
+        for line in stream:
+            line = line.rstrip(b"\r\n")
+            if line:
+                yield line
+        return
+    buffer = bytearray()
+    read = getattr(stream, "read1", stream.read)
+    while True:
+        # read1 returns what is available instead of waiting for a full chunk.
+        chunk = read(STREAM_READ_SIZE)
+        if not chunk:
+            break
+        start = len(buffer)
+        buffer += chunk
+        end = buffer.find(b"\0", start)
+        while end >= 0:
+            if end:
+                yield bytes(buffer[:end])
+            del buffer[: end + 1]
+            end = buffer.find(b"\0")
+    if buffer:
+        yield bytes(buffer)
+
+
+def _process_stream_item(index: int, item: bytes, payload: bool, args: dict) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"index": index, "input": None if payload else os.fsdecode(item)}
+    try:
+        if not payload and item.endswith(b".py"):
+            result["dsp_data"] = process_py_file(
+                Path(os.fsdecode(item)), Path("."), "", raw=False, std_out=True, **args
+            )
+            return result
+        if payload:
+            dsp_file = DspFile.loads(item)
+        else:
+            dsp_file = DspFile.load(os.fsdecode(item))
+        result.update(describe_dsp_file(dsp_file))
+        code = result["python_code"]
+        if args["delete_comments"]:
+            with stage("delete_comments", len(code)):
+                code = re.sub(DELETE_COMMENTS_RE, "", code)
+        if args["process_chinese"]:
+            from dspy_tool.dsp_codec.chinese import annotate_chinese
+
+            with stage("process_chinese", len(code)):
+                code = annotate_chinese(code)
+        result["python_code"] = code
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _process_stream_task(
+    index: int,
+    item: bytes,
+    payload: bool,
+    args: dict,
+    timings: bool = False,
+    cache_dir: Union[Path, None] = None,
+) -> Tuple[Dict[str, Any], list]:
+    recorder = _init_worker(timings, cache_dir)
+    if recorder is None:
+        return _process_stream_item(index, item, payload, args), []
+    with recorder.file(f"<stdin:{index}>" if payload else os.fsdecode(item)):
+        result = _process_stream_item(index, item, payload, args)
+    return result, recorder.records if timings else []
+
+
+def process_stream(
+    items: Iterable[bytes],
+    output: TextIO,
+    jobs: Union[int, None],
+    payload: bool,
+    title: str,
+    creator: str,
+    delete_comments: bool,
+    process_chinese: bool,
+    ordered: bool = True,
+) -> Tuple[int, int]:
+    """Process a stream of paths (or base64 DSP payloads) and write one JSON line per item.
+
+    Items are read lazily and at most ``jobs * STREAM_WINDOW_PER_JOB`` of them
+    are in flight, so endless input runs in constant memory. Results are
+    written in input order unless ``ordered`` is False, each line carrying the
+    item's ``index``; a failing item gets an ``error`` field instead of
+    stopping the stream.
+
+    Returns:
+        Tuple[int, int]: the number of items and of failed items
+    """
+    args = {
+        "title": title,
+        "creator": creator,
+        "delete_comments": delete_comments,
+        "process_chinese": process_chinese,
+    }
+    import json
+
+    count = failed = 0
+
+    def write(result: Dict[str, Any]):
+        nonlocal count, failed
+        count += 1
+        failed += "error" in result
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    recorder = get_recorder()
+    if jobs == 1:
+        for index, item in enumerate(items):
+            write(_process_stream_task(index, item, payload, args)[0])
+        return count, failed
+    # Imported here: multiprocessing is slow to import and only parallel mode needs it.
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    def collect(future):
+        result, records = future.result()
+        if recorder is not None:
+            recorder.records.extend(records)
+        write(result)
+
+    cache_dir = _cache_dir()
+    window = (jobs or os.cpu_count() or 1) * STREAM_WINDOW_PER_JOB
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: deque = deque()
+        for index, item in enumerate(items):
+            pending.append(
+                executor.submit(
+                    _process_stream_task, index, item, payload, args, recorder is not None, cache_dir
+                )
+            )
+            if ordered:
+                while pending and (pending[0].done() or len(pending) >= window):
+                    collect(pending.popleft())
+            elif len(pending) >= window:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+                pending = deque(not_done)
+        if ordered:
+            while pending:
+                collect(pending.popleft())
+        else:
+            while pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+                pending = deque(not_done)
+    return count, failed
+
+
+def _watch_output_name(input_file_path: Path, file_name: str, raw: bool) -> str:
+    # Fixed names, so each change overwrites the previous output.
+    suffix = ".xml" if raw else ".dsp" if input_file_path.suffix == ".py" else ".py"
+    if not file_name:
+        file_name = input_file_path.stem + ("_raw" if raw else "")
+    return file_name if file_name.endswith(suffix) else file_name + suffix
+
+
+def _process_watched_file(
+    input_file_path: Path, output_file_path: Path, file_name: str, args: dict
+) -> Tuple[Path, bool, str]:
+    try:
+        output_file_path.mkdir(parents=True, exist_ok=True)
+        if input_file_path.suffix == ".py":
+            guid = ""
+            if not args["raw"]:
+                # Keep the GUID of the previous output, so the app sees the same program.
+                try:
+                    guid = DspFile.load_header(str(output_file_path / file_name)).guid
+                except Exception:
+                    pass
+            process_py_file(input_file_path, output_file_path, file_name, **args, guid=guid)
+        else:
+            ret = process_dsp_file(input_file_path, output_file_path, file_name, **args)
+            if ret == "":
+                return input_file_path, False, "No python code found"
+    except Exception as e:
+        return input_file_path, False, f"{type(e).__name__}: {e}"
+    return input_file_path, True, ""
+
+
+def watch(
+    inputs: List[str],
+    output_file_path: Path,
+    file_name: str,
+    title: str,
+    creator: str,
+    raw: bool,
+    delete_comments: bool,
+    process_chinese: bool,
+    debounce: float,
+    poll: bool = False,
+):
+    """Process the ``.py``/``.dsp`` files below ``inputs`` each time they are written, until interrupted.
+
+    A burst of writes is processed once ``debounce`` seconds after the last
+    one. Directory inputs are mirrored into ``output_file_path`` like in batch
+    mode, and every output keeps a fixed name.
+    """
+    # Imported here: only watch mode needs select and ctypes.
+    from dspy_tool.cli.utils.watcher import create_watcher
+
+    args = {
+        "title": title,
+        "creator": creator,
+        "raw": raw,
+        "std_out": False,
+        "delete_comments": delete_comments,
+        "process_chinese": process_chinese,
+    }
+    roots = [Path(os.path.abspath(item)) for item in inputs]
+    # The outputs written by this process, by (size, mtime), so they are not
+    # processed again when the output directory is inside a watched one.
+    written: Dict[Path, Tuple[int, int]] = {}
+    with create_watcher(roots, BATCH_SUFFIXES, poll) as watcher:
+        print(f"Watching {' '.join(inputs)} with {type(watcher).__name__}, press Ctrl+C to stop.")
+        try:
+            for changed in watcher.batches(debounce):
+                for file in sorted(changed):
+                    try:
+                        stat = file.stat()
+                    except OSError:
+                        continue
+                    if written.get(file) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    root = next((root for root in roots if root in file.parents), file.parent)
+                    output_dir = output_file_path / file.parent.relative_to(root)
+                    name = _watch_output_name(file, file_name, raw)
+                    result = _print_batch_result(_process_watched_file(file, output_dir, name, args))
+                    output = Path(os.path.abspath(output_dir / name))
+                    if result[1] and output.is_file():
+                        stat = output.stat()
+                        written[output] = (stat.st_size, stat.st_mtime_ns)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+
+
+def _write_timings(recorder: Timings, timings: Union[str, None], profile: bool):
+    if timings == "-":
+        recorder.write_json_lines(sys.stderr)
+    elif timings:
+        with open(timings, "w", encoding="utf-8") as file:
+            recorder.write_json_lines(file)
+    if profile:
+        recorder.write_histogram(sys.stderr)
+
+
+_default_decode_cache: Union["DecodeCache", None] = None
+
+
+def default_decode_cache() -> "DecodeCache":
+    # One instance per process, so the daemon does not rescan the cache for
+    # eviction on every request.
+    global _default_decode_cache
+    if _default_decode_cache is None:
+        # Imported here: the config module is slow to import and only the cache needs it.
+        from dspy_tool.cli.utils.config.config import DEFAULT_CACHE_DIR
+        from dspy_tool.dsp_codec.cache import DecodeCache
+
+        _default_decode_cache = DecodeCache(DEFAULT_CACHE_DIR / "decode")
+    return _default_decode_cache
+
+
+class ClearCacheAction(argparse.Action):
+    """Clear the decode cache and exit, like ``--version`` prints and exits."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings, dest, nargs=0, default=default, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        cache = default_decode_cache()
+        count, size = len(cache), cache.size()
+        cache.clear()
+        parser.exit(message=f"Cleared {count} cached files ({size / 2**20:.1f} MiB) in {cache.cache_dir}\n")
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    if args.stdin:
+        if args.input:
+            parser.error("input paths are read from stdin with --stdin.")
+        if args.std_out or args.raw or args.file_name:
+            parser.error("--std-out, --raw and --file-name are not supported with --stdin.")
+        count, failed = process_stream(
+            read_stream_items(sys.stdin.buffer, args.null),
+            sys.stdout,
+            args.jobs,
+            args.payload,
+            args.title,
+            args.creator,
+            args.dc,
+            args.pc,
+            not args.unordered,
+        )
+        if failed:
+            sys.exit(1)
+        return
+    if not args.input:
+        parser.error("the following arguments are required: input")
+    if args.null or args.payload or args.unordered:
+        parser.error("--null, --payload and --unordered need --stdin.")
+    output_file_path = Path(args.output)
+    if args.bundle:
+        if args.std_out or args.raw or args.file_name or args.watch:
+            parser.error("--std-out, --raw, --file-name and --watch are not supported with --bundle.")
+        # Imported here: only bundle mode needs it.
+        from dspy_tool.cli.dsp_bundle import process_bundle
+
+        results = process_bundle(
+            args.input,
+            Path(args.bundle),
+            args.jobs,
+            args.title,
+            args.creator,
+            args.dc,
+            args.pc,
+        )
+        if not results:
+            raise FileNotFoundError(f"No input files found. Path: {' '.join(args.input)}")
+        failed = sum(1 for _, ok, _ in results if not ok)
+        print(
+            f"Bundled {len(results) - failed} of {len(results)} files into {args.bundle}, "
+            f"{failed} failed."
+        )
+        if failed:
+            sys.exit(1)
+        return
+    if args.watch:
+        if args.std_out:
+            parser.error("--std-out is not supported with --watch.")
+        if args.file_name and (len(args.input) > 1 or not Path(args.input[0]).is_file()):
+            parser.error("--file-name needs a single input file with --watch.")
+        watch(
+            args.input,
+            output_file_path,
+            args.file_name,
+            args.title,
+            args.creator,
+            args.raw,
+            args.dc,
+            args.pc,
+            args.debounce,
+            args.poll,
+        )
+        return
+    if len(args.input) > 1 or not Path(args.input[0]).is_file():
+        if args.std_out:
+            parser.error("--std-out is not supported in batch mode.")
+        if args.file_name:
+            parser.error("--file-name is not supported in batch mode.")
+        results = process_batch(
+            args.input,
+            output_file_path,
+            args.jobs,
+            args.title,
+            args.creator,
+            args.raw,
+            args.dc,
+            args.pc,
+        )
+        if not results:
+            raise FileNotFoundError(f"No input files found. Path: {' '.join(args.input)}")
+        failed = sum(1 for _, ok, _ in results if not ok)
+        print(
+            f"Processed {len(results)} files: "
+            f"{len(results) - failed} succeeded, {failed} failed."
+        )
+        if failed:
+            sys.exit(1)
+        return
+    input_file_path = Path(args.input[0])
+    recorder = get_recorder()
+    if recorder is not None:
+        recorder.current_file = str(input_file_path)
+    if input_file_path.is_file():
+        if input_file_path.suffix == ".py":
+            if not args.std_out:
+                if not output_file_path.exists():
+                    output_file_path.mkdir(parents=True)
+            ret = process_py_file(
+                input_file_path,
+                output_file_path,
+                args.file_name,
+                args.title,
+                args.creator,
+                args.raw,
+                args.std_out,
+                args.dc,
+                args.pc,
+            )
+            if args.std_out:
+                print(ret)
+        elif input_file_path.suffix == ".dsp":
+            ret = process_dsp_file(
+                input_file_path,
+                output_file_path,
+                args.file_name,
+                args.title,
+                args.creator,
+                args.raw,
+                args.std_out,
+                args.dc,
+                args.pc,
+            )
+            if args.std_out:
+                print(ret)
+        else:
+            raise ValueError(f"The input file is not a valid file. Path: {input_file_path}")
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="DSP File Codec Tool")
-    parser.add_argument("input", type=str, help="the input file path.")
+    parser.add_argument(
+        "input",
+        type=str,
+        nargs="*",
+        help="the input file path(s). directories and glob patterns enable batch mode.",
+    )
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="read input paths from stdin and write one JSON line per file to stdout.",
+    )
+    parser.add_argument(
+        "-0",
+        "--null",
+        action="store_true",
+        help="stdin items are separated by NUL instead of newline, like find -print0.",
+    )
+    parser.add_argument(
+        "--payload",
+        action="store_true",
+        help="stdin items are dsp file contents instead of paths.",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write results as soon as they are ready instead of in input order.",
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -166,6 +849,59 @@ def main():
         help="the creator of the file. (defaults to 'Anonymous')",
         default="Anonymous",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="the number of worker processes in batch and stdin mode. (defaults to CPU count)",
+    )
+    parser.add_argument(
+        "-b",
+        "--bundle",
+        type=str,
+        help="encode the input files into one bundle file instead of separate files.",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="process the input files again each time they change, until interrupted.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.2,
+        help="seconds without changes to wait before processing in watch mode. (defaults to 0.2)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="poll for changes in watch mode instead of using inotify.",
+    )
+    parser.add_argument(
+        "--timings",
+        type=str,
+        nargs="?",
+        const="-",
+        help="write per-stage timings as JSON lines to a file. (defaults to stderr)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print a per-stage timing summary to stderr.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=os.environ.get(DECODE_CACHE_ENV, "0") not in ("", "0"),
+        help=f"cache decoded dsp files in the user cache dir. (defaults to ${DECODE_CACHE_ENV})",
+    )
+    parser.add_argument(
+        "--no-cache", dest="cache", action="store_false", help="do not use the decode cache."
+    )
+    parser.add_argument(
+        "--clear-cache", action=ClearCacheAction, help="clear the decode cache and exit."
+    )
     parser.add_argument("--debug", action="store_true", help="enable debug mode.")
     parser.add_argument(
         "-v",
@@ -173,8 +909,46 @@ def main():
         action="version",
         version="DSP File Codec Tool v" + __version__,
     )
+    return parser
+
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace, thread: bool = False):
+    """Run the parsed command, with the decode cache and timings if requested.
+
+    ``thread`` keeps the decode cache and the timings recorder local to the
+    calling thread, for callers running several commands at once (the daemon).
+    """
+    from dspy_tool.dsp_codec.cache import reset_thread_cache, set_cache
+
+    set_cache(default_decode_cache() if args.cache else None, thread)
+    try:
+        if args.timings or args.profile:
+            recorder = Timings()
+            set_recorder(recorder, thread)
+            try:
+                _run(parser, args)
+            finally:
+                set_recorder(None, thread)
+                _write_timings(recorder, args.timings, args.profile)
+        else:
+            _run(parser, args)
+    finally:
+        if thread:
+            reset_thread_cache()
+
 
-    args = parser.parse_args()
+def main(argv: Union[List[str], None] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["sync"]:
+        from dspy_tool.cli.dsp_sync import main as sync_main
+
+        return sync_main(argv[1:])
+    if argv[:1] == ["unbundle"]:
+        from dspy_tool.cli.dsp_bundle import main as unbundle_main
+
+        return unbundle_main(argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
 
     if args.debug:
         global DEBUG
@@ -182,44 +956,7 @@ def main():
 
     if DEBUG:
         print(args)
-    input_file_path = Path(args.input)
-    output_file_path = Path(args.output)
-    if not input_file_path.exists():
-        raise FileNotFoundError(f"The input file does not exist. Path: {args.input}")
-    if input_file_path.is_file():
-        if input_file_path.suffix == ".py":
-            if not args.std_out:
-                if not output_file_path.exists():
-                    output_file_path.mkdir(parents=True)
-            ret = process_py_file(
-                input_file_path,
-                output_file_path,
-                args.file_name,
-                args.title,
-                args.creator,
-                args.raw,
-                args.std_out,
-                args.dc,
-                args.pc,
-            )
-            if args.std_out:
-                print(ret)
-        elif input_file_path.suffix == ".dsp":
-            ret = process_dsp_file(
-                input_file_path,
-                output_file_path,
-                args.file_name,
-                args.title,
-                args.creator,
-                args.raw,
-                args.std_out,
-                args.dc,
-                args.pc,
-            )
-            if args.std_out:
-                print(ret)
-        else:
-            raise ValueError(f"The input file is not a valid file. Path: {args.input}")
+    run(parser, args)
 
 
 if __name__ == "__main__":
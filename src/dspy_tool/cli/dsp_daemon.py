@@ -0,0 +1,419 @@
+"""
+Long-running codec daemon.
+编解码守护进程
+
+Serves JSON-RPC 2.0 requests, one JSON object per line, on a localhost TCP
+port. The port and an access token are written to ``STATE_FILE`` so that
+clients (``dsp-codec-client``, ``dspy_tool.cli.dsp_client.call``) can find it;
+requests without the token are rejected. Requests are handled concurrently on a
+pool of worker threads, and the daemon exits after ``--idle-timeout`` seconds
+without requests.
+
+Methods:
+    dsp_codec(argv, cwd): run a dsp-codec command line, returns
+        ``{"stdout", "stderr", "exit_code"}``
+    process_dsp_file(input, ...), process_py_file(input, ...): the dsp-codec
+        functions, ``std_out`` defaults to true
+    load(path): the attribute and code of a DSP file
+    get_dsp_data(python_code, title, creator): encode Python code as DSP data
+    ping(), shutdown()
+"""
+
+import argparse
+import io
+import json
+import os
+import secrets
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dspy_tool.cli import dsp_codec
+from dspy_tool.cli.dsp_client import STATE_FILE, DaemonClient, DaemonError
+from dspy_tool.dsp_codec.cache import set_cache
+from dspy_tool.dsp_codec.file import DspFile
+
+__version__ = "0.1.0"
+
+DEFAULT_IDLE_TIMEOUT = 600
+# An idle connection is dropped after this many seconds, freeing its worker.
+CONNECTION_TIMEOUT = 60
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+UNAUTHORIZED = -32001
+
+
+class ThreadStream(io.TextIOBase):
+    """A stream writing to a per-thread buffer while ``capture`` is active.
+
+    ``sys.stdout``/``sys.stderr`` are replaced with these so each request gets
+    its own output, which ``contextlib.redirect_stdout`` cannot do across threads.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, "buffer", None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        if getattr(self.local, "buffer", None) is None:
+            self.stream.flush()
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+
+def _resolve(path: str, cwd: Optional[str]) -> Path:
+    return Path(cwd or ".", path)
+
+
+@contextmanager
+def _capture_output() -> Iterator[Tuple[io.StringIO, io.StringIO]]:
+    """Capture stdout and stderr, per thread when running as the daemon."""
+    if isinstance(sys.stdout, ThreadStream) and isinstance(sys.stderr, ThreadStream):
+        with sys.stdout.capture() as out, sys.stderr.capture() as err:
+            yield out, err
+    else:
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            yield out, err
+
+
+def _dsp_codec(argv: List[str], cwd: Optional[str] = None) -> Dict[str, Any]:
+    parser = dsp_codec.build_parser()
+    parser.prog = "dsp-codec"
+    exit_code = 0
+    with _capture_output() as (out, err):
+        try:
+            args = parser.parse_args(argv)
+            # The daemon's working directory is not the client's.
+            args.input = [str(_resolve(item, cwd)) for item in args.input]
+            args.output = str(_resolve(args.output, cwd))
+            if args.bundle:
+                args.bundle = str(_resolve(args.bundle, cwd))
+            if args.timings and args.timings != "-":
+                args.timings = str(_resolve(args.timings, cwd))
+            dsp_codec.run(parser, args, thread=True)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            if isinstance(e.code, str):
+                err.write(e.code + "\n")
+        except Exception:
+            traceback.print_exc(file=err)
+            exit_code = 1
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "exit_code": exit_code}
+
+
+def _process_file(
+    process: Callable,
+    input: str,
+    output: str = ".",
+    file_name: str = "",
+    title: str = "Untitled",
+    creator: str = "Anonymous",
+    raw: bool = False,
+    std_out: bool = True,
+    delete_comments: bool = False,
+    process_chinese: bool = False,
+    cwd: Optional[str] = None,
+) -> Optional[str]:
+    output_path = _resolve(output, cwd)
+    if not std_out:
+        output_path.mkdir(parents=True, exist_ok=True)
+    return process(
+        _resolve(input, cwd),
+        output_path,
+        file_name,
+        title,
+        creator,
+        raw,
+        std_out,
+        delete_comments,
+        process_chinese,
+    )
+
+
+def _load(path: str, cwd: Optional[str] = None) -> Dict[str, Any]:
+    dsp_file = DspFile.load(str(_resolve(path, cwd)))
+    result = dsp_codec.describe_dsp_file(dsp_file)
+    result["scratch_description"] = dsp_file.dji.code.scratch_description
+    return result
+
+
+def _get_dsp_data(
+    python_code: str, title: str = "Untitled", creator: str = "Anonymous", file_name: str = ""
+) -> str:
+    dsp_file = DspFile.new_with_python_code(creator, title, python_code, file_name)
+    return dsp_file.get_dsp_data().decode(encoding="utf-8")
+
+
+def _ping() -> Dict[str, Any]:
+    return {"pid": os.getpid(), "version": __version__}
+
+
+METHODS: Dict[str, Callable[..., Any]] = {
+    "dsp_codec": _dsp_codec,
+    "process_dsp_file": lambda **params: _process_file(dsp_codec.process_dsp_file, **params),
+    "process_py_file": lambda **params: _process_file(dsp_codec.process_py_file, **params),
+    "load": _load,
+    "get_dsp_data": _get_dsp_data,
+    "ping": _ping,
+}
+
+
+def dispatch(method: str, params: Dict[str, Any]) -> Any:
+    """Run ``method`` in-process. 在当前进程中执行请求"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}")
+    return METHODS[method](**params)
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Handle the JSON-RPC requests of one connection, in order."""
+
+    timeout = CONNECTION_TIMEOUT
+
+    def handle(self):
+        server: DaemonServer = self.server
+        while True:
+            try:
+                line = self.rfile.readline()
+            except OSError:
+                return
+            if not line:
+                return
+            with server.activity():
+                response = self.respond(line)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+            if response.get("error", {}).get("code") == UNAUTHORIZED:
+                return
+
+    def respond(self, line: bytes) -> Dict[str, Any]:
+        server: DaemonServer = self.server
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, str(e))
+        if not isinstance(request, dict):
+            return _error(None, INVALID_REQUEST, "Request must be an object")
+        request_id = request.get("id")
+        if not secrets.compare_digest(str(request.get("token", "")), server.token):
+            return _error(request_id, UNAUTHORIZED, "Invalid token")
+        method = request.get("method")
+        params = request.get("params") or {}
+        if method == "shutdown":
+            threading.Thread(target=server.shutdown).start()
+            return {"jsonrpc": "2.0", "id": request_id, "result": None}
+        if method not in METHODS:
+            return _error(request_id, METHOD_NOT_FOUND, f"Unknown method {method!r}")
+        if not isinstance(params, dict):
+            return _error(request_id, INVALID_PARAMS, "Params must be an object")
+        try:
+            result = METHODS[method](**params)
+        except TypeError as e:
+            return _error(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            return _error(request_id, SERVER_ERROR, f"{type(e).__name__}: {e}")
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+class DaemonServer(socketserver.TCPServer):
+    """TCP server handing each connection to a fixed pool of worker threads."""
+
+    allow_reuse_address = True
+
+    def __init__(self, port: int, jobs: Optional[int], idle_timeout: float):
+        super().__init__(("127.0.0.1", port), RequestHandler)
+        self.executor = ThreadPoolExecutor(jobs or min(32, (os.cpu_count() or 1) + 4))
+        self.token = secrets.token_hex(16)
+        self.idle_timeout = idle_timeout
+        self.active = 0
+        self.last_active = time.monotonic()
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    @contextmanager
+    def activity(self) -> Iterator[None]:
+        with self.lock:
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.last_active = time.monotonic()
+
+    def watch_idle(self):
+        """Shut the server down once it has been idle for ``idle_timeout`` seconds."""
+        while True:
+            time.sleep(min(1.0, self.idle_timeout))
+            with self.lock:
+                idle = self.active == 0 and time.monotonic() - self.last_active >= self.idle_timeout
+            if idle:
+                self.shutdown()
+                return
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+def _write_state(server: DaemonServer):
+    state = {"port": server.server_address[1], "pid": os.getpid(), "token": server.token}
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    temp_file = f"{STATE_FILE}.{os.getpid()}.tmp"
+    # The token is the only thing keeping other local users out.
+    fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(fd, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(temp_file, STATE_FILE)
+
+
+def _remove_state():
+    try:
+        with open(STATE_FILE, encoding="utf-8") as file:
+            if json.load(file).get("pid") != os.getpid():
+                return
+        os.remove(STATE_FILE)
+    except (OSError, ValueError):
+        pass
+
+
+def serve(port: int = 0, jobs: Optional[int] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, cache: bool = False):
+    """Run the daemon until it is shut down or idle. 运行守护进程"""
+    if cache:
+        set_cache(dsp_codec.default_decode_cache())
+    sys.stdout = ThreadStream(sys.stdout)
+    sys.stderr = ThreadStream(sys.stderr)
+    with DaemonServer(port, jobs, idle_timeout) as server:
+        _write_state(server)
+        print(f"dsp-daemon listening on 127.0.0.1:{server.server_address[1]} (pid {os.getpid()})")
+        if idle_timeout > 0:
+            threading.Thread(target=server.watch_idle, daemon=True).start()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            _remove_state()
+
+
+def _ping_daemon() -> Optional[Dict[str, Any]]:
+    client = DaemonClient.connect()
+    if client is None:
+        return None
+    try:
+        with client:
+            return client.call("ping")
+    except (OSError, ValueError, DaemonError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DSP File Codec Daemon")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="the number of worker threads. (defaults to CPU count + 4)"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help=f"exit after this many seconds without requests, 0 to never exit. (defaults to {DEFAULT_IDLE_TIMEOUT})",
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=0, help="the localhost port. (defaults to a free port)"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="use the decode cache for the RPC methods; dsp-codec commands choose with their own --cache.",
+    )
+    parser.add_argument(
+        "-d", "--detach", action="store_true", help="start the daemon in the background."
+    )
+    parser.add_argument("--status", action="store_true", help="show whether a daemon is running.")
+    parser.add_argument("--stop", action="store_true", help="stop the running daemon.")
+    parser.add_argument(
+        "-v",
+        "--version",
+        action="version",
+        version="DSP File Codec Daemon v" + __version__,
+    )
+    args = parser.parse_args()
+
+    running = _ping_daemon()
+    if args.status:
+        if running is None:
+            print("No daemon is running.")
+            sys.exit(1)
+        print(f"Daemon v{running['version']} is running (pid {running['pid']}).")
+        return
+    if args.stop:
+        if running is None:
+            print("No daemon is running.")
+            return
+        with DaemonClient.connect() as client:
+            client.call("shutdown")
+        print(f"Stopped the daemon (pid {running['pid']}).")
+        return
+    if running is not None:
+        print(f"A daemon is already running (pid {running['pid']}).")
+        return
+    if args.detach:
+        command = [sys.executable, "-m", "dspy_tool.cli.dsp_daemon", "--idle-timeout", str(args.idle_timeout)]
+        command += ["--port", str(args.port)]
+        if args.jobs:
+            command += ["--jobs", str(args.jobs)]
+        if args.cache:
+            command.append("--cache")
+        if sys.platform == "win32":
+            options = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            options = {"start_new_session": True}
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **options,
+        )
+        print(f"Started the daemon in the background (pid {process.pid}).")
+        return
+    serve(args.port, args.jobs, args.idle_timeout, args.cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Mirror a tree of .py and .dsp files, rebuilding only what changed.
+同步 .py 与 .dsp 文件夹
+
+``dsp-codec sync SRC DST`` encodes every ``SRC/**/x.py`` to ``DST/**/x.dsp`` and
+decodes every ``SRC/**/x.dsp`` to ``DST/**/x.py``. Like make, a run only
+rebuilds the files whose source changed since the last run, which is tracked
+in a manifest in DST: the source's size, mtime and content hash, and the
+output's size and mtime.
+
+- An unchanged source (same size and mtime) with an untouched output is not
+  even read, so a no-op sync is a few stats per file.
+- A source whose mtime changed but whose content did not (``git checkout``)
+  is hashed but not rebuilt.
+- An encoded file keeps its GUID and creation date across runs, and its
+  modify time is the source's mtime, so an unchanged source always encodes
+  to the same DSP data.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dspy_tool.cli import dsp_codec
+from dspy_tool.dsp_codec.file import DspFile
+
+MANIFEST_NAME = ".dsp-sync.json"
+MANIFEST_VERSION = 1
+SUFFIX_MAP = {".py": ".dsp", ".dsp": ".py"}
+
+# {"size", "mtime_ns", "hash", "output_size", "output_mtime_ns"[, "guid", "creation_date"]}
+Entry = Dict[str, Any]
+
+
+def hash_file(path: Path) -> str:
+    """Return the sha256 hex digest of the file content."""
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def iter_sources(src: Path, exclude: Path) -> Iterator[Tuple[str, Path]]:
+    """Yield ``(relative posix path, path)`` for every source file under ``src``, sorted.
+
+    The directory ``exclude`` is skipped; it is compared resolved, so it may be
+    given relative to another working directory than ``src``.
+    """
+    exclude = exclude.resolve()
+    for root, dirs, files in os.walk(src):
+        root_path = Path(root)
+        # Do not sync the output into itself when DST is inside SRC.
+        dirs[:] = sorted(d for d in dirs if (root_path / d).resolve() != exclude)
+        for name in sorted(files):
+            path = root_path / name
+            if path.suffix in SUFFIX_MAP:
+                yield path.relative_to(src).as_posix(), path
+
+
+def output_path(dst: Path, relative: str) -> Path:
+    path = dst / relative
+    return path.with_suffix(SUFFIX_MAP[path.suffix])
+
+
+def load_manifest(path: Path) -> Dict[str, Any]:
+    """Return the manifest, or an empty one if it is missing, broken or of another version."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": MANIFEST_VERSION, "options": None, "files": {}}
+
+
+def save_manifest(path: Path, manifest: Dict[str, Any]):
+    """Write the manifest atomically."""
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _is_fresh(entry: Optional[Entry], source: Tuple[int, int], output: Optional[Tuple[int, int]]) -> bool:
+    return (
+        entry is not None
+        and output is not None
+        and (entry.get("size"), entry.get("mtime_ns")) == source
+        and (entry.get("output_size"), entry.get("output_mtime_ns")) == output
+    )
+
+
+def sync_file(
+    source: Path, target: Path, stat: Tuple[int, int], entry: Optional[Entry], options: Dict[str, Any]
+) -> Tuple[Optional[Entry], str]:
+    """Rebuild ``target`` from ``source`` unless the content is unchanged.
+
+    Returns:
+        Tuple[Optional[Entry], str]: the new manifest entry (None on failure) and
+            "updated", "unchanged" or the error message
+    """
+    try:
+        content_hash = hash_file(source)
+        output = _stat(target)
+        if entry is not None and output is not None and entry.get("hash") == content_hash and (
+            entry.get("output_size"), entry.get("output_mtime_ns")
+        ) == output:
+            return dict(entry, size=stat[0], mtime_ns=stat[1]), "unchanged"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        new_entry: Entry = {"size": stat[0], "mtime_ns": stat[1], "hash": content_hash}
+        if source.suffix == ".py":
+            new_entry.update(_encode(source, target, stat, entry, options))
+        else:
+            code = dsp_codec.process_dsp_file(
+                source, target.parent, target.name, "", "", False, False, options["dc"], options["pc"]
+            )
+            if code == "":
+                return None, "No python code found"
+        output = _stat(target)
+        if output is None:
+            return None, "The output was not written"
+        new_entry["output_size"], new_entry["output_mtime_ns"] = output
+        return new_entry, "updated"
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _encode(
+    source: Path, target: Path, stat: Tuple[int, int], entry: Optional[Entry], options: Dict[str, Any]
+) -> Entry:
+    guid, creation_date = (entry or {}).get("guid"), (entry or {}).get("creation_date")
+    if guid is None and target.exists():
+        # Adopt the GUID of an output that predates the manifest.
+        try:
+            attribute = DspFile.load_header(str(target))
+            guid, creation_date = attribute.guid, attribute.creation_date.isoformat()
+        except Exception:
+            pass
+    with open(source, "r", encoding="utf-8") as file:
+        python_code = file.read()
+    dsp_file = dsp_codec.build_dsp_file(
+        python_code,
+        "",
+        options["title"] or source.stem,
+        options["creator"],
+        options["dc"],
+        options["pc"],
+        guid or "",
+    )
+    attribute = dsp_file.dji.attribute
+    modify_time = datetime.fromtimestamp(stat[1] / 1e9).replace(microsecond=0)
+    attribute.creation_date = datetime.fromisoformat(creation_date) if creation_date else modify_time
+    attribute.modify_time = modify_time
+    dsp_file.save(str(target.parent), target.name, change_modify_time=False)
+    return {"guid": attribute.guid, "creation_date": attribute.creation_date.isoformat()}
+
+
+def sync(
+    src: Path,
+    dst: Path,
+    jobs: Optional[int],
+    options: Dict[str, Any],
+    manifest_path: Optional[Path] = None,
+    force: bool = False,
+    delete: bool = False,
+) -> Tuple[int, int, int, List[Tuple[str, str]]]:
+    """Mirror ``src`` into ``dst``, rebuilding only the files whose source changed.
+
+    Args:
+        options: ``title``, ``creator``, ``dc`` and ``pc``; changing them rebuilds every file
+        force: rebuild every file
+        delete: remove the outputs of source files that no longer exist
+
+    Returns:
+        Tuple[int, int, int, list]: the number of updated, unchanged and deleted
+            files, and the ``(path, error)`` of the failed ones
+    """
+    manifest_path = manifest_path or dst / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    if force or manifest["options"] != options:
+        # Keep the GUIDs, but make every entry stale.
+        old_files = {
+            relative: {key: value for key, value in entry.items() if key in ("guid", "creation_date")}
+            for relative, entry in manifest["files"].items()
+        }
+    else:
+        old_files = manifest["files"]
+    files: Dict[str, Entry] = {}
+    tasks = []
+    seen = set()
+    unchanged = 0
+    for relative, source in iter_sources(src, dst):
+        stat = _stat(source)
+        if stat is None:
+            continue
+        seen.add(relative)
+        target = output_path(dst, relative)
+        entry = old_files.get(relative)
+        if _is_fresh(entry, stat, _stat(target)):
+            files[relative] = entry
+            unchanged += 1
+            continue
+        tasks.append((relative, (source, target, stat, entry, options)))
+        # Kept for the GUID if the rebuild fails.
+        if entry and "guid" in entry:
+            files[relative] = {"guid": entry["guid"], "creation_date": entry["creation_date"]}
+
+    failed = []
+    updated = 0
+
+    def collect(relative: str, result: Tuple[Optional[Entry], str]):
+        nonlocal updated, unchanged
+        entry, status = result
+        if entry is None:
+            failed.append((relative, status))
+            print(f"[FAIL] {relative}: {status}")
+            return
+        files[relative] = entry
+        if status == "updated":
+            updated += 1
+            print(f"[ OK ] {relative}")
+        else:
+            unchanged += 1
+
+    if jobs == 1 or len(tasks) <= 1:
+        for relative, task in tasks:
+            collect(relative, sync_file(*task))
+    else:
+        # Imported here: multiprocessing is slow to import and a no-op sync does not need it.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [(relative, executor.submit(sync_file, *task)) for relative, task in tasks]
+            for relative, future in futures:
+                collect(relative, future.result())
+
+    deleted = 0
+    if delete:
+        for relative in sorted(manifest["files"].keys() - seen):
+            try:
+                output_path(dst, relative).unlink()
+                deleted += 1
+                print(f"[ DEL] {relative}")
+            except OSError:
+                pass
+
+    dst.mkdir(parents=True, exist_ok=True)
+    save_manifest(manifest_path, {"version": MANIFEST_VERSION, "options": options, "files": files})
+    return updated, unchanged, deleted, failed
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="dsp-codec sync",
+        description="Encode the .py files and decode the .dsp files of SRC into DST, "
+        "skipping the files that did not change since the last sync.",
+    )
+    parser.add_argument("src", type=str, help="the source directory.")
+    parser.add_argument("dst", type=str, help="the output directory.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="the number of worker processes. (defaults to CPU count)",
+    )
+    parser.add_argument(
+        "-t", "--title", type=str, help="the title of the encoded files. (defaults to the file name)"
+    )
+    parser.add_argument(
+        "-c",
+        "--creator",
+        type=str,
+        help="the creator of the encoded files. (defaults to 'Anonymous')",
+        default="Anonymous",
+    )
+    parser.add_argument(
+        "--dc",
+        "--delete-comments",
+        action="store_true",
+        help="try to delete comments for blocks. (defaults to False)",
+    )
+    parser.add_argument(
+        "--pc",
+        "--process-chinese",
+        action="store_true",
+        help="try to decode chinese characters. (defaults to False)",
+    )
+    parser.add_argument(
+        "--manifest", type=str, help=f"the manifest file. (defaults to DST/{MANIFEST_NAME})"
+    )
+    parser.add_argument("--force", action="store_true", help="rebuild every file.")
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="delete the outputs of source files that were removed.",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    src, dst = Path(args.src), Path(args.dst)
+    if not src.is_dir():
+        parser.error(f"The source is not a directory. Path: {src}")
+    if src.resolve() == dst.resolve():
+        parser.error(f"The output directory must differ from the source. Path: {src}")
+    options = {"title": args.title, "creator": args.creator, "dc": args.dc, "pc": args.pc}
+    updated, unchanged, deleted, failed = sync(
+        src,
+        dst,
+        args.jobs,
+        options,
+        Path(args.manifest) if args.manifest else None,
+        args.force,
+        args.delete,
+    )
+    print(
+        f"Synced {updated + unchanged + len(failed)} files: {updated} updated, "
+        f"{unchanged} unchanged, {len(failed)} failed" + (f", {deleted} deleted." if args.delete else ".")
+    )
+    if failed:
+        sys.exit(1)
@@ -1,16 +1,11 @@
 import argparse
 from pathlib import Path
-from typing import List
+from typing import Iterator, Optional
 from sys import argv as sys_argv
-from subprocess import Popen as sp_Popen
 
-from textual.app import App, ComposeResult
-from textual.widgets import Tree, Footer, TextArea
-from textual.widgets.tree import TreeNode
-from pyperclip import copy as pc_copy
-
-from dspy_tool.cli.dsp_codec import process_dsp_file
 from dspy_tool.cli.utils.config.fm_config import FileManagerConfig
+from dspy_tool.cli.utils.index import DspIndex
+from dspy_tool.cli.utils.scanner import DspScanner
 
 
 __version__ = "0.1.1"
@@ -44,9 +39,22 @@ def remove_dir(cfg: FileManagerConfig, dir: Path):
         print(f"{dir} is not in the DSP directories.")
 
 
-def list_files(cfg: FileManagerConfig):
-    for file in _get_dsp_file_list(cfg):
-        print(file)
+def update_index(cfg: FileManagerConfig, index: DspIndex, full: bool = False, verbose: bool = True):
+    """Bring the index up to date with the DSP directories.
+
+    Directories whose mtime did not change since the last scan reuse their
+    cached listing unless ``full``; only changed files are decoded either way.
+    """
+    updated, unchanged, removed = index.update(_get_dsp_file_list(cfg, index, full))
+    if verbose:
+        print(f"Index updated: {updated} changed, {unchanged} unchanged, {removed} removed.")
+
+
+def list_files(cfg: FileManagerConfig, full: bool = False):
+    with DspIndex() as index:
+        update_index(cfg, index, full, verbose=full)
+        for file in index.paths():
+            print(file)
 
 
 def _get_all_drives():
@@ -56,107 +64,31 @@ def _get_all_drives():
             yield drive
 
 
-def _get_dsp_file_list(cfg: FileManagerConfig):
-    dsp_dirs = [Path(i) for i in cfg.dsp_dirs]
-    for dsp_dir in dsp_dirs:
+def _get_dsp_roots(cfg: FileManagerConfig) -> Iterator[Path]:
+    for dsp_dir in cfg.dsp_dirs:
+        # A trailing "**" means "recursive", which every root already is.
+        parts = Path(dsp_dir).parts
+        while parts and parts[-1] == "**":
+            parts = parts[:-1]
+        dsp_dir = Path(*parts)
         if dsp_dir.is_absolute():
             if dsp_dir.exists() and dsp_dir.is_dir():
-                for file in dsp_dir.rglob("*.dsp"):
-                    yield file
+                yield dsp_dir
             else:
                 print(f"{dsp_dir} does not exist.")
         else:
             for drive in _get_all_drives():
-                for file in Path(drive, dsp_dir).rglob("*.dsp"):
-                    yield file
+                if Path(drive, dsp_dir).is_dir():
+                    yield Path(drive, dsp_dir)
 
 
-def _generate_file_tree(file_list: List[Path], root_node: TreeNode):
-    for file in file_list:
-        for parent in list(root_node.children):
-            if str(parent.label) == file.parent.as_posix():
-                parent.add_leaf(file.name).data = file
-                break
-        else:
-            root_node.add(file.parent.as_posix()).add_leaf(file.name).data = file
-
-
-def _open_file_in_explorer(file: Path):
-    sp_Popen(["explorer.exe", "/select,", file.as_posix().replace("/", "\\")])
-
-
-class FileManagerApp(App):
-    BINDINGS = [
-        ("c", "copy", "Copy the text"),
-        ("d", "decode", "Decode the file"),
-        ("s", "change_style", "Change the style"),
-        ("o", "open", "Open in explorer"),
-        ("q", "quit", "Quit"),
-    ]
-    CSS_PATH = "css.tcss"
-
-    themes = ["vscode_dark", "monokai", "css", "github_light", "dracula"]
-
-    def __init__(self, cfg, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.cfg = cfg
-
-    def compose(self) -> ComposeResult:
-        self.file_tree = Tree("DSP Files", id="sidebar")
-        _generate_file_tree(list(_get_dsp_file_list(self.cfg)), self.file_tree.root)
-        self.file_tree.root.expand_all()
-        self.file_tree.on_event
-        yield self.file_tree
-        self.text_area = TextArea.code_editor(
-            "Python Code", language="python", read_only=True
-        )
-        yield self.text_area
-        yield Footer()
-
-    def on_tree_node_highlighted(self, node: Tree.NodeHighlighted):
-        data = node.node.data
-        if data:
-            with data.open(encoding="utf-8") as f:
-                code = process_dsp_file(
-                    data, data.parent, "", "", "", False, True, True, True
-                )
-                if code == "":
-                    self.text_area.text = "No python code"
-                elif code is not None:
-                    self.text_area.text = code
-                else:
-                    self.text_area.text = (
-                        "It seems that we have something wrong when decoded dsp file.\nThis is the origin file:\n"
-                        + f.read()
-                    )
-
-    def action_copy(self):
-        self.text_area.selected_text
-        pc_copy(self.text_area.selected_text)
-
-    def action_decode(self):
-        node = self.file_tree.cursor_node
-        if node and node.data:
-            process_dsp_file(
-                node.data, node.data.parent, "", "", "", False, False, True, True
-            )
-            _open_file_in_explorer(node.data)
-
-    def action_change_style(self):
-        next_theme = self.themes.index(self.text_area.theme) + 1
-        if next_theme == len(self.themes):
-            # Out of range
-            next_theme = 0
-        self.text_area.theme = self.themes[next_theme]
-        if next_theme == 3:
-            self.dark = False
-        else:
-            self.dark = True
-
-    def action_open(self):
-        node = self.file_tree.cursor_node
-        if node and node.data:
-            _open_file_in_explorer(node.data)
+def _get_dsp_file_list(cfg: FileManagerConfig, index: Optional[DspIndex] = None, full: bool = False):
+    scanner = DspScanner(
+        cfg.exclude_patterns, cfg.max_depth, index.load_dirs() if index and not full else None
+    )
+    yield from scanner.scan(_get_dsp_roots(cfg))
+    if index is not None:
+        index.save_dirs(scanner.new_state)
 
 
 def main():
@@ -183,7 +115,13 @@ def main():
         "-l",
         "--list",
         action="store_true",
-        help="list the dsp files.",
+        help="update the index and list the dsp files.",
+    )
+    parser.add_argument(
+        "-u",
+        "--update",
+        action="store_true",
+        help="rescan every dsp directory, not only the changed ones, and update the index.",
     )
     parser.add_argument(
         "-t",
@@ -209,14 +147,20 @@ def main():
     if args.dsp_dirs:
         list_dirs(cfg)
     elif args.list:
-        list_files(cfg)
+        list_files(cfg, args.update)
     elif args.tui:
+        # The TUI (textual, pyperclip) is only imported when it is used.
+        from dspy_tool.cli.tui import FileManagerApp
+
         app = FileManagerApp(cfg)
         app.run()
     elif args.add:
         add_dir(cfg, Path(args.add))
     elif args.remove:
         remove_dir(cfg, Path(args.remove))
+    elif args.update:
+        with DspIndex() as index:
+            update_index(cfg, index, full=True)
 
 
 if __name__ == "__main__":
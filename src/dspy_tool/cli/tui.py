@@ -0,0 +1,284 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from subprocess import Popen as sp_Popen
+
+from textual import work
+from textual.app import App, ComposeResult
+from textual.widgets import Tree, Footer, TextArea
+from textual.widgets.tree import TreeNode
+from textual.worker import get_current_worker
+from pyperclip import copy as pc_copy
+
+from dspy_tool.cli.dsp_codec import process_dsp_file
+from dspy_tool.cli.file_manager import _get_dsp_file_list
+from dspy_tool.cli.utils.index import DspIndex
+from dspy_tool.dsp_codec.archive import host_path, open_binary, stat_path
+
+
+PREVIEW_CACHE_SIZE = 128
+# Seconds to wait before decoding an uncached file, so that holding an arrow
+# key over a folder does not decode every file passed on the way.
+PREVIEW_DELAY = 0.05
+# Number of tree lines above and below the cursor to decode ahead of time.
+PREFETCH_LINES = 2
+
+
+# Files are sent to the tree in batches of at most this many, or after this many seconds.
+TREE_BATCH_SIZE = 1000
+TREE_BATCH_INTERVAL = 0.1
+# Folders are expanded as they appear while the tree holds at most this many files.
+AUTO_EXPAND_FILES = 200
+
+
+def _batched(files: Iterable[Path]) -> Iterator[List[Path]]:
+    batch: List[Path] = []
+    deadline = monotonic() + TREE_BATCH_INTERVAL
+    for file in files:
+        batch.append(file)
+        if len(batch) >= TREE_BATCH_SIZE or monotonic() >= deadline:
+            yield batch
+            batch = []
+            deadline = monotonic() + TREE_BATCH_INTERVAL
+    if batch:
+        yield batch
+
+
+class FileTree(Tree):
+    """Tree of the DSP files grouped by folder.
+
+    Files can be added while the tree is shown. The file nodes of a folder are
+    only created when the folder is first expanded, so the tree stays fast
+    with hundreds of thousands of files.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.groups: Dict[str, List[Path]] = {}
+        self.group_nodes: Dict[str, TreeNode] = {}
+        self.group_keys: Dict[int, str] = {}
+        self.file_nodes: Dict[Path, TreeNode] = {}
+        self.files: Set[Path] = set()
+
+    def _load_group(self, key: str):
+        node = self.group_nodes[key]
+        for file in self.groups[key]:
+            if file not in self.file_nodes:
+                self.file_nodes[file] = node.add_leaf(file.name, file)
+
+    def add_files(self, files: Iterable[Path]):
+        """Add the files that are not in the tree yet."""
+        for file in files:
+            if file in self.files:
+                continue
+            self.files.add(file)
+            key = file.parent.as_posix()
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = []
+                node = self.group_nodes[key] = self.root.add(key, allow_expand=True)
+                self.group_keys[node.id] = key
+                if len(self.files) <= AUTO_EXPAND_FILES:
+                    node.expand()
+            group.append(file)
+            node = self.group_nodes[key]
+            if node.is_expanded:
+                self.file_nodes[file] = node.add_leaf(file.name, file)
+
+    def retain_files(self, files: Set[Path]):
+        """Remove the files that are not in ``files``."""
+        removed = self.files - files
+        self.files -= removed
+        for file in removed:
+            node = self.file_nodes.pop(file, None)
+            if node is not None:
+                node.remove()
+        for key in {file.parent.as_posix() for file in removed}:
+            group = self.groups[key] = [file for file in self.groups[key] if file not in removed]
+            if not group:
+                del self.groups[key]
+                node = self.group_nodes.pop(key)
+                del self.group_keys[node.id]
+                node.remove()
+
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded):
+        key = self.group_keys.get(event.node.id)
+        if key is not None:
+            self._load_group(key)
+
+
+class PreviewCache:
+    """Thread-safe bounded LRU cache of decoded python code keyed by path and mtime."""
+
+    def __init__(self, max_size: int = PREVIEW_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: "OrderedDict[Tuple[Path, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(file: Path) -> Tuple[Path, int]:
+        return file, stat_path(file)[1]
+
+    def get(self, key: Tuple[Path, int]) -> Optional[str]:
+        with self._lock:
+            code = self._items.get(key)
+            if code is not None:
+                self._items.move_to_end(key)
+            return code
+
+    def put(self, key: Tuple[Path, int], code: str):
+        with self._lock:
+            self._items[key] = code
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+def _decode_preview(file: Path) -> str:
+    try:
+        code = process_dsp_file(file, file.parent, "", "", "", False, True, True, True)
+    except Exception:
+        code = None
+    if code == "":
+        return "No python code"
+    elif code is not None:
+        return code
+    with open_binary(file) as f:
+        return (
+            "It seems that we have something wrong when decoded dsp file.\nThis is the origin file:\n"
+            + f.read().decode("utf-8", errors="replace")
+        )
+
+
+def _open_file_in_explorer(file: Path):
+    # A member of a zip archive is shown as the archive.
+    file = Path(host_path(file))
+    sp_Popen(["explorer.exe", "/select,", file.as_posix().replace("/", "\\")])
+
+
+class FileManagerApp(App):
+    BINDINGS = [
+        ("c", "copy", "Copy the text"),
+        ("d", "decode", "Decode the file"),
+        ("s", "change_style", "Change the style"),
+        ("o", "open", "Open in explorer"),
+        ("q", "quit", "Quit"),
+    ]
+    CSS_PATH = "css.tcss"
+
+    themes = ["vscode_dark", "monokai", "css", "github_light", "dracula"]
+
+    def __init__(self, cfg, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cfg = cfg
+        self.preview_cache = PreviewCache()
+
+    def compose(self) -> ComposeResult:
+        self.file_tree = FileTree("DSP Files", id="sidebar")
+        self.file_tree.root.expand()
+        yield self.file_tree
+        self.text_area = TextArea.code_editor(
+            "Python Code", language="python", read_only=True
+        )
+        yield self.text_area
+        yield Footer()
+
+    def on_mount(self):
+        self.run_worker(self._refresh_index, thread=True)
+
+    def _stream_files(self, files: Iterable[Path]) -> Iterator[Path]:
+        """Yield ``files`` while adding them to the tree in batches."""
+        worker = get_current_worker()
+        for batch in _batched(files):
+            if worker.is_cancelled:
+                return
+            self.call_from_thread(self.file_tree.add_files, batch)
+            yield from batch
+
+    def _refresh_index(self):
+        """Show the indexed files, then the scanned ones as they are found, then update the index."""
+        with DspIndex() as index:
+            for _ in self._stream_files(index.paths()):
+                pass
+            found = list(self._stream_files(_get_dsp_file_list(self.cfg, index)))
+            if get_current_worker().is_cancelled:
+                return
+            self.call_from_thread(self.file_tree.retain_files, set(found))
+            index.update(found)
+
+    def on_tree_node_highlighted(self, node: Tree.NodeHighlighted):
+        data = node.node.data
+        if data:
+            self._show_preview(data)
+            self._prefetch_previews(
+                [
+                    self.file_tree.get_node_at_line(node.node.line + offset)
+                    for offset in range(-PREFETCH_LINES, PREFETCH_LINES + 1)
+                    # Negative lines would index the tree from the end.
+                    if offset and node.node.line + offset >= 0
+                ]
+            )
+
+    def _get_preview(self, file: Path, delay: float = 0) -> Optional[str]:
+        """Return the cached preview of ``file``, decoding it if needed.
+
+        Returns None if the current worker was cancelled before decoding.
+        """
+        try:
+            key = self.preview_cache.key(file)
+        except OSError as e:
+            return f"Cannot read the file.\n{e}"
+        code = self.preview_cache.get(key)
+        if code is not None:
+            return code
+        if delay:
+            sleep(delay)
+        if get_current_worker().is_cancelled:
+            return None
+        code = _decode_preview(file)
+        self.preview_cache.put(key, code)
+        return code
+
+    @work(thread=True, exclusive=True, group="preview")
+    def _show_preview(self, file: Path):
+        code = self._get_preview(file, PREVIEW_DELAY)
+        if code is not None and not get_current_worker().is_cancelled:
+            self.call_from_thread(setattr, self.text_area, "text", code)
+
+    @work(thread=True, exclusive=True, group="prefetch")
+    def _prefetch_previews(self, nodes: List[Optional[TreeNode]]):
+        for node in nodes:
+            if node is not None and node.data:
+                if self._get_preview(node.data) is None:
+                    return
+
+    def action_copy(self):
+        self.text_area.selected_text
+        pc_copy(self.text_area.selected_text)
+
+    def action_decode(self):
+        node = self.file_tree.cursor_node
+        if node and node.data:
+            # Decoded next to the file, or next to the archive containing it.
+            process_dsp_file(
+                node.data, Path(host_path(node.data)).parent, "", "", "", False, False, True, True
+            )
+            _open_file_in_explorer(node.data)
+
+    def action_change_style(self):
+        next_theme = self.themes.index(self.text_area.theme) + 1
+        if next_theme == len(self.themes):
+            # Out of range
+            next_theme = 0
+        self.text_area.theme = self.themes[next_theme]
+        if next_theme == 3:
+            self.dark = False
+        else:
+            self.dark = True
+
+    def action_open(self):
+        node = self.file_tree.cursor_node
+        if node and node.data:
+            _open_file_in_explorer(node.data)
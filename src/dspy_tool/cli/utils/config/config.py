@@ -3,6 +3,7 @@ import toml
 from pathlib import Path
 
 DEFAULT_CONFIG_FILE = Path.home() / '.dspy_tool.toml'
+DEFAULT_CACHE_DIR = Path.home() / '.dspy_tool_cache'
 
 
 @dataclass
@@ -51,3 +51,13 @@ class FileManagerConfig(Config):
             ]
         ]
     )
+    exclude_patterns: List[str] = field(
+        default_factory=lambda: [
+            ".*",
+            "__pycache__",
+            "node_modules",
+            "$RECYCLE.BIN",
+            "System Volume Information",
+        ]
+    )
+    max_depth: int = -1
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dspy_tool.cli.utils.config.config import DEFAULT_CACHE_DIR
+from dspy_tool.cli.utils.scanner import DirState
+from dspy_tool.dsp_codec.archive import stat_path
+from dspy_tool.dsp_codec.file import DspFile
+
+DEFAULT_INDEX_FILE = DEFAULT_CACHE_DIR / "index.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    title TEXT,
+    creator TEXT,
+    guid TEXT,
+    creation_date TEXT,
+    modify_time TEXT,
+    code_type TEXT,
+    sign TEXT,
+    code_hash TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    files TEXT NOT NULL,
+    subdirs TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class IndexEntry:
+    """Dataclass for storing the metadata of one indexed DSP file."""
+    path: str
+    size: int
+    mtime_ns: int
+    title: Optional[str] = None
+    creator: Optional[str] = None
+    guid: Optional[str] = None
+    creation_date: Optional[str] = None
+    modify_time: Optional[str] = None
+    code_type: Optional[str] = None
+    sign: Optional[str] = None
+    code_hash: Optional[str] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_file(cls, file: Path, size: int, mtime_ns: int) -> "IndexEntry":
+        """Decode the file and build its entry. Decode errors are stored, not raised."""
+        try:
+            dsp_file = DspFile.load(str(file))
+            attribute = dsp_file.dji.attribute
+            return cls(
+                file.as_posix(),
+                size,
+                mtime_ns,
+                attribute.title,
+                attribute.creator,
+                attribute.guid,
+                attribute.creation_date.isoformat(),
+                attribute.modify_time.isoformat(),
+                attribute.code_type.value,
+                attribute.sign,
+                hashlib.sha1(dsp_file.get_python_code().encode()).hexdigest(),
+            )
+        except Exception as e:
+            return cls(file.as_posix(), size, mtime_ns, error=f"{type(e).__name__}: {e}")
+
+
+class DspIndex:
+    """Persistent SQLite index of the DSP files in the configured directories.
+
+    The database runs in WAL mode with a busy timeout, so several ``dsp-fm``
+    processes can read and update it at the same time.
+    """
+
+    def __init__(self, index_file: Path = DEFAULT_INDEX_FILE):
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.index_file = index_file
+        self.connection = sqlite3.connect(str(index_file), timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA busy_timeout=30000")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "DspIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_empty(self) -> bool:
+        return self.connection.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+    def entries(self) -> List[IndexEntry]:
+        """Return all the indexed entries, sorted by path."""
+        rows = self.connection.execute("SELECT * FROM files ORDER BY path")
+        return [IndexEntry(*row) for row in rows]
+
+    def paths(self) -> List[Path]:
+        """Return the paths of all the indexed files, sorted."""
+        rows = self.connection.execute("SELECT path FROM files ORDER BY path")
+        return [Path(row[0]) for row in rows]
+
+    def _stats(self) -> Dict[str, Tuple[int, int]]:
+        rows = self.connection.execute("SELECT path, size, mtime_ns FROM files")
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def load_dirs(self) -> Dict[str, DirState]:
+        """Return the directory state saved by the last scan."""
+        rows = self.connection.execute("SELECT path, mtime_ns, files, subdirs FROM dirs")
+        return {
+            path: (mtime_ns, json.loads(files), json.loads(subdirs))
+            for path, mtime_ns, files, subdirs in rows
+        }
+
+    def save_dirs(self, state: Dict[str, DirState]):
+        """Replace the saved directory state with ``state``."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.execute("DELETE FROM dirs")
+            self.connection.executemany(
+                "INSERT INTO dirs VALUES (?, ?, ?, ?)",
+                [
+                    (path, mtime_ns, json.dumps(files), json.dumps(subdirs))
+                    for path, (mtime_ns, files, subdirs) in state.items()
+                ],
+            )
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def update(self, files: Iterable[Path]) -> Tuple[int, int, int]:
+        """Bring the index in line with ``files``.
+
+        Only files whose size or mtime changed are decoded again, and indexed
+        files that are no longer in ``files`` are dropped.
+
+        Returns:
+            Tuple[int, int, int]: the number of updated, unchanged and removed files
+        """
+        known = self._stats()
+        seen = set()
+        changed = []
+        for file in files:
+            key = file.as_posix()
+            if key in seen:
+                continue
+            seen.add(key)
+            try:
+                # A member of a zip archive gets the archive's size and mtime.
+                size, mtime_ns = stat_path(file)
+            except OSError:
+                seen.discard(key)
+                continue
+            if known.get(key) == (size, mtime_ns):
+                continue
+            changed.append(IndexEntry.from_file(file, size, mtime_ns))
+        removed = [path for path in known if path not in seen]
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [tuple(vars(entry).values()) for entry in changed],
+            )
+            self.connection.executemany(
+                "DELETE FROM files WHERE path = ?", [(path,) for path in removed]
+            )
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        return len(changed), len(seen) - len(changed), len(removed)
@@ -0,0 +1,116 @@
+import fnmatch
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dspy_tool.dsp_codec.archive import is_archive_name, list_members
+
+# (mtime_ns, dsp file names, sub directory names) of one scanned directory.
+# For a zip archive: (mtime_ns, dsp member names, []).
+DirState = Tuple[int, List[str], List[str]]
+
+
+def dedupe_roots(roots: Iterable[Path]) -> List[Path]:
+    """Resolve the roots and drop the ones that are equal to or nested in another root."""
+    resolved = sorted(
+        {Path(os.path.realpath(root)) for root in roots}, key=lambda p: len(p.parts)
+    )
+    kept: List[Path] = []
+    for root in resolved:
+        if not any(parent == root or parent in root.parents for parent in kept):
+            kept.append(root)
+    return kept
+
+
+class DspScanner:
+    """Find DSP files below a set of root directories with ``os.scandir``.
+
+    Zip archives are walked like directories: their DSP members are found as
+    ``archive.zip/member.dsp`` without extracting anything.
+
+    Roots are walked concurrently. A directory whose mtime matches ``state``
+    (the result of a previous scan) is not listed again: its cached file and
+    sub directory names are reused. The state of this scan is collected in
+    ``new_state`` once ``scan`` has been exhausted.
+    """
+
+    def __init__(
+        self,
+        exclude_patterns: Iterable[str] = (),
+        max_depth: int = -1,
+        state: Optional[Dict[str, DirState]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.exclude_patterns = list(exclude_patterns)
+        self.max_depth = max_depth
+        self.state = state or {}
+        self.max_workers = max_workers
+        self.new_state: Dict[str, DirState] = {}
+
+    def _is_excluded(self, path: str, name: str) -> bool:
+        path = path.replace(os.sep, "/")
+        return any(
+            fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern)
+            for pattern in self.exclude_patterns
+        )
+
+    def _list_dir(self, path: str) -> DirState:
+        path_stat = os.stat(path)
+        mtime_ns = path_stat.st_mtime_ns
+        cached = self.state.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached
+        if stat.S_ISREG(path_stat.st_mode):
+            # A zip archive: its central directory is only read when it changed.
+            try:
+                return mtime_ns, list_members(path), []
+            except Exception:
+                return mtime_ns, [], []
+        files, subdirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.name.endswith(".dsp") and entry.is_file():
+                        files.append(entry.name)
+                    elif is_archive_name(entry.name) and entry.is_file():
+                        subdirs.append(entry.name)
+                except OSError:
+                    continue
+        return mtime_ns, sorted(files), sorted(subdirs)
+
+    def _walk(self, root: Path) -> Tuple[List[Path], Dict[str, DirState]]:
+        found: List[Path] = []
+        state: Dict[str, DirState] = {}
+        stack = [(str(root), 0)]
+        while stack:
+            path, depth = stack.pop()
+            try:
+                dir_state = self._list_dir(path)
+            except OSError:
+                continue
+            state[path] = dir_state
+            _, files, subdirs = dir_state
+            for name in files:
+                file = os.path.join(path, name)
+                # Archive members are excluded by any folder inside the archive too.
+                if not any(self._is_excluded(file, part) for part in name.split("/")):
+                    found.append(Path(file))
+            if self.max_depth >= 0 and depth >= self.max_depth:
+                continue
+            for name in reversed(subdirs):
+                subdir = os.path.join(path, name)
+                if not self._is_excluded(subdir, name):
+                    stack.append((subdir, depth + 1))
+        return found, state
+
+    def scan(self, roots: Iterable[Path]) -> Iterator[Path]:
+        """Yield the DSP files below ``roots``, root by root."""
+        roots = dedupe_roots(roots)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for found, state in executor.map(self._walk, roots):
+                self.new_state.update(state)
+                yield from found
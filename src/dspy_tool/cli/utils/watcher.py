@@ -0,0 +1,220 @@
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# From <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+# wd, mask, cookie, len, followed by ``len`` bytes of NUL padded name
+EVENT = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 0.2
+
+
+class Watcher(ABC):
+    """Report the files with one of ``suffixes`` that are written below ``roots``.
+
+    A root is either a directory, watched recursively, or a single file.
+    """
+
+    def __init__(self, roots: Iterable[Path], suffixes: Tuple[str, ...]):
+        self.suffixes = suffixes
+        self.dirs: List[Path] = []
+        self.files: Set[Path] = set()
+        for root in roots:
+            root = Path(os.path.abspath(root))
+            if root.is_dir():
+                self.dirs.append(root)
+            else:
+                self.files.add(root)
+
+    def _in_dirs(self, path: Path) -> bool:
+        return any(root in path.parents for root in self.dirs)
+
+    def _wanted(self, path: Path) -> bool:
+        return path.suffix in self.suffixes and (path in self.files or self._in_dirs(path))
+
+    def all_files(self) -> Set[Path]:
+        """Return every watched file that exists."""
+        found = {file for file in self.files if file.is_file()}
+        for root in self.dirs:
+            for dir_path, _, names in os.walk(root):
+                found.update(
+                    Path(dir_path, name) for name in names if os.path.splitext(name)[1] in self.suffixes
+                )
+        return found
+
+    @abstractmethod
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Return the files written within ``timeout`` seconds, waiting forever if None.
+
+        Returns as soon as there is at least one, so a burst may be split over calls.
+        """
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def batches(self, debounce: float = DEFAULT_DEBOUNCE) -> Iterator[Set[Path]]:
+        """Yield the written files, a burst of writes (editor saves) at a time.
+
+        A batch is yielded once no file was written for ``debounce`` seconds.
+        """
+        while True:
+            changed = self.wait()
+            while True:
+                more = self.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            yield changed
+
+
+class InotifyWatcher(Watcher):
+    """Watcher using Linux inotify through ctypes.
+
+    Directories are watched rather than files, so files replaced by a rename
+    (as most editors save) are still seen.
+    """
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, roots: Iterable[Path], suffixes: Tuple[str, ...]):
+        super().__init__(roots, suffixes)
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        self.watches: Dict[int, Path] = {}
+        try:
+            for file in self.files:
+                self._watch(file.parent)
+            for root in self.dirs:
+                self._watch_tree(root)
+        except BaseException:
+            self.close()
+            raise
+
+    def _watch(self, path: Path):
+        wd = self._add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), str(path))
+        self.watches[wd] = path
+
+    def _watch_tree(self, root: Path) -> Set[Path]:
+        """Watch ``root`` and its sub directories; return the files already in them."""
+        found = set()
+        for dir_path, _, names in os.walk(root):
+            try:
+                self._watch(Path(dir_path))
+            except OSError:
+                continue
+            found.update(Path(dir_path, name) for name in names)
+        return found
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        changed: Set[Path] = set()
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                return changed
+            data = os.read(self.fd, READ_SIZE)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped: treat everything as written.
+                    changed |= self.all_files()
+                    continue
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                path = directory / name
+                if mask & IN_ISDIR:
+                    # Files may be created in a new directory before it is watched.
+                    if self._in_dirs(path):
+                        changed.update(file for file in self._watch_tree(path) if self._wanted(file))
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and self._wanted(path):
+                    changed.add(path)
+            if changed:
+                return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher(Watcher):
+    """Watcher comparing the size and mtime of the files every ``interval`` seconds."""
+
+    def __init__(self, roots: Iterable[Path], suffixes: Tuple[str, ...], interval: float = POLL_INTERVAL):
+        super().__init__(roots, suffixes)
+        self.interval = interval
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for file in self.all_files():
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            snapshot[file] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(delay, 0))
+            snapshot = self._snapshot()
+            changed = {file for file, stat in snapshot.items() if self.snapshot.get(file) != stat}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+
+def create_watcher(roots: Iterable[Path], suffixes: Tuple[str, ...], poll: bool = False) -> Watcher:
+    """Return an inotify watcher, or a polling one if ``poll`` or inotify is not available."""
+    roots = list(roots)
+    if not poll:
+        try:
+            return InotifyWatcher(roots, suffixes)
+        except OSError:
+            pass
+    return PollingWatcher(roots, suffixes)
@@ -0,0 +1,98 @@
+"""
+Executors for the asyncio API.
+异步接口的执行器
+
+``DspFile.aload``, ``asave``, ``adecode`` and ``aencode`` never block the event
+loop; they hand their work to two executors:
+
+- the I/O executor reads and writes files and runs the XML and signature steps,
+  which work on ``DspFile`` objects. It must be a thread pool.
+- the codec executor runs the CPU-heavy base64 and AES steps on plain bytes. It
+  may be a ``ProcessPoolExecutor``, so that decoding a multi-megabyte file does
+  not hold the GIL in the server process.
+
+Both default to the event loop's default executor until ``set_executors``
+installs others::
+
+    set_executors(ThreadPoolExecutor(4), ProcessPoolExecutor())
+    dsp_files = await aload_many(paths, limit=8)
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple, TypeVar
+
+from dspy_tool.dsp_codec.archive import open_binary
+
+T = TypeVar("T")
+
+# Default number of files aload_many works on at once.
+DEFAULT_CONCURRENCY = 8
+
+_io_executor: Optional[Executor] = None
+_codec_executor: Optional[Executor] = None
+
+
+def set_executors(io_executor: Optional[Executor] = None, codec_executor: Optional[Executor] = None):
+    """Install the executors of the asyncio API, None for the loop's default. 设置异步执行器
+
+    The executors are not shut down by this module; their owner does that.
+    """
+    global _io_executor, _codec_executor
+    _io_executor = io_executor
+    _codec_executor = codec_executor
+
+
+def get_executors() -> Tuple[Optional[Executor], Optional[Executor]]:
+    """Return the installed ``(io_executor, codec_executor)``."""
+    return _io_executor, _codec_executor
+
+
+def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> Awaitable[T]:
+    """Run ``func`` on the I/O executor. 在 I/O 执行器中运行"""
+    return asyncio.get_running_loop().run_in_executor(_io_executor, partial(func, *args, **kwargs))
+
+
+def run_codec(func: Callable[..., T], *args: Any) -> Awaitable[T]:
+    """Run ``func`` on the codec executor; ``func`` and its arguments must be picklable. 在编解码执行器中运行"""
+    return asyncio.get_running_loop().run_in_executor(_codec_executor, func, *args)
+
+
+def read_file(path: str) -> bytes:
+    """Read a file, or a member of a zip archive like ``DspFile.load`` does."""
+    with open_binary(path) as file:
+        return file.read()
+
+
+def write_file(path: str, data: bytes):
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+async def gather_limited(
+    func: Callable[[Any], Awaitable[T]],
+    items: Iterable[Any],
+    limit: int = DEFAULT_CONCURRENCY,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """Await ``func(item)`` for every item, at most ``limit`` at a time. 限制并发数地批量执行
+
+    Args:
+        func: the coroutine function
+        items: its arguments
+        limit (int, optional): the maximum number of calls running at once. Defaults to DEFAULT_CONCURRENCY.
+        return_exceptions (bool, optional): put exceptions in the result instead of raising the first one.
+
+    Returns:
+        list: the results, in the order of ``items``
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=return_exceptions)
@@ -0,0 +1,103 @@
+"""
+DSP files inside zip archives.
+压缩包中的 DSP 文件
+
+A file inside an archive is addressed as if the archive were a directory:
+``Downloads/team.zip/round1/a.dsp`` is the member ``round1/a.dsp`` of
+``Downloads/team.zip``. Members are read from the archive stream, nothing is
+extracted to disk.
+
+Opened archives are kept in a small LRU keyed by path, size and mtime, so the
+central directory of an archive is parsed once for all its members.
+"""
+
+import errno
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, List, Optional, Tuple, Union
+
+ARCHIVE_SUFFIXES = (".zip",)
+MAX_OPEN_ARCHIVES = 16
+
+PathLike = Union[str, os.PathLike]
+
+_archives: "OrderedDict[str, Tuple[Tuple[int, int], object]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def is_archive_name(name: str) -> bool:
+    """Return True if ``name`` has an archive suffix."""
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def split_archive_path(path: PathLike) -> Optional[Tuple[str, str]]:
+    """Split a path inside an archive into ``(archive path, member name)``.
+
+    Returns None for a path that is not inside an archive.
+    """
+    path = os.fspath(path)
+    if not any(suffix in path.lower() for suffix in ARCHIVE_SUFFIXES):
+        return None
+    parts = Path(path).parts
+    for i in range(len(parts) - 1):
+        if is_archive_name(parts[i]):
+            archive = os.path.join(*parts[: i + 1])
+            if os.path.isfile(archive):
+                return archive, "/".join(parts[i + 1:])
+    return None
+
+
+def host_path(path: PathLike) -> str:
+    """Return the archive containing ``path``, or ``path`` itself if it is a plain file."""
+    archive = split_archive_path(path)
+    return os.fspath(path) if archive is None else archive[0]
+
+
+def open_archive(archive: str):
+    """Return the opened ``zipfile.ZipFile``, reusing it while the archive is unchanged."""
+    stat = os.stat(archive)
+    key = (stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        cached = _archives.get(archive)
+        if cached is not None and cached[0] == key:
+            _archives.move_to_end(archive)
+            return cached[1]
+    # Imported here: zipfile is slow to import and only archives need it.
+    import zipfile
+
+    zip_file = zipfile.ZipFile(archive)
+    with _lock:
+        _archives[archive] = (key, zip_file)
+        _archives.move_to_end(archive)
+        # Evicted archives are closed once their open members are released.
+        while len(_archives) > MAX_OPEN_ARCHIVES:
+            _archives.popitem(last=False)
+    return zip_file
+
+
+def list_members(archive: str, suffix: str = ".dsp") -> List[str]:
+    """Return the names of the members ending with ``suffix``, sorted."""
+    return sorted(
+        info.filename
+        for info in open_archive(archive).infolist()
+        if not info.is_dir() and info.filename.lower().endswith(suffix)
+    )
+
+
+def open_binary(path: PathLike) -> IO[bytes]:
+    """Open a file, or a member of an archive, for reading bytes. 以二进制方式打开文件或压缩包中的文件"""
+    archive = split_archive_path(path)
+    if archive is None:
+        return open(path, "rb")
+    try:
+        return open_archive(archive[0]).open(archive[1])
+    except KeyError:
+        raise FileNotFoundError(errno.ENOENT, f"No member {archive[1]!r} in {archive[0]}", os.fspath(path))
+
+
+def stat_path(path: PathLike) -> Tuple[int, int]:
+    """Return ``(size, mtime_ns)`` of a file; a member of an archive gets the archive's."""
+    stat = os.stat(host_path(path))
+    return stat.st_size, stat.st_mtime_ns
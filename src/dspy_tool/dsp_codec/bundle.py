@@ -0,0 +1,185 @@
+"""
+Bundle of many DSP programs in one file.
+DSP 程序包
+
+A bundle holds the encoded data of many DSP files back to back, followed by a
+table of contents::
+
+    header    magic "DSPB", version, flags, TOC offset, TOC size
+    payloads  the DSP data of each program, exactly as in a .dsp file
+    TOC       JSON: {"entries": [{"name", "title", "guid", "offset", "size"}, ...]}
+
+The TOC is written last, so programs can be streamed into a bundle one at a
+time. Reading maps the bundle and only touches the header, the TOC and the
+payloads that are asked for.
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Union
+
+from dspy_tool.dsp_codec.file import DspFile
+
+MAGIC = b"DSPB"
+VERSION = 1
+# magic, version, flags, TOC offset, TOC size
+HEADER = struct.Struct("<4sHHQQ")
+SUFFIX = ".dspb"
+
+
+class BundleEntry(NamedTuple):
+    """One program of a bundle."""
+    name: str
+    title: str
+    guid: str
+    offset: int
+    size: int
+
+
+class BundleWriter:
+    """Write programs to a new bundle one at a time. 写入 DSP 程序包
+
+    The bundle is written to a temporary file that replaces ``path`` on
+    ``close``; if the ``with`` block raises, it is discarded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._temp_path = path + ".tmp"
+        self._file = open(self._temp_path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self.entries: List[BundleEntry] = []
+        self._names = set()
+
+    def add_data(self, name: str, dsp_data: bytes, title: str = "", guid: str = "") -> BundleEntry:
+        """Add encoded DSP data. 添加已编码的 DSP 数据
+
+        Raises:
+            ValueError: A program with this name is already in the bundle
+        """
+        if name in self._names:
+            raise ValueError(f"Duplicate name in bundle: {name}")
+        entry = BundleEntry(name, title, guid, self._file.tell(), len(dsp_data))
+        self._file.write(dsp_data)
+        self._names.add(name)
+        self.entries.append(entry)
+        return entry
+
+    def add(self, dsp_file: DspFile, name: str = "", change_modify_time: bool = True) -> BundleEntry:
+        """Encode and add a DSP file, named like ``DspFile.save`` names files. 添加 DSP 文件"""
+        return dsp_file.save_to_bundle(self, name, change_modify_time)
+
+    def close(self):
+        """Write the TOC and move the bundle into place."""
+        if self._file.closed:
+            return
+        toc = json.dumps({"entries": [entry._asdict() for entry in self.entries]}).encode()
+        toc_offset = self._file.tell()
+        self._file.write(toc)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, toc_offset, len(toc)))
+        self._file.close()
+        os.replace(self._temp_path, self.path)
+
+    def discard(self):
+        """Remove the unfinished bundle."""
+        if not self._file.closed:
+            self._file.close()
+            os.unlink(self._temp_path)
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class Bundle:
+    """Read programs from a bundle with random access. 读取 DSP 程序包
+
+    Raises:
+        ValueError: The file is not a complete bundle
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size or header[:4] != MAGIC:
+                raise ValueError(f"Not a DSP bundle: {path}")
+            _, version, _, toc_offset, toc_size = HEADER.unpack(header)
+            if version != VERSION:
+                raise ValueError(f"Unsupported DSP bundle version {version}: {path}")
+            if toc_offset == 0:
+                raise ValueError(f"Incomplete DSP bundle: {path}")
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            toc = json.loads(self._map[toc_offset:toc_offset + toc_size])
+            self.entries: List[BundleEntry] = [BundleEntry(**entry) for entry in toc["entries"]]
+        except Exception:
+            self._map.close()
+            raise
+        self._by_name: Dict[str, BundleEntry] = {entry.name: entry for entry in self.entries}
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> "Bundle":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[BundleEntry]:
+        return iter(self.entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def entry(self, name: Union[str, BundleEntry]) -> BundleEntry:
+        """Return the entry of a program by name.
+
+        Raises:
+            KeyError: No program with this name
+        """
+        return name if isinstance(name, BundleEntry) else self._by_name[name]
+
+    def read(self, name: Union[str, BundleEntry]) -> bytes:
+        """Return the DSP data of one program, as in a .dsp file. 读取单个程序的 DSP 数据"""
+        entry = self.entry(name)
+        return self._map[entry.offset:entry.offset + entry.size]
+
+    def load(self, name: Union[str, BundleEntry]) -> DspFile:
+        """Decode one program. 解码单个程序"""
+        entry = self.entry(name)
+        with memoryview(self._map)[entry.offset:entry.offset + entry.size] as dsp_data:
+            return DspFile.loads(dsp_data, DspFile.get_file_name(os.path.basename(entry.name)))
+
+    def extract(
+        self, output_path: str, names: Union[Iterable[Union[str, BundleEntry]], None] = None
+    ) -> Iterator[str]:
+        """Write programs as .dsp files below ``output_path``, yielding their paths. 解包为 .dsp 文件
+
+        Names containing folders are written to sub folders of ``output_path``.
+
+        Raises:
+            ValueError: A name points outside of ``output_path``
+        """
+        root = os.path.abspath(output_path)
+        for name in self.entries if names is None else names:
+            entry = self.entry(name)
+            path = os.path.abspath(os.path.join(root, entry.name))
+            if os.path.commonpath([root, path]) != root:
+                raise ValueError(f"Unsafe name in bundle: {entry.name}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(self.read(entry))
+            yield path
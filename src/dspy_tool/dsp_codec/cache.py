@@ -0,0 +1,170 @@
+"""
+Content-addressed decode cache.
+解码缓存
+
+Decoding a DSP file (base64, AES, XML parse) is cached on disk, keyed by a hash
+of the raw file bytes, so decoding an unchanged file again only costs a hash
+and a file read. Nothing is cached until a ``DecodeCache`` is installed with
+``set_cache``.
+
+Each entry is one file named after its key: a fixed header with the span of
+the python_code content, followed by the decoded XML. Entries are written to a
+temporary file and renamed into place, so several processes can share the
+directory. Once the total size exceeds ``max_size`` the least recently used
+entries (by mtime, refreshed on a hit) are removed.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# magic, python_code start, python_code end (-1 when there is no python code)
+HEADER = struct.Struct("<4sqq")
+MAGIC = b"DSC1"
+SUFFIX = ".bin"
+DEFAULT_MAX_SIZE = 256 << 20
+# A hit only refreshes the entry's mtime once it is older than this, in seconds.
+TOUCH_INTERVAL = 600
+
+CacheEntry = Tuple[bytes, Optional[Tuple[int, int]]]
+
+
+def hash_key(raw_byte) -> str:
+    """Return the cache key of the raw DSP data. 计算缓存键"""
+    return hashlib.sha256(raw_byte).hexdigest()[:32]
+
+
+class DecodeCache:
+    """On-disk cache of decoded DSP files, keyed by ``hash_key`` of the raw data.
+
+    I/O errors are treated as misses: a broken cache never stops a file from
+    being decoded.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        # Bytes this process wrote since the last eviction pass; the directory
+        # is only scanned once they add up to a sixteenth of max_size.
+        self._written = max_size
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / (key + SUFFIX)
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(SUFFIX):
+                        yield entry
+        except FileNotFoundError:
+            return
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the cached ``(xml, python_code_span)``, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                magic, code_start, code_end = HEADER.unpack(file.read(HEADER.size))
+                xml = file.read()
+                mtime = os.fstat(file.fileno()).st_mtime
+            if time.time() - mtime > TOUCH_INTERVAL:
+                os.utime(path)
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC:
+            return None
+        return xml, None if code_start < 0 else (code_start, code_end)
+
+    def put(self, key: str, xml, python_code: Optional[Tuple[int, int]]):
+        """Store an entry, then evict the least recently used ones beyond ``max_size``."""
+        size = HEADER.size + len(xml)
+        if size > self.max_size:
+            return
+        code_start, code_end = python_code or (-1, -1)
+        # Imported here: tempfile is slow to import and only writes need it.
+        import tempfile
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with open(fd, "wb") as file:
+                    file.write(HEADER.pack(MAGIC, code_start, code_end))
+                    file.write(xml)
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            return
+        self._written += size
+        if self._written * 16 >= self.max_size:
+            self._written = 0
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the total size fits ``max_size``."""
+        entries: List[Tuple[float, int, str]] = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        excess = sum(size for _, size, _ in entries) - self.max_size
+        for _, size, path in sorted(entries):
+            if excess <= 0:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            excess -= size
+
+    def size(self) -> int:
+        """Return the total size of the entries in bytes."""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
+
+    def clear(self):
+        """Remove all the entries."""
+        for entry in self._entries():
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+_cache: Optional[DecodeCache] = None
+_thread_caches = threading.local()
+
+
+def set_cache(cache: Optional[DecodeCache], thread: bool = False):
+    """Install ``cache`` as the decode cache, or turn caching off with None. 设置解码缓存
+
+    With ``thread`` the setting only applies to the calling thread, and takes
+    precedence over the process-wide one (None turns caching off for the
+    thread) until ``reset_thread_cache`` is called.
+    """
+    global _cache
+    if thread:
+        _thread_caches.cache = cache
+    else:
+        _cache = cache
+
+
+def reset_thread_cache():
+    """Make the calling thread use the process-wide decode cache again."""
+    _thread_caches.__dict__.pop("cache", None)
+
+
+def get_cache() -> Optional[DecodeCache]:
+    """Return the installed decode cache, if any."""
+    return getattr(_thread_caches, "cache", _cache)
@@ -0,0 +1,88 @@
+"""
+Chinese identifier escapes.
+中文标识符转义
+
+The RoboMaster app stores non-ASCII identifiers with every UTF-8 byte written
+as ``_XX``, e.g. ``速度`` becomes ``_E9_80_9F_E5_BA_A6``.
+"""
+
+import io
+import re
+import tokenize
+from typing import List, Tuple
+
+# One escaped character: three escaped UTF-8 bytes.
+CHINESE_RE = re.compile(r"(?:_[0-9A-F]{2}){3}")
+# A line containing at least one escaped character.
+CHINESE_LINE_RE = re.compile(r"^.*?(?:_[0-9A-F]{2}){3}.*$", re.M)
+# The comment appended by annotate_chinese.
+ANNOTATION_RE = re.compile(r"  ## (?:(?:_[0-9A-F]{2}){3})+ -> [^\n]*$", re.M)
+# Fallback for code that cannot be tokenized.
+IDENTIFIER_RE = re.compile(r"[^\W\d]\w*")
+
+
+def decode_escapes(escapes: str) -> str:
+    """Decode a run of ``_XX`` escapes, three bytes (one character) at a time.
+
+    Invalid UTF-8 is replaced, like ``urllib.parse.unquote`` does.
+    """
+    return "".join(
+        bytes.fromhex(escapes[i:i + 9].replace("_", "")).decode("utf-8", errors="replace")
+        for i in range(0, len(escapes), 9)
+    )
+
+
+def find_chinese(line: str) -> Tuple[str, str]:
+    """Return the escapes in ``line`` and the characters they decode to."""
+    escapes = "".join(CHINESE_RE.findall(line))
+    return escapes, decode_escapes(escapes)
+
+
+def _annotate_line(match: "re.Match") -> str:
+    line = match.group(0)
+    return line + "  ## " + " -> ".join(find_chinese(line))
+
+
+def annotate_chinese(text: str) -> str:
+    """Append ``  ## _XX_XX_XX -> 中`` to every line with escapes, in one pass."""
+    return CHINESE_LINE_RE.sub(_annotate_line, text)
+
+
+def strip_annotations(text: str) -> str:
+    """Remove the comments added by ``annotate_chinese``."""
+    return ANNOTATION_RE.sub("", text)
+
+
+def escape_identifier(name: str) -> str:
+    """Escape the non-ASCII characters of an identifier."""
+    if name.isascii():
+        return name
+    return "".join(
+        char if char.isascii() else "".join(f"_{byte:02X}" for byte in char.encode())
+        for char in name
+    )
+
+
+def encode_chinese(code: str) -> str:
+    """Escape every non-ASCII identifier in ``code``; strings and comments are kept.
+
+    Code that cannot be tokenized is handled with a regular expression instead,
+    which does not skip strings and comments.
+    """
+    if code.isascii():
+        return code
+    # Split like tokenize does: str.splitlines also breaks at \x0c, \u2028 etc.
+    lines = io.StringIO(code).readlines()
+    replacements: List[Tuple[int, int, int, str]] = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.NAME and not token.string.isascii():
+                (row, start), (_, end) = token.start, token.end
+                replacements.append((row - 1, start, end, escape_identifier(token.string)))
+    except (tokenize.TokenError, SyntaxError):
+        return IDENTIFIER_RE.sub(lambda match: escape_identifier(match.group(0)), code)
+    # Replace from the end of each line so earlier columns stay valid.
+    for row, start, end, escaped in reversed(replacements):
+        line = lines[row]
+        lines[row] = line[:start] + escaped + line[end:]
+    return "".join(lines)
@@ -0,0 +1,201 @@
+"""
+AES-CBC cipher backends.
+AES-CBC 加密后端
+
+The codec only needs raw AES-CBC (the PKCS7 padding is done by ``DspFile``).
+It is provided by ``cryptography`` (OpenSSL, AES-NI where available) or by
+``pycryptodome``. The first installed backend in ``BACKENDS`` order is used,
+unless the ``DSPY_TOOL_CIPHER_BACKEND`` environment variable or ``set_backend``
+names another one. Backends are imported on first use.
+
+Print the throughput of each installed backend with::
+
+    python -m dspy_tool.dsp_codec.cipher
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+BACKEND_ENV = "DSPY_TOOL_CIPHER_BACKEND"
+BLOCK_SIZE = 16
+# Bytes passed to OpenSSL per call when decrypting into a caller's buffer.
+STAGING_SIZE = 1 << 20
+
+
+class CipherBackend(ABC):
+    """ Cipher backend class """
+
+    name = ""
+
+    @abstractmethod
+    def load(self):
+        """Import the library. Raises ImportError if it is not installed."""
+
+    @abstractmethod
+    def new(self, key: bytes, iv: bytes):
+        """Create an AES-CBC cipher with ``encrypt(data)`` and ``decrypt(data, output=None)``.
+
+        Like pycryptodome's, a cipher is stateful and used for one direction only.
+        """
+
+
+class PycryptodomeBackend(CipherBackend):
+    """ pycryptodome backend class """
+
+    name = "pycryptodome"
+
+    def load(self):
+        from Crypto.Cipher import AES
+
+        self._aes = AES
+
+    def new(self, key: bytes, iv: bytes):
+        return self._aes.new(key, self._aes.MODE_CBC, iv)
+
+
+class CryptographyBackend(CipherBackend):
+    """ cryptography backend class """
+
+    name = "cryptography"
+
+    def load(self):
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        self._cipher = Cipher
+        self._algorithm = algorithms.AES
+        self._mode = modes.CBC
+
+    def new(self, key: bytes, iv: bytes):
+        return _CryptographyCbc(self._cipher(self._algorithm(key), self._mode(iv)))
+
+
+class _CryptographyCbc:
+    """ AES-CBC cipher with the pycryptodome interface """
+
+    __slots__ = ("_cipher", "_context")
+
+    def __init__(self, cipher):
+        self._cipher = cipher
+        self._context = None
+
+    def encrypt(self, data) -> bytes:
+        if self._context is None:
+            self._context = self._cipher.encryptor()
+        return self._context.update(data)
+
+    def decrypt(self, data, output=None):
+        if self._context is None:
+            self._context = self._cipher.decryptor()
+        if output is None:
+            return self._context.update(data)
+
+        # update_into wants block_size - 1 spare bytes, so it cannot write to
+        # ``output`` (which may be ``data``) directly.
+        source = memoryview(data)
+        target = memoryview(output)
+        staging = bytearray(min(len(source), STAGING_SIZE) + BLOCK_SIZE - 1)
+        position = 0
+        try:
+            for start in range(0, len(source), STAGING_SIZE):
+                with source[start:start + STAGING_SIZE] as chunk:
+                    size = self._context.update_into(chunk, staging)
+                target[position:position + size] = staging[:size]
+                position += size
+        finally:
+            source.release()
+            target.release()
+        return None
+
+
+# In order of preference; OpenSSL is usually about twice as fast.
+BACKENDS: Dict[str, CipherBackend] = {
+    backend.name: backend for backend in (CryptographyBackend(), PycryptodomeBackend())
+}
+
+_backend: Optional[CipherBackend] = None
+
+
+def set_backend(name: Optional[str] = None) -> CipherBackend:
+    """Select the cipher backend. 选择加密后端
+
+    Args:
+        name (str, optional): the backend name. Defaults to ``$DSPY_TOOL_CIPHER_BACKEND``,
+            or the fastest installed backend if unset
+
+    Raises:
+        ValueError: Unknown backend
+        ImportError: The backend is not installed
+
+    Returns:
+        CipherBackend: the selected backend
+    """
+    global _backend
+    name = name or os.environ.get(BACKEND_ENV)
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown cipher backend {name!r}, expected one of {', '.join(BACKENDS)}")
+        backend = BACKENDS[name]
+        backend.load()
+    else:
+        for backend in BACKENDS.values():
+            try:
+                backend.load()
+                break
+            except ImportError:
+                continue
+        else:
+            raise ImportError("No cipher backend installed, please install pycryptodome or cryptography")
+    _backend = backend
+    return backend
+
+
+def get_backend() -> CipherBackend:
+    """Return the selected cipher backend, selecting one on first use. 返回当前加密后端"""
+    return _backend or set_backend()
+
+
+def new_cipher(key: bytes, iv: bytes):
+    """Create an AES-CBC cipher with the selected backend. 创建 AES-CBC 加密器"""
+    return get_backend().new(key, iv)
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Print the throughput of each AES-CBC backend.")
+    parser.add_argument("--size", type=int, default=32, help="data size in MiB. (default: 32)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs, the best is kept.")
+    args = parser.parse_args()
+
+    key, iv = os.urandom(16), os.urandom(16)
+    data = os.urandom(args.size << 20)
+    buffer = bytearray(len(data))
+    selected = get_backend()
+    print(f"{'backend':<14} {'encrypt':>13} {'decrypt':>13} {'in place':>13}")
+    for backend in BACKENDS.values():
+        try:
+            backend.load()
+        except ImportError:
+            print(f"{backend.name:<14} {'not installed':>13}")
+            continue
+        results = []
+        for run in (
+            lambda: backend.new(key, iv).encrypt(data),
+            lambda: backend.new(key, iv).decrypt(data),
+            lambda: backend.new(key, iv).decrypt(buffer, output=buffer),
+        ):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - start)
+            results.append(f"{len(data) / best / 2**20:8.1f} MiB/s")
+        marker = " *" if backend is selected else ""
+        print(f"{backend.name:<14} {results[0]:>13} {results[1]:>13} {results[2]:>13}{marker}")
+    print(f"\n* selected, override with {BACKEND_ENV}=<name>")
+
+
+if __name__ == "__main__":
+    main()
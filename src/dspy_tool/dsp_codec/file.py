@@ -4,36 +4,142 @@ DSP 文件格式
 """
 
 import base64
+import binascii
 import hashlib
+import io
+import mmap
 import os
 import re
 
+from contextlib import nullcontext
 from datetime import datetime
+from typing import TYPE_CHECKING, BinaryIO, ContextManager, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from uuid import uuid4
-from Crypto.Cipher import AES
 
+from dspy_tool.dsp_codec.cipher import new_cipher
 from dspy_tool.dsp_codec.internal.attribute import Attribute
 from dspy_tool.dsp_codec.internal.code import Code
 from dspy_tool.dsp_codec.internal.dji import Dji
 from dspy_tool.dsp_codec.internal.fvd import FirmwareVersionDependency
 from dspy_tool.dsp_codec.internal.code_type import CodeType
+from dspy_tool.dsp_codec.internal.parser import UnsupportedXml, find_python_code, parse_attribute
+from dspy_tool.dsp_codec.timings import get_recorder, stage
+
+if TYPE_CHECKING:
+    from dspy_tool.dsp_codec.cache import CacheEntry, DecodeCache
 
 # Extracted from DJI's RoboMaster S1 app.
 DSP_KEY = b"TRoP4GWuc30k6WUp"
 DSP_IV = b"bP3crVEO6wABzOc0"
 DSP_MKEY = "wwxnMmF8"
+AES_BLOCK_SIZE = 16
+
+# The attribute block always comes first in the XML, so the header can be
+# decrypted without touching the (possibly huge) code block.
+HEADER_START = b"<attribute>"
+HEADER_END = b"</attribute>"
+# Base64 characters read per step when decoding the header, a multiple of 4.
+HEADER_CHUNK_SIZE = 1024
+
+# Base64 characters decoded per step by decode_dsp_buffer, a multiple of 4.
+BASE64_CHUNK_SIZE = 1 << 18
+
+# Ciphertexts at least this large are decrypted in chunks on a thread pool.
+PARALLEL_DECRYPT_THRESHOLD = 8 << 20
+# Bytes decrypted per task in parallel mode, a multiple of AES_BLOCK_SIZE.
+PARALLEL_DECRYPT_CHUNK_SIZE = 1 << 20
 
 FILE_NAME_COMPILE = re.compile(
     r"^(?P<file_name>.*?)([_-](\d{14}|[a-zA-Z0-9]{32}))*(([_\-\.]raw)?\.(dsp|py|xml))?$"
 )
 
 
+def _new_cipher(iv: bytes = DSP_IV):
+    """Create the DSP AES-CBC cipher. The cipher backend is imported on first use."""
+    return new_cipher(DSP_KEY, iv)
+
+
+def decrypt_cbc(data, output=None, jobs: Optional[int] = None):
+    """Decrypt the DSP ciphertext. 解密 DSP 密文
+    CBC 解密时每个块只依赖前一个密文块，因此大数据按块边界切分后在线程池中并行解密。
+
+    Args:
+        data (bytes-like): the ciphertext, a multiple of the block size
+        output (bytes-like, optional): writable buffer for the plaintext, may be ``data`` itself
+        jobs (int, optional): number of threads. Defaults to one per CPU for
+            ciphertexts of at least PARALLEL_DECRYPT_THRESHOLD bytes, otherwise 1
+
+    Returns:
+        bytes: the plaintext, or None if ``output`` is given
+    """
+    size = len(data)
+    if jobs is None:
+        jobs = (os.cpu_count() or 1) if size >= PARALLEL_DECRYPT_THRESHOLD else 1
+    starts = range(0, size, PARALLEL_DECRYPT_CHUNK_SIZE)
+    if jobs <= 1 or len(starts) <= 1:
+        return _new_cipher().decrypt(data, output=output)
+
+    result = None
+    if output is None:
+        output = result = bytearray(size)
+    source = memoryview(data)
+    target = memoryview(output)
+    # Decrypting in place overwrites the ciphertext, so every chunk's IV (the
+    # ciphertext block in front of it) has to be copied out beforehand.
+    ivs = [DSP_IV] + [bytes(source[start - AES_BLOCK_SIZE:start]) for start in starts[1:]]
+
+    def decrypt_chunk(start: int, iv: bytes):
+        end = start + PARALLEL_DECRYPT_CHUNK_SIZE
+        with source[start:end] as chunk, target[start:end] as chunk_output:
+            _new_cipher(iv).decrypt(chunk, output=chunk_output)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        with ThreadPoolExecutor(min(jobs, len(starts))) as executor:
+            for _ in executor.map(decrypt_chunk, starts, ivs):
+                pass
+    finally:
+        source.release()
+        target.release()
+    return None if result is None else bytes(result)
+
+
+def map_file(file: BinaryIO) -> ContextManager[Union[mmap.mmap, bytes]]:
+    """Memory-map an open file read-only. 以只读方式映射文件
+
+    Empty files cannot be mapped, so ``b""`` is used for them. Streams without
+    a file descriptor (members of an archive) are read into memory. While
+    timings are recorded the pages are faulted in under a "read" stage, so the
+    file I/O is not counted as part of decoding.
+    """
+    try:
+        fileno = file.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        with stage("read") as timer:
+            data = file.read()
+            timer.size = len(data)
+        return nullcontext(data)
+    size = os.fstat(fileno).st_size
+    if size == 0:
+        return nullcontext(b"")
+    if get_recorder() is None:
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    with stage("read", size):
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        # A strided slice touches every page in one C loop.
+        mapped[::mmap.PAGESIZE]
+    return mapped
+
+
 class DspFile:
     """DSP file class."""
 
     def __init__(self, dji: Dji, file_name: str):
         self.dji = dji
         self.file_name = file_name
+        # (attribute revision, code revision, firmware version, signature)
+        self._signature: Optional[Tuple[int, int, str, str]] = None
 
     @staticmethod
     def compute_guid() -> str:
@@ -66,7 +172,7 @@ class DspFile:
         Returns:
             bytes: the padded data
         """
-        padding = AES.block_size - (len(data) % AES.block_size)
+        padding = AES_BLOCK_SIZE - (len(data) % AES_BLOCK_SIZE)
         return data + bytes([padding] * padding)
 
     @staticmethod
@@ -83,7 +189,7 @@ class DspFile:
             bytes: the unpadded data
         """
         padding = data[-1]
-        if padding > AES.block_size or data[-padding:] != bytes([padding] * padding):
+        if padding > AES_BLOCK_SIZE or data[-padding:] != bytes([padding] * padding):
             raise ValueError("Invalid PKCS7 padding")
         return data[:-padding]
 
@@ -97,13 +203,151 @@ class DspFile:
         Returns:
             bytes: the decoded data
         """
-        cipher_text = base64.standard_b64decode(raw_byte)
+        with stage("base64_decode", len(raw_byte)):
+            cipher_text = base64.standard_b64decode(raw_byte)
+
+        with stage("aes_decrypt", len(cipher_text)):
+            plain_byte = decrypt_cbc(cipher_text)
 
-        cipher = AES.new(DSP_KEY, AES.MODE_CBC, DSP_IV)
-        plain_byte = DspFile._pkcs7_unpad(cipher.decrypt(cipher_text))
+        with stage("pkcs7_unpad", len(plain_byte)):
+            plain_byte = DspFile._pkcs7_unpad(plain_byte)
 
         return plain_byte
 
+    @staticmethod
+    def decode_dsp_buffer(raw_byte: Union[bytes, bytearray, memoryview, mmap.mmap]) -> bytearray:
+        """Decode the DSP data with as few copies as possible. 以尽量少的内存复制解码 DSP 数据
+        base64 分块解码到预先分配的缓冲区，并在原地解密、去填充。
+
+        Args:
+            raw_byte (bytes-like): the raw data, e.g. a memory-mapped file
+
+        Raises:
+            ValueError: Invalid PKCS7 padding
+
+        Returns:
+            bytearray: the decoded data
+        """
+        data = memoryview(raw_byte)
+        end = len(data)
+        while end and data[end - 1] in b" \t\r\n":
+            end -= 1
+        view = data[:end]
+        try:
+            with stage("base64_decode", len(view)):
+                buffer = bytearray(len(view) // 4 * 3)
+                size = 0
+                try:
+                    for start in range(0, len(view), BASE64_CHUNK_SIZE):
+                        with view[start:start + BASE64_CHUNK_SIZE] as piece:
+                            chunk = binascii.a2b_base64(piece)
+                            piece_size = len(piece)
+                        # a2b_base64 skips characters outside the alphabet, which
+                        # shows up as a short chunk before the last one.
+                        if len(chunk) != piece_size // 4 * 3 and start + piece_size < len(view):
+                            raise binascii.Error("Non-alphabet characters in base64 data")
+                        buffer[size:size + len(chunk)] = chunk
+                        size += len(chunk)
+                    del buffer[size:]
+                except binascii.Error:
+                    # Line-wrapped base64 is rare; decode it the simple way.
+                    buffer = bytearray(base64.standard_b64decode(view))
+                    size = len(buffer)
+        finally:
+            # A live view would stop the caller from closing its mmap.
+            view.release()
+            data.release()
+
+        with stage("aes_decrypt", size):
+            decrypt_cbc(buffer, buffer)
+
+        with stage("pkcs7_unpad", size):
+            padding = buffer[-1] if buffer else 0
+            if not 0 < padding <= AES_BLOCK_SIZE or buffer[-padding:] != bytes([padding] * padding):
+                raise ValueError("Invalid PKCS7 padding")
+            del buffer[-padding:]
+
+        return buffer
+
+    @staticmethod
+    def decode_dsp_cached(raw_byte: Union[bytes, bytearray, memoryview, mmap.mmap], cache: "DecodeCache") -> "CacheEntry":
+        """Decode the DSP data through the decode cache. 通过解码缓存解码 DSP 数据
+
+        Args:
+            raw_byte (bytes-like): the raw data, e.g. a memory-mapped file
+            cache (DecodeCache): the decode cache
+
+        Returns:
+            CacheEntry: the decoded data and the span of the python code in it
+        """
+        from dspy_tool.dsp_codec.cache import hash_key
+
+        with stage("cache_lookup", len(raw_byte)):
+            key = hash_key(raw_byte)
+            entry = cache.get(key)
+        if entry is None:
+            xml_data = DspFile.decode_dsp_buffer(raw_byte)
+            entry = (xml_data, find_python_code(xml_data))
+            with stage("cache_store", len(xml_data)):
+                cache.put(key, *entry)
+        return entry
+
+    @staticmethod
+    def decode_dsp_header(stream: BinaryIO) -> bytes:
+        """Decode the leading part of the DSP file up to the end of the attribute block.
+        解码 DSP 文件开头直到 attribute 块结束的部分
+
+        Args:
+            stream (BinaryIO): the raw data stream
+
+        Raises:
+            ValueError: No attribute block found
+
+        Returns:
+            bytes: the decoded data, ending with ``</attribute>``
+        """
+        cipher = _new_cipher()
+        plain_byte = bytearray()
+        base64_carry = b""
+        cipher_carry = b""
+        while True:
+            chunk = stream.read(HEADER_CHUNK_SIZE)
+            if not chunk:
+                break
+            base64_text = base64_carry + chunk.translate(None, b" \t\r\n")
+            usable = len(base64_text) - len(base64_text) % 4
+            base64_carry = base64_text[usable:]
+            cipher_text = cipher_carry + base64.standard_b64decode(base64_text[:usable])
+            usable = len(cipher_text) - len(cipher_text) % AES_BLOCK_SIZE
+            cipher_carry = cipher_text[usable:]
+            start = max(0, len(plain_byte) - len(HEADER_END))
+            plain_byte += cipher.decrypt(cipher_text[:usable])
+            end = plain_byte.find(HEADER_END, start)
+            if end != -1:
+                return bytes(plain_byte[: end + len(HEADER_END)])
+        raise ValueError("No attribute block found")
+
+    @staticmethod
+    def read_attribute(stream: BinaryIO) -> Attribute:
+        """Read the attribute without decoding the code block. 只读取属性，不解码代码部分
+
+        Args:
+            stream (BinaryIO): the raw data stream
+
+        Returns:
+            Attribute: the attribute
+        """
+        header = DspFile.decode_dsp_header(stream)
+        start = header.find(HEADER_START)
+        if start == -1:
+            raise ValueError("No attribute block found")
+        try:
+            return parse_attribute(header, start)
+        except (UnsupportedXml, UnicodeDecodeError):
+            import xml.etree.ElementTree as ET
+
+            return Attribute.from_xml_element(ET.fromstring(header[start:]))
+
     @staticmethod
     def encode_dsp(plain_byte: bytes) -> bytes:
         """Encode the DSP file. 编码 DSP 文件
@@ -114,12 +358,15 @@ class DspFile:
         Returns:
             bytes: the encoded data
         """
-        plain_byte = DspFile._pkcs7_pad(plain_byte)
+        with stage("pkcs7_pad", len(plain_byte)):
+            plain_byte = DspFile._pkcs7_pad(plain_byte)
 
-        cipher = AES.new(DSP_KEY, AES.MODE_CBC, DSP_IV)
-        cipher_text = cipher.encrypt(plain_byte)
+        with stage("aes_encrypt", len(plain_byte)):
+            cipher = _new_cipher()
+            cipher_text = cipher.encrypt(plain_byte)
 
-        base64_text = base64.standard_b64encode(cipher_text)
+        with stage("base64_encode", len(cipher_text)):
+            base64_text = base64.standard_b64encode(cipher_text)
 
         return base64_text
 
@@ -146,6 +393,7 @@ class DspFile:
         title: str = "Untitled",
         python_code: str = "",
         file_name: str = "",
+        guid: str = "",
     ) -> "DspFile":
         """Create a new DSP file with Python code. 创建一个新的带有 Python 代码的 DSP 文件
 
@@ -154,6 +402,7 @@ class DspFile:
             title (str, optional): the title. Defaults to "Untitled".
             python_code (str, optional): the existing python code. Defaults to "".
             file_name (str, optional): the file name. Defaults to "".
+            guid (str, optional): the GUID, to keep the one of an earlier version. Defaults to a new one.
 
         Raises:
             ValueError: Error Values
@@ -168,7 +417,7 @@ class DspFile:
         if not title:
             raise ValueError("Title cannot be empty")
 
-        guid = cls.compute_guid()
+        guid = guid or cls.compute_guid()
 
         dji = Dji(
             attribute=Attribute(
@@ -196,21 +445,109 @@ class DspFile:
         """Load a DSP file. 加载一个 DSP 文件
 
         Args:
-            path (str): the path of the DSP file.
+            path (str): the path of the DSP file, which may be inside a zip archive.
 
         Returns:
             DspFile: DspFile object
         """
-        with open(path, "rb") as file:
-            dsp_data = file.read()
+        from dspy_tool.dsp_codec.archive import open_binary
+
+        with open_binary(path) as file, map_file(file) as dsp_data:
+            return cls.loads(dsp_data, cls.get_file_name(os.path.basename(path)))
+
+    @classmethod
+    def loads(cls, dsp_data: Union[bytes, bytearray, memoryview, mmap.mmap], file_name: str = "") -> "DspFile":
+        """Load a DSP file from its content. 从文件内容加载 DSP 文件
 
-        xml_data = cls.decode_dsp(dsp_data)
-        dji = Dji.from_xml_string(xml_data.decode())
+        Args:
+            dsp_data (bytes-like): the content of the DSP file
+            file_name (str, optional): the file name. Defaults to "".
 
-        file_name = cls.get_file_name(os.path.basename(path))
+        Returns:
+            DspFile: DspFile object
+        """
+        # Imported here: the cache and archive modules are not needed to start the CLI.
+        from dspy_tool.dsp_codec.cache import get_cache
+
+        cache = get_cache()
+        if cache is None:
+            xml_data = cls.decode_dsp_buffer(dsp_data)
+        else:
+            xml_data, _ = cls.decode_dsp_cached(dsp_data, cache)
+        with stage("xml_parse", len(xml_data)):
+            dji = Dji.from_xml_bytes(xml_data)
 
         return cls(dji, file_name)
 
+    @classmethod
+    async def aload(cls, path: str) -> "DspFile":
+        """Load a DSP file without blocking the event loop. 异步加载 DSP 文件
+        文件读取与 XML 解析在 I/O 执行器中进行，解码在编解码执行器中进行 (见 ``dspy_tool.dsp_codec.aio``)。
+        与 ``load`` 一样支持压缩包中的文件，并使用解码缓存。
+
+        Args:
+            path (str): the path of the DSP file, which may be inside a zip archive.
+
+        Returns:
+            DspFile: DspFile object
+        """
+        from dspy_tool.dsp_codec.aio import read_file, run_codec, run_io
+        from dspy_tool.dsp_codec.cache import get_cache
+
+        # Looked up here: the cache setting may be local to the calling thread.
+        cache = get_cache()
+        dsp_data = await run_io(read_file, path)
+        if cache is None:
+            xml_data = await run_codec(cls.decode_dsp_buffer, dsp_data)
+        else:
+            xml_data, _ = await run_codec(cls.decode_dsp_cached, dsp_data, cache)
+        dji = await run_io(Dji.from_xml_bytes, xml_data)
+        return cls(dji, cls.get_file_name(os.path.basename(path)))
+
+    @staticmethod
+    async def adecode(raw_byte: bytes) -> bytes:
+        """Decode the DSP file on the codec executor. 异步解码 DSP 文件
+
+        Args:
+            raw_byte (bytes): the raw data
+
+        Returns:
+            bytes: the decoded data
+        """
+        from dspy_tool.dsp_codec.aio import run_codec
+
+        return await run_codec(DspFile.decode_dsp, raw_byte)
+
+    @staticmethod
+    async def aencode(plain_byte: bytes) -> bytes:
+        """Encode the DSP file on the codec executor. 异步编码 DSP 文件
+
+        Args:
+            plain_byte (bytes): the plain data
+
+        Returns:
+            bytes: the encoded data
+        """
+        from dspy_tool.dsp_codec.aio import run_codec
+
+        return await run_codec(DspFile.encode_dsp, plain_byte)
+
+    @staticmethod
+    def load_header(path: str) -> Attribute:
+        """Load only the attribute of a DSP file. 仅加载 DSP 文件的属性
+        耗时只与属性部分的大小有关，与代码大小无关。
+
+        Args:
+            path (str): the path of the DSP file, which may be inside a zip archive.
+
+        Returns:
+            Attribute: the attribute
+        """
+        from dspy_tool.dsp_codec.archive import open_binary
+
+        with open_binary(path) as file:
+            return DspFile.read_attribute(file)
+
     def set_python_code(self, python_code: str) -> None:
         """Set the Python code. 设置 Python 代码
 
@@ -233,13 +570,19 @@ class DspFile:
         Returns:
             bytes: DSP data
         """
-        self.compute_signature()
-
-        xml_data = self.dji.get_xml_string()
-        dsp_data = self.encode_dsp(xml_data.encode())
+        dsp_data = self.encode_dsp(self._get_xml_data())
 
         return dsp_data
 
+    def _get_xml_data(self) -> bytes:
+        with stage("signature"):
+            self.compute_signature()
+
+        with stage("xml_serialize") as timer:
+            xml_data = self.dji.get_xml_string().encode()
+            timer.size = len(xml_data)
+        return xml_data
+
     def save(
         self, path: str, file_name: str = "", change_modify_time: bool = True
     ) -> None:
@@ -256,30 +599,150 @@ class DspFile:
         if not file_name:
             file_name = f"{self.file_name}_{self.dji.attribute.guid}.dsp"
 
-        with open(os.path.join(path, file_name), "wb") as file:
+        with stage("write", len(dsp_data)), open(os.path.join(path, file_name), "wb") as file:
             file.write(dsp_data)
 
+    def save_to_bundle(self, writer, file_name: str = "", change_modify_time: bool = True):
+        """Save the DSP file into a bundle. 保存 DSP 文件到程序包
+
+        Args:
+            writer (BundleWriter): the bundle being written
+            file_name (str, optional): the name in the bundle. Defaults to the name ``save`` uses.
+
+        Returns:
+            BundleEntry: the entry of the file
+        """
+        if change_modify_time:
+            self.dji.attribute.modify_time = datetime.now()
+
+        dsp_data = self.get_dsp_data()
+
+        if not file_name:
+            file_name = f"{self.file_name}_{self.dji.attribute.guid}.dsp"
+
+        attribute = self.dji.attribute
+        return writer.add_data(file_name, dsp_data, attribute.title, attribute.guid)
+
+    @classmethod
+    def load_from_bundle(cls, path: str, name: str) -> "DspFile":
+        """Load one DSP file from a bundle, without reading the others. 从程序包加载 DSP 文件
+
+        Args:
+            path (str): the path of the bundle
+            name (str): the name of the file in the bundle
+
+        Returns:
+            DspFile: DspFile object
+        """
+        from dspy_tool.dsp_codec.bundle import Bundle
+
+        with Bundle(path) as bundle:
+            return bundle.load(name)
+
+    async def asave(
+        self, path: str, file_name: str = "", change_modify_time: bool = True
+    ) -> None:
+        """Save the DSP file without blocking the event loop. 异步保存 DSP 文件
+
+        Args:
+            path (str): the path of the DSP file.
+        """
+        from dspy_tool.dsp_codec.aio import run_io, write_file
+
+        if change_modify_time:
+            self.dji.attribute.modify_time = datetime.now()
+
+        xml_data = await run_io(self._get_xml_data)
+        dsp_data = await self.aencode(xml_data)
+
+        if not file_name:
+            file_name = f"{self.file_name}_{self.dji.attribute.guid}.dsp"
+
+        await run_io(write_file, os.path.join(path, file_name), dsp_data)
+
     def calc_signature(self) -> str:
         """Calculate the signature. 计算签名
         不确保计算出来的签名与 DJI 官方的签名一致。现有 Robomaster App 不会检查签名是否正确。
+        签名会被缓存，直到参与签名的字段被修改。
 
         Returns:
             str: the signature
         """
-        md5_source = (
-            DSP_MKEY
-            + self.dji.attribute.creation_date.strftime("%Y/%m/%d")
-            + self.dji.attribute.title
-            + self.dji.attribute.creator
-            + self.dji.attribute.firmware_version_dependency.value
-            + self.dji.attribute.guid
-            + self.dji.code.python_code
-            + self.dji.code.scratch_description
-            + self.dji.attribute.code_type.name.lower()
+        attribute = self.dji.attribute
+        code = self.dji.code
+        # FirmwareVersionDependency can be changed in place, so its value is compared too.
+        firmware_version = attribute.firmware_version_dependency.value
+        cached = self._signature
+        if cached is not None and cached[:3] == (attribute.revision, code.revision, firmware_version):
+            return cached[3]
+
+        md5 = hashlib.md5(DSP_MKEY.encode())
+        md5.update(
+            (
+                attribute.creation_date.strftime("%Y/%m/%d")
+                + attribute.title
+                + attribute.creator
+                + firmware_version
+                + attribute.guid
+            ).encode()
         )
-        md5_sum = hashlib.md5(md5_source.encode()).hexdigest()
-        return md5_sum[7:23]
+        code.update_hash(md5)
+        md5.update(attribute.code_type.name.lower().encode())
+        signature = md5.hexdigest()[7:23]
+        self._signature = (attribute.revision, code.revision, firmware_version, signature)
+        return signature
 
     def compute_signature(self) -> None:
         """Compute the signature. 计算签名"""
         self.dji.attribute.sign = self.calc_signature()
+
+
+class SignatureCheck(NamedTuple):
+    """The result of checking the signature of one DSP file."""
+    path: str
+    sign: Optional[str] = None
+    expected: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.sign == self.expected
+
+
+def verify_signatures(paths: Iterable[str]) -> Iterator[SignatureCheck]:
+    """Check the signature of each DSP file. 批量校验 DSP 文件签名
+    代码不会被解码为字符串，直接对解密后的数据计算签名。
+
+    Args:
+        paths (Iterable[str]): the paths of the DSP files
+
+    Yields:
+        SignatureCheck: the result for each file, in order. Files that cannot be
+            decoded are reported with ``error`` set instead of raising.
+    """
+    for path in paths:
+        try:
+            dsp_file = DspFile.load(path)
+            yield SignatureCheck(path, dsp_file.dji.attribute.sign, dsp_file.calc_signature())
+        except Exception as e:
+            yield SignatureCheck(path, error=f"{type(e).__name__}: {e}")
+
+
+async def aload_many(
+    paths: Iterable[str], limit: Optional[int] = None, return_exceptions: bool = False
+) -> List[Union[DspFile, BaseException]]:
+    """Load DSP files concurrently without blocking the event loop. 异步批量加载 DSP 文件
+
+    Args:
+        paths (Iterable[str]): the paths of the DSP files
+        limit (int, optional): the maximum number of files loaded at once. Defaults to
+            ``dspy_tool.dsp_codec.aio.DEFAULT_CONCURRENCY``
+        return_exceptions (bool, optional): put the exception of a file that cannot be
+            loaded in the result instead of raising it. Defaults to False.
+
+    Returns:
+        list: the DspFile objects, in the order of ``paths``
+    """
+    from dspy_tool.dsp_codec.aio import DEFAULT_CONCURRENCY, gather_limited
+
+    return await gather_limited(DspFile.aload, paths, limit or DEFAULT_CONCURRENCY, return_exceptions)
@@ -1,14 +1,86 @@
 """ Attribute class """
 
 from datetime import datetime
-import xml.etree.ElementTree as ET
+from itertools import count
+from typing import TYPE_CHECKING, Dict, Optional, Union
 from uuid import uuid4
 
 from dspy_tool.dsp_codec.internal.code_type import CodeType
 from dspy_tool.dsp_codec.internal.fvd import FirmwareVersionDependency
 
+if TYPE_CHECKING:
+    # ElementTree is only needed by the XML element API, so it is imported lazily.
+    import xml.etree.ElementTree as ET
+
+CREATION_DATE_FORMAT = "%Y/%m/%d"
+MODIFY_TIME_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+
+ATTRIBUTE_FIELDS = (
+    "creation_date",
+    "sign",
+    "modify_time",
+    "guid",
+    "creator",
+    "firmware_version_dependency",
+    "title",
+    "code_type",
+    "app_min_version",
+    "app_max_version",
+)
+
+
+def parse_creation_date(text: str) -> datetime:
+    """ Parse "YYYY/MM/DD", without strptime for the common case """
+    if len(text) == 10 and text[4] == text[7] == "/" and text.replace("/", "").isdigit():
+        return datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]))
+    return datetime.strptime(text, CREATION_DATE_FORMAT)
+
+
+def parse_modify_time(text: str) -> datetime:
+    """ Parse "MM/DD/YYYY hh:mm:ss AM", without strptime for the common case """
+    if len(text) == 22 and text[2] == text[5] == "/" and text[13] == text[16] == ":" \
+            and text[10] == text[19] == " " and text[20:] in ("AM", "PM") \
+            and (text[0:2] + text[3:5] + text[6:10] + text[11:13] + text[14:16] + text[17:19]).isdigit():
+        hour = int(text[11:13])
+        if not 1 <= hour <= 12:
+            raise ValueError(f"time data {text!r} does not match format {MODIFY_TIME_FORMAT!r}")
+        hour = hour % 12 + (12 if text[20:] == "PM" else 0)
+        return datetime(int(text[6:10]), int(text[0:2]), int(text[3:5]),
+                        hour, int(text[14:16]), int(text[17:19]))
+    return datetime.strptime(text, MODIFY_TIME_FORMAT)
+
+
+# Revision numbers are unique across all Attribute and Code objects, so a
+# (attribute revision, code revision) pair identifies the signed content even
+# when a whole Attribute or Code is replaced.
+REVISIONS = count(1)
+
+
+def _raw_or(text: Optional[str], default) -> Union[str, object]:
+    """ Keep non-empty text for lazy parsing, otherwise build the default value """
+    return text if text else default()
+
 
 class Attribute:
+    """ Attribute class
+    creation_date, modify_time, firmware_version_dependency 和 code_type
+    在读取文件时只保存原始文本，第一次访问时才解析。
+    修改参与签名的字段时 revision 会更新，用于判断缓存的签名是否失效。
+    """
+    __slots__ = (
+        "_creation_date",
+        "sign",
+        "_modify_time",
+        "_guid",
+        "_creator",
+        "_firmware_version_dependency",
+        "_title",
+        "_code_type",
+        "app_min_version",
+        "app_max_version",
+        "revision",
+    )
+
     def __init__(self,
                  creation_date: datetime,
                  sign: str,
@@ -31,12 +103,88 @@ class Attribute:
         self.app_min_version = app_min_version
         self.app_max_version = app_max_version
 
-    def get_xml_element(self) -> ET.Element:
+    @property
+    def creation_date(self) -> datetime:
+        value = self._creation_date
+        if isinstance(value, str):
+            value = self._creation_date = parse_creation_date(value)
+        return value
+
+    @creation_date.setter
+    def creation_date(self, value: datetime):
+        self._creation_date = value
+        self.revision = next(REVISIONS)
+
+    @property
+    def modify_time(self) -> datetime:
+        value = self._modify_time
+        if isinstance(value, str):
+            value = self._modify_time = parse_modify_time(value)
+        return value
+
+    @modify_time.setter
+    def modify_time(self, value: datetime):
+        self._modify_time = value
+
+    @property
+    def firmware_version_dependency(self) -> FirmwareVersionDependency:
+        value = self._firmware_version_dependency
+        if isinstance(value, str):
+            value = self._firmware_version_dependency = FirmwareVersionDependency.from_string(value)
+        return value
+
+    @firmware_version_dependency.setter
+    def firmware_version_dependency(self, value: FirmwareVersionDependency):
+        self._firmware_version_dependency = value
+        self.revision = next(REVISIONS)
+
+    @property
+    def code_type(self) -> CodeType:
+        value = self._code_type
+        if isinstance(value, str):
+            value = self._code_type = CodeType(value)
+        return value
+
+    @code_type.setter
+    def code_type(self, value: CodeType):
+        self._code_type = value
+        self.revision = next(REVISIONS)
+
+    @property
+    def guid(self) -> str:
+        return self._guid
+
+    @guid.setter
+    def guid(self, value: str):
+        self._guid = value
+        self.revision = next(REVISIONS)
+
+    @property
+    def creator(self) -> str:
+        return self._creator
+
+    @creator.setter
+    def creator(self, value: str):
+        self._creator = value
+        self.revision = next(REVISIONS)
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str):
+        self._title = value
+        self.revision = next(REVISIONS)
+
+    def get_xml_element(self) -> "ET.Element":
         """ Get XML element """
+        import xml.etree.ElementTree as ET
+
         attribute = ET.Element("attribute")
-        ET.SubElement(attribute, "creation_date").text = self.creation_date.strftime("%Y/%m/%d")
+        ET.SubElement(attribute, "creation_date").text = self.creation_date.strftime(CREATION_DATE_FORMAT)
         ET.SubElement(attribute, "sign").text = self.sign
-        ET.SubElement(attribute, "modify_time").text = self.modify_time.strftime("%m/%d/%Y %I:%M:%S %p")
+        ET.SubElement(attribute, "modify_time").text = self.modify_time.strftime(MODIFY_TIME_FORMAT)
         ET.SubElement(attribute, "guid").text = self.guid
         ET.SubElement(attribute, "creator").text = self.creator
         ET.SubElement(attribute, "firmware_version_dependency").text = self.firmware_version_dependency.value
@@ -47,34 +195,26 @@ class Attribute:
         return attribute
 
     @classmethod
-    def from_xml_element(cls, attribute_xml_element: ET.Element) -> "Attribute":
+    def from_texts(cls, texts: Dict[str, Optional[str]]) -> "Attribute":
+        """ Get Attribute from the text of each field, None for a missing field
+        日期等字段在第一次访问时才解析。
+        """
+        attribute = cls.__new__(cls)
+        attribute._creation_date = _raw_or(texts.get("creation_date"), datetime.now)
+        attribute.sign = texts.get("sign")
+        attribute._modify_time = _raw_or(texts.get("modify_time"), datetime.now)
+        attribute._guid = _raw_or(texts.get("guid"), lambda: str(uuid4()).replace("-", ""))
+        attribute._creator = texts.get("creator")
+        attribute._firmware_version_dependency = _raw_or(
+            texts.get("firmware_version_dependency"), FirmwareVersionDependency)
+        attribute._title = texts.get("title")
+        attribute._code_type = _raw_or(texts.get("code_type"), lambda: CodeType.PYTHON_CODE)
+        attribute.app_min_version = texts.get("app_min_version")
+        attribute.app_max_version = texts.get("app_max_version")
+        attribute.revision = next(REVISIONS)
+        return attribute
+
+    @classmethod
+    def from_xml_element(cls, attribute_xml_element: "ET.Element") -> "Attribute":
         """ Get Attribute from XML element """
-        # return cls(
-        #     datetime.strptime(attribute_xml_element.find("creation_date").text, "%Y/%m/%d"),
-        #     attribute_xml_element.find("sign").text,
-        #     datetime.strptime(attribute_xml_element.find("modify_time").text, "%m/%d/%Y %I:%M:%S %p"),
-        #     attribute_xml_element.find("guid").text,
-        #     attribute_xml_element.find("creator").text,
-        #     FirmwareVersionDependency.from_string(attribute_xml_element.find("firmware_version_dependency").text),
-        #     attribute_xml_element.find("title").text,
-        #     CodeType(attribute_xml_element.find("code_type").text),
-        #     attribute_xml_element.find("app_min_version").text,
-        #     _app_max_version
-        # )
-        return cls(
-            datetime.strptime(attribute_xml_element.findtext("creation_date"), "%Y/%m/%d")\
-                if attribute_xml_element.findtext("creation_date") else datetime.now(),
-            attribute_xml_element.findtext("sign"),
-            datetime.strptime(attribute_xml_element.findtext("modify_time"), "%m/%d/%Y %I:%M:%S %p")\
-                if attribute_xml_element.findtext("modify_time") else datetime.now(),
-            attribute_xml_element.findtext("guid")\
-                if attribute_xml_element.findtext("guid") else str(uuid4()).replace("-", ""),
-            attribute_xml_element.findtext("creator"),
-            FirmwareVersionDependency.from_string(attribute_xml_element.findtext("firmware_version_dependency"))\
-                if attribute_xml_element.findtext("firmware_version_dependency") else FirmwareVersionDependency(),
-            attribute_xml_element.findtext("title"),
-            CodeType(attribute_xml_element.findtext("code_type")\
-                if attribute_xml_element.findtext("code_type") else CodeType.PYTHON_CODE),
-            attribute_xml_element.findtext("app_min_version"),
-            attribute_xml_element.findtext("app_max_version")
-        )
+        return cls.from_texts({name: attribute_xml_element.findtext(name) for name in ATTRIBUTE_FIELDS})
@@ -1,52 +1,84 @@
 """ Code class """
 
-import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Union
 
-# 由于 xml.etree.ElementTree 库不支持 CDATA，所以需要自定义一个 CDATA 类型的元素。
-# 参考：https://stackoverflow.com/questions/174890/how-to-output-cdata-using-elementtree
-# 定义了一个函数 CDATA 和一个自定义的 _serialize_xml 方法，用于生成包含 CDATA 部分的 XML 输出。
-# 注意：由于覆盖了库中内置的方法，所以要注意兼容性问题。
+from dspy_tool.dsp_codec.internal.attribute import REVISIONS
 
-CDATA_HEAD = "![CDATA["
+if TYPE_CHECKING:
+    import xml.etree.ElementTree as ET
 
+# Characters encoded per step when hashing code held as a str.
+HASH_CHUNK_SIZE = 1 << 16
 
-def CDATA(text=""):
-    element = ET.Element(CDATA_HEAD)
-    element.text = text
-    return element
 
+def _update_utf8(hash_object, value: Union[str, bytes]):
+    """ Feed ``value`` to ``hash_object`` as UTF-8 without encoding a whole copy at once """
+    if not isinstance(value, str):
+        hash_object.update(value)
+        return
+    for start in range(0, len(value), HASH_CHUNK_SIZE):
+        hash_object.update(value[start:start + HASH_CHUNK_SIZE].encode())
 
-ET._original_serialize_xml = ET._serialize_xml
 
+class Code:
+    """ Code class
+    读取文件时代码只保存为解密数据的 bytes 切片，第一次访问时才解码为字符串。
+    修改代码时 revision 会更新，用于判断缓存的签名是否失效。
+    """
+    __slots__ = ("_python_code", "_scratch_description", "revision")
 
-def _serialize_xml(write, elem, qnames, namespaces, short_empty_elements, **kwargs) -> None:
-    if elem.tag == CDATA_HEAD:
-        write(f"<{CDATA_HEAD}{elem.text}]]>")
-        return
-    else:
-        return ET._original_serialize_xml(write, elem, qnames, namespaces, short_empty_elements, **kwargs)
+    def __init__(self,
+                 python_code: Union[str, bytes] = "",
+                 scratch_description: Union[str, bytes] = ""):
+        self._python_code = python_code
+        self._scratch_description = scratch_description
+        self.revision = next(REVISIONS)
 
+    @property
+    def python_code(self) -> str:
+        value = self._python_code
+        if not isinstance(value, str):
+            value = self._python_code = str(value, "utf-8")
+        return value
 
-ET._serialize_xml = ET._serialize['xml'] = _serialize_xml
+    @python_code.setter
+    def python_code(self, value: str):
+        self._python_code = value
+        self.revision = next(REVISIONS)
 
+    @property
+    def scratch_description(self) -> str:
+        value = self._scratch_description
+        if not isinstance(value, str):
+            value = self._scratch_description = str(value, "utf-8")
+        return value
 
-class Code:
-    """ Code class """
-    def __init__(self,
-                 python_code: str = "",
-                 scratch_description: str = ""):
-        self.python_code = python_code
-        self.scratch_description = scratch_description
+    @scratch_description.setter
+    def scratch_description(self, value: str):
+        self._scratch_description = value
+        self.revision = next(REVISIONS)
+
+    def update_hash(self, hash_object):
+        """ Feed python_code then scratch_description to ``hash_object`` as UTF-8
+        尚未解码的 bytes 切片直接参与计算，不会被解码。
+        """
+        _update_utf8(hash_object, self._python_code)
+        _update_utf8(hash_object, self._scratch_description)
+
+    def get_xml_element(self) -> "ET.Element":
+        """ Get XML element
+        ElementTree 不支持 CDATA，这里的代码会作为转义后的文本输出 (以前的版本输出 CDATA，见 CHANGELOG.md)；
+        DSP 文件使用的 CDATA 格式由 Dji.get_xml_string 生成。
+        """
+        import xml.etree.ElementTree as ET
 
-    def get_xml_element(self) -> ET.Element:
-        """ Get XML element """
         code = ET.Element("code")
-        ET.SubElement(code, "python_code").append(CDATA(self.python_code))
-        ET.SubElement(code, "scratch_description").append(CDATA(self.scratch_description))
+        ET.SubElement(code, "python_code").text = self.python_code
+        ET.SubElement(code, "scratch_description").text = self.scratch_description
         return code
 
     @classmethod
-    def from_xml_element(cls, code_xml_element: ET.Element) -> "Code":
+    def from_xml_element(cls, code_xml_element: "ET.Element") -> "Code":
         """ Get Code from XML element """
         python_code = code_xml_element.find("python_code").text
         if not python_code:
@@ -1,21 +1,30 @@
 """ This module contains the Dji class. """
 
-import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING
 
 from dspy_tool.dsp_codec.internal.attribute import Attribute
 from dspy_tool.dsp_codec.internal.code import Code
+from dspy_tool.dsp_codec.internal.parser import UnsupportedXml, parse_dji
+from dspy_tool.dsp_codec.internal.serializer import serialize_dji
+
+if TYPE_CHECKING:
+    import xml.etree.ElementTree as ET
 
 
 class Dji:
     """ Dji class """
+    __slots__ = ("attribute", "code")
+
     def __init__(self,
                  attribute: Attribute,
                  code: Code):
         self.attribute = attribute
         self.code = code
 
-    def get_xml_element(self) -> ET.Element:
+    def get_xml_element(self) -> "ET.Element":
         """ Get XML element """
+        import xml.etree.ElementTree as ET
+
         dji = ET.Element("dji")
         dji.append(self.attribute.get_xml_element())
         dji.append(self.code.get_xml_element())
@@ -23,17 +32,29 @@ class Dji:
 
     def get_xml_string(self) -> str:
         """ Get XML string """
-        return ET.tostring(self.get_xml_element(), encoding="unicode", short_empty_elements=False)
+        return serialize_dji(self)
 
     @classmethod
-    def from_xml_element(cls, dji_xml_element: ET.Element) -> "Dji":
+    def from_xml_element(cls, dji_xml_element: "ET.Element") -> "Dji":
         """ Get Dji from XML element """
         return cls(
             Attribute.from_xml_element(dji_xml_element.find("attribute")),
             Code.from_xml_element(dji_xml_element.find("code"))
         )
 
+    @classmethod
+    def from_xml_bytes(cls, dji_xml_bytes: bytes) -> "Dji":
+        """ Get Dji from XML bytes
+        优先使用针对 DSP 结构的快速解析器，无法处理时退回到 ElementTree。
+        """
+        try:
+            return cls(*parse_dji(dji_xml_bytes))
+        except (UnsupportedXml, UnicodeDecodeError):
+            import xml.etree.ElementTree as ET
+
+            return cls.from_xml_element(ET.fromstring(dji_xml_bytes))
+
     @classmethod
     def from_xml_string(cls, dji_xml_string: str) -> "Dji":
         """ Get Dji from XML string """
-        return cls.from_xml_element(ET.fromstring(dji_xml_string))
+        return cls.from_xml_bytes(dji_xml_string.encode())
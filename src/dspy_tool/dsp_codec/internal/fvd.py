@@ -3,6 +3,8 @@
 
 class FirmwareVersionDependency:
     """ FirmwareVersionDependency enum """
+    __slots__ = ("value",)
+
     def __init__(self,
                  part1: int = 0,
                  part2: int = 0,
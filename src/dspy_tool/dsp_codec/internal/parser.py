@@ -0,0 +1,216 @@
+""" Parser for the fixed DSP XML schema """
+
+# 针对 <dji><attribute>…</attribute><code>…</code></dji> 这一固定结构的单遍解析器，
+# 直接处理 decode_dsp 输出的 bytes。遇到无法处理的结构时抛出 UnsupportedXml，
+# 由调用方退回到 xml.etree.ElementTree。
+
+import re
+from typing import Dict, Optional, Tuple
+
+from dspy_tool.dsp_codec.internal.attribute import ATTRIBUTE_FIELDS, Attribute
+from dspy_tool.dsp_codec.internal.code import Code
+
+CDATA_START = b"<![CDATA["
+CDATA_END = b"]]>"
+
+ENTITY_RE = re.compile(rb"&(?:(amp|lt|gt|quot|apos)|#([0-9]+)|#x([0-9a-fA-F]+));")
+ENTITIES = {b"amp": "&", b"lt": "<", b"gt": ">", b"quot": '"', b"apos": "'"}
+WHITESPACE = b" \t\r\n"
+# The characters allowed in an XML 1.0 document.
+XML_CHAR_RE = re.compile("[\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+# What Dji.get_xml_string writes: the attribute fields in a fixed order, no whitespace.
+CANONICAL_ATTRIBUTE_RE = re.compile(
+    rb"<attribute>"
+    + b"".join(b"<" + name.encode() + b">([^<]*)</" + name.encode() + b">" for name in ATTRIBUTE_FIELDS)
+    + rb"</attribute>"
+)
+CANONICAL_CODE_START = b"<code><python_code><![CDATA["
+CANONICAL_CODE_MIDDLE = b"]]></python_code><scratch_description><![CDATA["
+CANONICAL_CODE_END = b"]]></scratch_description></code></dji>"
+PYTHON_CODE_START = b"<python_code><![CDATA["
+PYTHON_CODE_END = b"]]></python_code>"
+
+
+class UnsupportedXml(ValueError):
+    """ The XML is not in the form this parser handles """
+
+
+def _unescape(match: "re.Match") -> str:
+    name, decimal, hexadecimal = match.groups()
+    if name:
+        return ENTITIES[name]
+    try:
+        char = chr(int(decimal) if decimal else int(hexadecimal, 16))
+    except (ValueError, OverflowError):
+        raise UnsupportedXml("Invalid character reference")
+    # NUL, surrogates and the like are not XML characters; ElementTree reports them.
+    if not XML_CHAR_RE.match(char):
+        raise UnsupportedXml("Invalid character reference")
+    return char
+
+
+def _decode_text(raw: bytes) -> str:
+    """ Decode element text the way expat does: normalize newlines, then expand entities """
+    if b"\r" in raw:
+        raw = raw.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if b"&" not in raw:
+        return raw.decode()
+    parts = []
+    position = 0
+    for match in ENTITY_RE.finditer(raw):
+        parts.append(raw[position:match.start()])
+        parts.append(_unescape(match).encode())
+        position = match.end()
+    parts.append(raw[position:])
+    if any(b"&" in part for part in parts[::2]):
+        raise UnsupportedXml("Unknown entity")
+    return b"".join(parts).decode()
+
+
+def _decode_content(data: bytes, start: int, end: int) -> str:
+    """ Decode element content made of text and CDATA sections """
+    if data.find(b"<", start, end) == -1:
+        return _decode_text(data[start:end])
+    parts = []
+    position = start
+    while position < end:
+        cdata = data.find(CDATA_START, position, end)
+        if cdata == -1:
+            cdata = end
+        if data.find(b"<", position, cdata) != -1:
+            raise UnsupportedXml("Unexpected element")
+        if cdata > position:
+            parts.append(_decode_text(data[position:cdata]))
+        if cdata == end:
+            break
+        cdata_end = data.find(CDATA_END, cdata + len(CDATA_START), end)
+        if cdata_end == -1:
+            raise UnsupportedXml("Unterminated CDATA")
+        raw = data[cdata + len(CDATA_START):cdata_end]
+        if b"\r" in raw:
+            raw = raw.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        parts.append(raw.decode())
+        position = cdata_end + len(CDATA_END)
+    return "".join(parts)
+
+
+def _skip_whitespace(data: bytes, position: int, end: int) -> int:
+    while position < end and data[position] in WHITESPACE:
+        position += 1
+    return position
+
+
+def _parse_children(data: bytes, start: int, end: int) -> Dict[str, str]:
+    """ Parse a flat sequence of <name>content</name> elements """
+    children = {}
+    position = _skip_whitespace(data, start, end)
+    while position < end:
+        if data[position] != ord("<"):
+            raise UnsupportedXml("Unexpected text")
+        tag_end = data.find(b">", position, end)
+        if tag_end == -1:
+            raise UnsupportedXml("Unterminated tag")
+        name = data[position + 1:tag_end]
+        if not name.replace(b"_", b"").isalnum():
+            raise UnsupportedXml("Unsupported tag")
+        close = data.find(b"</" + name + b">", tag_end + 1, end)
+        if close == -1:
+            raise UnsupportedXml("Unclosed tag")
+        children[name.decode()] = _decode_content(data, tag_end + 1, close)
+        position = _skip_whitespace(data, close + len(name) + 3, end)
+    return children
+
+
+def _find_block(data: bytes, name: bytes, start: int, end: int) -> Tuple[int, int]:
+    """ Return the content range of the block <name>…</name> that starts at ``start`` """
+    open_tag = b"<" + name + b">"
+    start = _skip_whitespace(data, start, end)
+    if not data.startswith(open_tag, start):
+        raise UnsupportedXml(f"Expected <{name.decode()}>")
+    close = data.rfind(b"</" + name + b">", start, end)
+    if close == -1:
+        raise UnsupportedXml(f"Unclosed <{name.decode()}>")
+    return start + len(open_tag), close
+
+
+def _parse_canonical_attribute(data: bytes, start: int) -> Optional[Tuple[Attribute, int]]:
+    match = CANONICAL_ATTRIBUTE_RE.match(data, start)
+    if match is None:
+        return None
+    return Attribute.from_texts(dict(zip(ATTRIBUTE_FIELDS, map(_decode_text, match.groups())))), match.end()
+
+
+def _parse_canonical(data: bytes, end: int) -> Optional[Tuple[Attribute, Code]]:
+    """ Parse the exact layout written by Dji.get_xml_string, or return None """
+    if not data.startswith(b"<dji>"):
+        return None
+    parsed = _parse_canonical_attribute(data, len(b"<dji>"))
+    if parsed is None:
+        return None
+    attribute, position = parsed
+    if not data.startswith(CANONICAL_CODE_START, position):
+        return None
+    code_start = position + len(CANONICAL_CODE_START)
+    middle = data.find(CANONICAL_CODE_MIDDLE, code_start, end)
+    if middle == -1 or not data.endswith(CANONICAL_CODE_END, 0, end):
+        return None
+    python_code = data[code_start:middle]
+    scratch_description = data[middle + len(CANONICAL_CODE_MIDDLE):end - len(CANONICAL_CODE_END)]
+    # A "]]>" inside means split CDATA sections, and "\r" needs newline normalization.
+    if data.find(CDATA_END, code_start, middle) != -1 \
+            or data.find(CDATA_END, middle + len(CANONICAL_CODE_MIDDLE), end - len(CANONICAL_CODE_END)) != -1 \
+            or data.find(b"\r", code_start, end) != -1:
+        return None
+    # The code stays a bytes slice of the decoded data until it is read.
+    return attribute, Code(python_code, scratch_description)
+
+
+def parse_attribute(data: bytes, start: int = 0, end: int = -1) -> Attribute:
+    """ Parse the <attribute> block found at ``start`` """
+    if end < 0:
+        end = len(data)
+    parsed = _parse_canonical_attribute(data, start)
+    if parsed is not None:
+        return parsed[0]
+    close = data.find(b"</attribute>", start, end)
+    if close == -1:
+        raise UnsupportedXml("Unclosed <attribute>")
+    content_start, content_end = _find_block(data, b"attribute", start, close + len(b"</attribute>"))
+    return Attribute.from_texts(_parse_children(data, content_start, content_end))
+
+
+def parse_dji(data: bytes) -> Tuple[Attribute, Code]:
+    """ Parse the decoded DSP XML in a single pass """
+    end = len(data)
+    while end and data[end - 1] in WHITESPACE:
+        end -= 1
+    parsed = _parse_canonical(data, end)
+    if parsed is not None:
+        return parsed
+    dji_start, dji_end = _find_block(data, b"dji", 0, end)
+    if dji_end + len(b"</dji>") != end:
+        raise UnsupportedXml("Trailing data")
+    attribute_close = data.find(b"</attribute>", dji_start, dji_end)
+    if attribute_close == -1:
+        raise UnsupportedXml("Unclosed <attribute>")
+    attribute = parse_attribute(data, dji_start, attribute_close + len(b"</attribute>"))
+    code_start, code_end = _find_block(data, b"code", attribute_close + len(b"</attribute>"), dji_end)
+    if _skip_whitespace(data, code_end + len(b"</code>"), dji_end) != dji_end:
+        raise UnsupportedXml("Unexpected element")
+    code = _parse_children(data, code_start, code_end)
+    if "python_code" not in code or "scratch_description" not in code:
+        raise UnsupportedXml("Missing code element")
+    return attribute, Code(code["python_code"], code["scratch_description"])
+
+
+def find_python_code(data: bytes) -> Optional[Tuple[int, int]]:
+    """ Return the span of the python_code CDATA content, split sections included, or None """
+    start = data.find(PYTHON_CODE_START)
+    if start == -1:
+        return None
+    start += len(PYTHON_CODE_START)
+    end = data.find(PYTHON_CODE_END, start)
+    if end == -1:
+        return None
+    return start, end
@@ -0,0 +1,64 @@
+""" Serializer for the fixed DSP XML schema """
+
+# 只针对 <dji><attribute>…</attribute><code>…</code></dji> 这一固定结构，
+# 直接拼接字符串，输出与 xml.etree.ElementTree 的结果一致，但无需构建元素树。
+
+CDATA_START = "<![CDATA["
+CDATA_END = "]]>"
+# "]]>" 不能出现在 CDATA 中，需要拆分为两个 CDATA 段。
+CDATA_END_SPLIT = "]]]]><![CDATA[>"
+
+
+def escape_text(text: str) -> str:
+    """ Escape element text, the same way as ElementTree """
+    if not text:
+        return ""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def escape_cdata(text: str) -> str:
+    """ Wrap text in a CDATA section, splitting any "]]>" inside it """
+    if not text:
+        return CDATA_START + CDATA_END
+    if CDATA_END in text:
+        text = text.replace(CDATA_END, CDATA_END_SPLIT)
+    return CDATA_START + text + CDATA_END
+
+
+def serialize_dji(dji) -> str:
+    """ Serialize a Dji object to the XML string """
+    attribute = dji.attribute
+    code = dji.code
+    return "".join((
+        "<dji><attribute><creation_date>",
+        attribute.creation_date.strftime("%Y/%m/%d"),
+        "</creation_date><sign>",
+        escape_text(attribute.sign),
+        "</sign><modify_time>",
+        attribute.modify_time.strftime("%m/%d/%Y %I:%M:%S %p"),
+        "</modify_time><guid>",
+        escape_text(attribute.guid),
+        "</guid><creator>",
+        escape_text(attribute.creator),
+        "</creator><firmware_version_dependency>",
+        escape_text(attribute.firmware_version_dependency.value),
+        "</firmware_version_dependency><title>",
+        escape_text(attribute.title),
+        "</title><code_type>",
+        escape_text(attribute.code_type.value),
+        "</code_type><app_min_version>",
+        escape_text(attribute.app_min_version),
+        "</app_min_version><app_max_version>",
+        escape_text(attribute.app_max_version),
+        "</app_max_version></attribute><code><python_code>",
+        escape_cdata(code.python_code),
+        "</python_code><scratch_description>",
+        escape_cdata(code.scratch_description),
+        "</scratch_description></code></dji>",
+    ))
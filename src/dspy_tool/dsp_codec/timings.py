@@ -0,0 +1,137 @@
+"""
+Per-stage timing instrumentation.
+编解码各阶段耗时统计
+
+The codec calls ``stage(name)`` around each step. Nothing is recorded unless a
+``Timings`` recorder is installed with ``set_recorder``; until then ``stage``
+returns a shared no-op context manager.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, TextIO
+
+
+class Stage:
+    """A running stage. Set ``size`` to the number of bytes processed."""
+
+    __slots__ = ("recorder", "name", "size", "start")
+
+    def __init__(self, recorder: "Timings", name: str, size: int = 0):
+        self.recorder = recorder
+        self.name = name
+        self.size = size
+        self.start = 0.0
+
+    def __enter__(self) -> "Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.add(self.name, time.perf_counter() - self.start, self.size)
+
+
+class _NullStage:
+    """The stage used when timing is off. ``size`` assignments are ignored."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+class Timings:
+    """Records ``{"file", "stage", "seconds", "bytes"}`` for each stage."""
+
+    def __init__(self):
+        self.records: List[Dict] = []
+        self.current_file: Optional[str] = None
+
+    def stage(self, name: str, size: int = 0) -> Stage:
+        return Stage(self, name, size)
+
+    def add(self, name: str, seconds: float, size: int = 0):
+        self.records.append(
+            {"file": self.current_file, "stage": name, "seconds": seconds, "bytes": size}
+        )
+
+    @contextmanager
+    def file(self, path: str) -> Iterator[None]:
+        """Attribute the stages run inside the block to ``path``."""
+        previous, self.current_file = self.current_file, str(path)
+        try:
+            yield
+        finally:
+            self.current_file = previous
+
+    def write_json_lines(self, stream: TextIO):
+        for record in self.records:
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write_histogram(self, stream: TextIO):
+        """Write the per-stage totals, percentiles and a log2 histogram of durations."""
+        stages: Dict[str, List[Dict]] = {}
+        for record in self.records:
+            stages.setdefault(record["stage"], []).append(record)
+        stream.write(
+            f"{'stage':<18}{'count':>7}{'total ms':>11}{'p50 ms':>10}{'p90 ms':>10}"
+            f"{'max ms':>10}{'MiB/s':>9}  histogram (2^n us)\n"
+        )
+        for name, records in stages.items():
+            seconds = sorted(r["seconds"] for r in records)
+            total = sum(seconds)
+            size = sum(r["bytes"] for r in records)
+            buckets: Dict[int, int] = {}
+            for second in seconds:
+                bucket = max(0, int(math.log2(max(second * 1e6, 1))))
+                buckets[bucket] = buckets.get(bucket, 0) + 1
+            histogram = " ".join(f"{b}:{c}" for b, c in sorted(buckets.items()))
+            throughput = f"{size / total / 2**20:9.1f}" if size and total else f"{'-':>9}"
+            stream.write(
+                f"{name:<18}{len(seconds):>7}{total * 1e3:>11.3f}"
+                f"{seconds[len(seconds) // 2] * 1e3:>10.3f}"
+                f"{seconds[min(len(seconds) - 1, int(len(seconds) * 0.9))] * 1e3:>10.3f}"
+                f"{seconds[-1] * 1e3:>10.3f}{throughput}  {histogram}\n"
+            )
+
+
+_recorder: Optional[Timings] = None
+# Per-thread overrides, used by servers handling several requests at once.
+_thread_recorders = threading.local()
+
+
+def set_recorder(recorder: Optional[Timings], thread: bool = False):
+    """Install ``recorder`` for the process, or turn timing off with None.
+
+    With ``thread`` the recorder only applies to the calling thread, and takes
+    precedence over the process-wide one until it is reset to None.
+    """
+    global _recorder
+    if thread:
+        _thread_recorders.recorder = recorder
+    else:
+        _recorder = recorder
+
+
+def get_recorder() -> Optional[Timings]:
+    return getattr(_thread_recorders, "recorder", None) or _recorder
+
+
+def stage(name: str, size: int = 0):
+    """Context manager timing one stage; a no-op while no recorder is installed."""
+    recorder = getattr(_thread_recorders, "recorder", None) or _recorder
+    if recorder is None:
+        return NULL_STAGE
+    return recorder.stage(name, size)
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+import pytest
+
+from dspy_tool.dsp_codec.file import DspFile
+
+
+@pytest.fixture
+def make_dsp():
+    """Return a function writing a DSP file with the given Python code."""
+
+    def make(path: Path, python_code: str = "print(1)\n", title: str = "Untitled") -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(DspFile.new_with_python_code("Anonymous", title, python_code).get_dsp_data())
+        return path
+
+    return make
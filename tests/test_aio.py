@@ -0,0 +1,66 @@
+import asyncio
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from dspy_tool.dsp_codec import aio
+from dspy_tool.dsp_codec import cache as cache_module
+from dspy_tool.dsp_codec.cache import DecodeCache
+from dspy_tool.dsp_codec.file import DspFile, aload_many
+
+
+@pytest.fixture
+def decode_cache(tmp_path, monkeypatch):
+    decode_cache = DecodeCache(tmp_path / "cache")
+    monkeypatch.setattr(cache_module, "_cache", decode_cache)
+    return decode_cache
+
+
+def test_aload_matches_load(make_dsp, tmp_path):
+    path = str(make_dsp(tmp_path / "a.dsp", "print(1)\n", title="A"))
+
+    dsp_file = asyncio.run(DspFile.aload(path))
+
+    assert dsp_file.get_python_code() == DspFile.load(path).get_python_code() == "print(1)\n"
+    assert dsp_file.dji.attribute.title == "A"
+    assert dsp_file.file_name == "a"
+
+
+def test_aload_archive_member(make_dsp, tmp_path):
+    archive = tmp_path / "team.zip"
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.write(make_dsp(tmp_path / "a.dsp", "print(1)\n"), "round1/a.dsp")
+
+    dsp_file = asyncio.run(DspFile.aload(str(archive / "round1" / "a.dsp")))
+
+    assert dsp_file.get_python_code() == "print(1)\n"
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(DspFile.aload(str(archive / "round1" / "missing.dsp")))
+
+
+def test_aload_uses_decode_cache(decode_cache, make_dsp, tmp_path, monkeypatch):
+    path = str(make_dsp(tmp_path / "a.dsp", "print(1)\n"))
+    asyncio.run(DspFile.aload(path))
+    assert len(decode_cache) == 1
+
+    def no_decode(raw_byte):
+        raise AssertionError("decoded despite a cache hit")
+
+    monkeypatch.setattr(DspFile, "decode_dsp_buffer", staticmethod(no_decode))
+    assert asyncio.run(DspFile.aload(path)).get_python_code() == "print(1)\n"
+
+
+def test_aload_many_on_process_pool(decode_cache, make_dsp, tmp_path):
+    paths = [str(make_dsp(tmp_path / f"{i}.dsp", f"print({i})\n")) for i in range(4)]
+
+    with ProcessPoolExecutor(2) as executor:
+        aio.set_executors(codec_executor=executor)
+        try:
+            dsp_files = asyncio.run(aload_many(paths + [str(tmp_path / "missing.dsp")], 2, True))
+        finally:
+            aio.set_executors()
+
+    assert [f.get_python_code() for f in dsp_files[:4]] == [f"print({i})\n" for i in range(4)]
+    assert isinstance(dsp_files[4], FileNotFoundError)
+    assert len(decode_cache) == 4
@@ -0,0 +1,79 @@
+import os
+import zipfile
+
+import pytest
+
+from dspy_tool.dsp_codec import archive
+from dspy_tool.dsp_codec.file import DspFile
+
+
+@pytest.fixture
+def team_zip(make_dsp, tmp_path):
+    """A zip with a top-level DSP file, a nested one and a nested zip-named directory."""
+    path = tmp_path / "team.zip"
+    with zipfile.ZipFile(path, "w") as zip_file:
+        zip_file.write(make_dsp(tmp_path / "src" / "a.dsp", "print('a')\n", title="A"), "a.dsp")
+        zip_file.write(make_dsp(tmp_path / "src" / "b.dsp", "print('b')\n", title="B"), "round1/x/b.dsp")
+        zip_file.write(make_dsp(tmp_path / "src" / "c.dsp", "print('c')\n", title="C"), "old.zip/c.dsp")
+        zip_file.writestr("notes.txt", "not a DSP file")
+    return path
+
+
+def test_split_archive_path(team_zip):
+    assert archive.split_archive_path(team_zip / "a.dsp") == (str(team_zip), "a.dsp")
+    assert archive.split_archive_path(team_zip / "round1" / "x" / "b.dsp") == (str(team_zip), "round1/x/b.dsp")
+    # Only the first archive that is a real file splits the path.
+    assert archive.split_archive_path(team_zip / "old.zip" / "c.dsp") == (str(team_zip), "old.zip/c.dsp")
+
+
+def test_split_archive_path_outside_archives(team_zip, tmp_path):
+    assert archive.split_archive_path(tmp_path / "src" / "a.dsp") is None
+    assert archive.split_archive_path(team_zip) is None
+    # A directory named like an archive is not one.
+    (tmp_path / "dir.zip").mkdir()
+    assert archive.split_archive_path(tmp_path / "dir.zip" / "a.dsp") is None
+    assert archive.split_archive_path(tmp_path / "missing.zip" / "a.dsp") is None
+
+
+def test_host_path_and_stat(team_zip, tmp_path):
+    member = team_zip / "round1" / "x" / "b.dsp"
+    assert archive.host_path(member) == str(team_zip)
+    assert archive.host_path(tmp_path / "src" / "a.dsp") == str(tmp_path / "src" / "a.dsp")
+    stat = os.stat(team_zip)
+    assert archive.stat_path(member) == (stat.st_size, stat.st_mtime_ns)
+
+
+def test_list_members(team_zip):
+    assert archive.list_members(str(team_zip)) == ["a.dsp", "old.zip/c.dsp", "round1/x/b.dsp"]
+    assert archive.list_members(str(team_zip), ".txt") == ["notes.txt"]
+
+
+def test_open_binary_missing_member(team_zip):
+    with pytest.raises(FileNotFoundError, match="missing.dsp"):
+        archive.open_binary(team_zip / "round1" / "missing.dsp")
+    with pytest.raises(FileNotFoundError):
+        DspFile.load(str(team_zip / "missing.dsp"))
+
+
+def test_open_archive_reopens_changed_archive(team_zip, make_dsp, tmp_path):
+    zip_file = archive.open_archive(str(team_zip))
+    assert archive.open_archive(str(team_zip)) is zip_file
+    with zipfile.ZipFile(team_zip, "a") as appended:
+        appended.write(make_dsp(tmp_path / "src" / "d.dsp"), "d.dsp")
+    os.utime(team_zip, ns=(0, 0))
+    assert archive.open_archive(str(team_zip)) is not zip_file
+    assert "d.dsp" in archive.list_members(str(team_zip))
+
+
+@pytest.mark.parametrize(
+    "member, python_code, title",
+    [("a.dsp", "print('a')\n", "A"), ("round1/x/b.dsp", "print('b')\n", "B"), ("old.zip/c.dsp", "print('c')\n", "C")],
+)
+def test_load_from_zip(team_zip, member, python_code, title):
+    path = str(team_zip / member)
+    dsp_file = DspFile.load(path)
+
+    assert dsp_file.get_python_code() == python_code
+    assert dsp_file.dji.attribute.title == title
+    assert dsp_file.file_name == os.path.splitext(os.path.basename(member))[0]
+    assert DspFile.load_header(path).title == title
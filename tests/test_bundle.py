@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from dspy_tool.cli import dsp_codec
+from dspy_tool.dsp_codec.bundle import Bundle, BundleWriter
+from dspy_tool.dsp_codec.file import DspFile
+
+
+def test_bundle_round_trip(make_dsp, tmp_path):
+    data = {name: make_dsp(tmp_path / name, f"print({name!r})\n").read_bytes() for name in ("a.dsp", "b.dsp")}
+    path = str(tmp_path / "out.dspb")
+    with BundleWriter(path) as writer:
+        writer.add_data("a.dsp", data["a.dsp"], "A", "guid-a")
+        writer.add_data("sub/b.dsp", data["b.dsp"])
+        writer.add(DspFile.new_with_python_code("Anonymous", "C", "print('c')\n"), "c.dsp")
+        with pytest.raises(ValueError, match="Duplicate"):
+            writer.add_data("a.dsp", data["b.dsp"])
+
+    with Bundle(path) as bundle:
+        assert len(bundle) == 3
+        assert [entry.name for entry in bundle] == ["a.dsp", "sub/b.dsp", "c.dsp"]
+        assert "sub/b.dsp" in bundle and "b.dsp" not in bundle
+        assert bundle.entry("a.dsp")[1:3] == ("A", "guid-a")
+        assert bundle.read("a.dsp") == data["a.dsp"]
+        assert bundle.load("sub/b.dsp").get_python_code() == "print('b.dsp')\n"
+        assert bundle.load("c.dsp").dji.attribute.title == "C"
+        paths = list(bundle.extract(str(tmp_path / "out")))
+
+    assert paths == [str(tmp_path / "out" / name) for name in ("a.dsp", os.path.join("sub", "b.dsp"), "c.dsp")]
+    assert (tmp_path / "out" / "sub" / "b.dsp").read_bytes() == data["b.dsp"]
+    assert DspFile.load_from_bundle(path, "a.dsp").get_python_code() == "print('a.dsp')\n"
+
+
+def test_bundle_writer_discards_on_error(tmp_path):
+    path = tmp_path / "out.dspb"
+    with pytest.raises(RuntimeError):
+        with BundleWriter(str(path)) as writer:
+            writer.add_data("a.dsp", b"data")
+            raise RuntimeError
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bundle_cli_round_trip(make_dsp, tmp_path, capsys):
+    src = tmp_path / "src"
+    make_dsp(src / "sub" / "b.dsp", "print('b')\n")
+    (src / "a.py").write_text("print('a')\n", encoding="utf-8")
+    bundle_path = tmp_path / "out.dspb"
+
+    dsp_codec.main([str(src), "--bundle", str(bundle_path), "-j", "1"])
+    with Bundle(str(bundle_path)) as bundle:
+        assert sorted(entry.name for entry in bundle) == ["a.dsp", "sub/b.dsp"]
+        assert bundle.read("sub/b.dsp") == (src / "sub" / "b.dsp").read_bytes()
+
+    dsp_codec.main(["unbundle", str(bundle_path), "-o", str(tmp_path / "out")])
+    assert "Unbundled 2 files" in capsys.readouterr().out
+    assert DspFile.load(str(tmp_path / "out" / "a.dsp")).get_python_code() == "print('a')\n"
+    assert (tmp_path / "out" / "sub" / "b.dsp").read_bytes() == (src / "sub" / "b.dsp").read_bytes()
+
+
+@pytest.mark.parametrize("name", ["../evil.dsp", "sub/../../evil.dsp", "{tmp_path}/evil.dsp"])
+def test_extract_rejects_unsafe_names(tmp_path, name):
+    # The absolute name points next to the output, so nothing is written outside tmp_path.
+    name = name.format(tmp_path=tmp_path)
+    path = str(tmp_path / "out.dspb")
+    with BundleWriter(path) as writer:
+        writer.add_data(name, b"data")
+
+    with Bundle(path) as bundle, pytest.raises(ValueError, match="Unsafe name"):
+        list(bundle.extract(str(tmp_path / "out" / "dir")))
+    assert not (tmp_path / "evil.dsp").exists()
+    assert not (tmp_path / "out" / "evil.dsp").exists()
+
+
+def test_unbundle_cli_rejects_unsafe_names(tmp_path, capsys):
+    path = str(tmp_path / "out.dspb")
+    with BundleWriter(path) as writer:
+        writer.add_data("a.dsp", b"data")
+        writer.add_data("../evil.dsp", b"data")
+
+    with pytest.raises(SystemExit) as exc_info:
+        dsp_codec.main(["unbundle", path, "-o", str(tmp_path / "out")])
+    assert exc_info.value.code == 1
+    assert "[FAIL] Unsafe name in bundle: ../evil.dsp" in capsys.readouterr().out
+    assert not (tmp_path / "evil.dsp").exists()
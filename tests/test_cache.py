@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from dspy_tool.dsp_codec import cache as cache_module
+from dspy_tool.dsp_codec.cache import DecodeCache, get_cache, hash_key, reset_thread_cache, set_cache
+from dspy_tool.dsp_codec.file import DspFile
+
+
+@pytest.fixture
+def decode_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "_cache", None)
+    decode_cache = DecodeCache(tmp_path / "cache")
+    set_cache(decode_cache)
+    yield decode_cache
+    reset_thread_cache()
+
+
+def test_hit(decode_cache, make_dsp, tmp_path, monkeypatch):
+    path = make_dsp(tmp_path / "a.dsp", "print(1)\n")
+    assert DspFile.load(str(path)).get_python_code() == "print(1)\n"
+    assert len(decode_cache) == 1
+
+    def no_decode(raw_byte):
+        raise AssertionError("decoded despite a cache hit")
+
+    monkeypatch.setattr(DspFile, "decode_dsp_buffer", staticmethod(no_decode))
+    assert DspFile.load(str(path)).get_python_code() == "print(1)\n"
+
+
+def test_miss_after_change(decode_cache, make_dsp, tmp_path):
+    path = make_dsp(tmp_path / "a.dsp", "print(1)\n")
+    first_key = hash_key(path.read_bytes())
+    DspFile.load(str(path))
+    make_dsp(path, "print(2)\n")
+
+    assert decode_cache.get(hash_key(path.read_bytes())) is None
+    assert DspFile.load(str(path)).get_python_code() == "print(2)\n"
+    assert len(decode_cache) == 2
+    assert decode_cache.get(first_key) is not None
+
+
+def test_corrupt_entry_is_a_miss(decode_cache):
+    decode_cache.put("key", b"<dji/>", None)
+    decode_cache._path("key").write_bytes(b"junk")
+
+    assert decode_cache.get("key") is None
+
+
+def test_thread_setting_and_reset(decode_cache, tmp_path):
+    other = DecodeCache(tmp_path / "other")
+    seen = {}
+
+    def worker():
+        set_cache(None, thread=True)
+        seen["off"] = get_cache()
+        set_cache(other, thread=True)
+        seen["other"] = get_cache()
+        reset_thread_cache()
+        seen["reset"] = get_cache()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen == {"off": None, "other": other, "reset": decode_cache}
+    # Other threads keep the process-wide cache.
+    assert get_cache() is decode_cache
@@ -0,0 +1,11 @@
+from dspy_tool.dsp_codec.chinese import encode_chinese
+
+
+def test_encode_chinese_escapes_identifiers_only():
+    code = '速度 = "速度"  # 速度\n'
+    assert encode_chinese(code) == '_E9_80_9F_E5_BA_A6 = "速度"  # 速度\n'
+
+
+def test_encode_chinese_keeps_rows_after_form_feed():
+    assert encode_chinese("a = 1\x0c\n速度 = 2\n") == "a = 1\x0c\n_E9_80_9F_E5_BA_A6 = 2\n"
+    assert encode_chinese("a = '\u2028'\n速度 = 2\n") == "a = '\u2028'\n_E9_80_9F_E5_BA_A6 = 2\n"
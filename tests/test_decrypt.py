@@ -0,0 +1,76 @@
+import mmap
+import os
+
+import pytest
+
+from dspy_tool.dsp_codec import cipher, file
+from dspy_tool.dsp_codec.file import DSP_IV, DSP_KEY, DspFile, decrypt_cbc
+
+CHUNK_SIZE = 64
+# Not a multiple of the chunk size: the last chunk is partial.
+SIZE = CHUNK_SIZE * 9 + 16 * 3
+
+
+def installed_backends():
+    for name, backend in cipher.BACKENDS.items():
+        try:
+            backend.load()
+        except ImportError:
+            continue
+        yield name
+
+
+@pytest.fixture(params=list(installed_backends()))
+def backend(request, monkeypatch):
+    monkeypatch.setattr(cipher, "_backend", None)
+    cipher.set_backend(request.param)
+    return request.param
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(file, "PARALLEL_DECRYPT_CHUNK_SIZE", CHUNK_SIZE)
+    monkeypatch.setattr(file, "PARALLEL_DECRYPT_THRESHOLD", 0)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+
+
+@pytest.fixture
+def ciphertext():
+    return cipher.new_cipher(DSP_KEY, DSP_IV).encrypt(os.urandom(SIZE))
+
+
+def serial(data: bytes) -> bytes:
+    return cipher.new_cipher(DSP_KEY, DSP_IV).decrypt(data)
+
+
+@pytest.mark.parametrize("jobs", [2, 4, 16])
+def test_parallel_matches_serial(backend, small_chunks, ciphertext, jobs):
+    assert decrypt_cbc(ciphertext, jobs=jobs) == serial(ciphertext)
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_in_place_matches_serial(backend, small_chunks, ciphertext, jobs):
+    buffer = bytearray(ciphertext)
+
+    assert decrypt_cbc(buffer, buffer, jobs=jobs) is None
+    assert buffer == serial(ciphertext)
+
+
+def test_mmap_matches_serial(backend, small_chunks, ciphertext, tmp_path):
+    path = tmp_path / "cipher.bin"
+    path.write_bytes(ciphertext)
+    output = bytearray(len(ciphertext))
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        decrypt_cbc(data, output, jobs=4)
+
+    assert output == serial(ciphertext)
+
+
+def test_load_in_chunks_matches_serial(backend, small_chunks, make_dsp, tmp_path, monkeypatch):
+    python_code = "".join(f"print({i})\n" for i in range(200))
+    path = make_dsp(tmp_path / "a.dsp", python_code)
+    parallel = DspFile.load(str(path))
+    monkeypatch.setattr(file, "PARALLEL_DECRYPT_THRESHOLD", 1 << 60)
+
+    assert DspFile.load(str(path)).get_python_code() == parallel.get_python_code() == python_code
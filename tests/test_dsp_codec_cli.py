@@ -0,0 +1,103 @@
+"""End-to-end tests running ``dsp-codec`` in a subprocess."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def run_dsp_codec(cwd: Path, *args: str, stdin: bytes = b"") -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    return subprocess.run(
+        [sys.executable, "-m", "dspy_tool.cli.dsp_codec", *args, "--no-cache"],
+        cwd=cwd,
+        env=env,
+        input=stdin,
+        capture_output=True,
+        timeout=60,
+    )
+
+
+@pytest.fixture
+def inputs(make_dsp, tmp_path):
+    """``in/a.dsp`` and ``in/sub/b.dsp``."""
+    make_dsp(tmp_path / "in" / "a.dsp", "print('a')\n")
+    make_dsp(tmp_path / "in" / "sub" / "b.dsp", "print('b')\n")
+    return tmp_path / "in"
+
+
+def decoded(output: Path):
+    """Return ``{relative path without the timestamp: code}`` of the decoded files below ``output``."""
+    return {
+        path.relative_to(output).parent.joinpath(path.stem.rsplit("_", 1)[0]).as_posix(): path.read_text(
+            encoding="utf-8"
+        )
+        for path in output.rglob("*.py")
+    }
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_decode_to_directory(inputs, tmp_path, jobs):
+    result = run_dsp_codec(tmp_path, "in", "-o", "out", "-j", jobs)
+
+    assert result.returncode == 0, result.stderr
+    assert "Processed 2 files: 2 succeeded, 0 failed." in result.stdout.decode()
+    assert decoded(tmp_path / "out") == {"a": "print('a')\n", "sub/b": "print('b')\n"}
+
+
+def test_batch_decode_reports_failed_files(inputs, tmp_path):
+    (inputs / "sub" / "bad.dsp").write_bytes(b"not a dsp file")
+
+    result = run_dsp_codec(tmp_path, "in", "-o", "out", "-j", "2")
+
+    assert result.returncode == 1
+    stdout = result.stdout.decode()
+    assert "[FAIL] in/sub/bad.dsp" in stdout.replace(os.sep, "/")
+    assert "Processed 3 files: 2 succeeded, 1 failed." in stdout
+    assert decoded(tmp_path / "out") == {"a": "print('a')\n", "sub/b": "print('b')\n"}
+
+
+def stream_results(result: subprocess.CompletedProcess):
+    return [json.loads(line) for line in result.stdout.decode().splitlines()]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_stream_decode_to_stdout(inputs, tmp_path, jobs):
+    (inputs / "bad.dsp").write_bytes(b"not a dsp file")
+    stdin = b"in/a.dsp\nin/bad.dsp\r\n\nin/missing.dsp\nin/sub/b.dsp\n"
+
+    result = run_dsp_codec(tmp_path, "--stdin", "-j", jobs, stdin=stdin)
+
+    # A malformed record is reported in place and does not stop the stream.
+    assert result.returncode == 1
+    results = stream_results(result)
+    assert [item["index"] for item in results] == [0, 1, 2, 3]
+    assert [item["input"] for item in results] == ["in/a.dsp", "in/bad.dsp", "in/missing.dsp", "in/sub/b.dsp"]
+    assert [item.get("python_code") for item in results] == ["print('a')\n", None, None, "print('b')\n"]
+    assert "error" in results[1] and results[2]["error"].startswith("FileNotFoundError")
+    assert results[3]["file_name"] == "b" and results[3]["attribute"]["title"] == "Untitled"
+
+
+def test_stream_decode_payloads(inputs, tmp_path):
+    payloads = [(inputs / "a.dsp").read_bytes(), b"not a dsp file", (inputs / "sub" / "b.dsp").read_bytes()]
+
+    result = run_dsp_codec(tmp_path, "--stdin", "--payload", "-0", "-j", "2", stdin=b"\0".join(payloads))
+
+    assert result.returncode == 1
+    results = stream_results(result)
+    assert [item["input"] for item in results] == [None, None, None]
+    assert [item.get("python_code") for item in results] == ["print('a')\n", None, "print('b')\n"]
+    assert "error" in results[1]
+
+
+def test_stream_decode_without_errors(inputs, tmp_path):
+    result = run_dsp_codec(tmp_path, "--stdin", "--unordered", stdin=b"in/a.dsp\nin/sub/b.dsp\n")
+
+    assert result.returncode == 0, result.stderr
+    results = sorted(stream_results(result), key=lambda item: item["index"])
+    assert [item["python_code"] for item in results] == ["print('a')\n", "print('b')\n"]
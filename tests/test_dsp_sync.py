@@ -0,0 +1,35 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from dspy_tool.cli import dsp_sync
+
+OPTIONS = {"title": None, "creator": "Anonymous", "dc": False, "pc": False}
+
+
+def test_relative_src_skips_dst_inside_it(tmp_path, monkeypatch):
+    (tmp_path / "main.py").write_text("print(1)\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    src, dst = Path("."), Path("out")
+
+    for _ in range(2):
+        updated, unchanged, deleted, failed = dsp_sync.sync(src, dst, 1, OPTIONS)
+        assert failed == []
+
+    assert sorted(os.listdir("out")) == [dsp_sync.MANIFEST_NAME, "main.dsp"]
+    assert [relative for relative, _ in dsp_sync.iter_sources(src, dst)] == ["main.py"]
+
+
+@pytest.mark.parametrize("dst", [".", "./", "sub/.."])
+def test_src_equal_to_dst_is_rejected(tmp_path, monkeypatch, capsys, dst):
+    (tmp_path / "main.py").write_text("print(1)\n", encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as e:
+        dsp_sync.main([".", dst])
+
+    assert e.value.code == 2
+    assert "must differ from the source" in capsys.readouterr().err
+    assert sorted(os.listdir(".")) == ["main.py", "sub"]
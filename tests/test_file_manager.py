@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+
+from dspy_tool.cli import file_manager
+from dspy_tool.cli.utils.index import DspIndex
+
+
+def test_list_files_sees_changes_without_update(tmp_path, monkeypatch, capsys, make_dsp):
+    root = tmp_path / "dsp"
+    make_dsp(root / "a.dsp")
+    cfg = SimpleNamespace(dsp_dirs=[root.as_posix()], exclude_patterns=[], max_depth=-1)
+    monkeypatch.setattr(file_manager, "DspIndex", lambda: DspIndex(tmp_path / "index.sqlite3"))
+
+    def listed():
+        file_manager.list_files(cfg)
+        return sorted(capsys.readouterr().out.split())
+
+    assert listed() == [(root / "a.dsp").as_posix()]
+    make_dsp(root / "sub" / "b.dsp")
+    (root / "a.dsp").rename(root / "c.dsp")
+    assert listed() == [(root / "c.dsp").as_posix(), (root / "sub" / "b.dsp").as_posix()]
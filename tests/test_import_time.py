@@ -0,0 +1,25 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+spec = importlib.util.spec_from_file_location("import_time", ROOT / "benchmarks" / "import_time.py")
+import_time = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_time)
+
+# Multiplies every budget, e.g. for slow CI machines.
+SCALE = float(os.environ.get("DSPY_TOOL_IMPORT_BUDGET_SCALE", "1"))
+
+
+@pytest.mark.parametrize(
+    "command, budget, forbidden",
+    [check[1:] for check in import_time.CHECKS],
+    ids=[check[0] for check in import_time.CHECKS],
+)
+def test_import_budget(command, budget, forbidden, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(ROOT / "src"), os.environ.get("PYTHONPATH", "")]))
+    total, bad = import_time.check(command, forbidden)
+    assert bad == []
+    assert total <= budget * SCALE
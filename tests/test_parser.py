@@ -0,0 +1,52 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from dspy_tool.dsp_codec.file import DspFile
+from dspy_tool.dsp_codec.internal.dji import Dji
+from dspy_tool.dsp_codec.internal.parser import UnsupportedXml, parse_dji
+
+
+@pytest.fixture
+def xml():
+    return DspFile.new_with_python_code("Anonymous", "TITLE", "print(1)\n").dji.get_xml_string()
+
+
+def with_title(xml: str, title: str) -> bytes:
+    return xml.replace("<title>TITLE</title>", f"<title>{title}</title>").encode()
+
+
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("&amp;&lt;&gt;&quot;&apos;", "&<>\"'"),
+        ("&#65;&#x4e2d;&#x1F600;", "A中\U0001F600"),
+        ("a\r\nb", "a\nb"),
+    ],
+)
+def test_fast_path_decodes_like_element_tree(xml, title, expected):
+    data = with_title(xml, title)
+    attribute, code = parse_dji(data)
+
+    assert attribute.title == expected
+    assert ET.fromstring(data).find("attribute/title").text == expected
+    assert code.python_code == "print(1)\n"
+
+
+@pytest.mark.parametrize("reference", ["&#x110000;", "&#99999999999999999999999;", "&#xD800;", "&#0;"])
+def test_invalid_character_reference_falls_back(xml, reference):
+    data = with_title(xml, reference)
+
+    with pytest.raises(UnsupportedXml):
+        parse_dji(data)
+    # ElementTree rejects it too, with its own error.
+    with pytest.raises(ET.ParseError):
+        Dji.from_xml_bytes(data)
+
+
+def test_unsupported_layout_falls_back(xml):
+    data = with_title(xml, "a<!-- comment -->b")
+
+    with pytest.raises(UnsupportedXml):
+        parse_dji(data)
+    assert Dji.from_xml_bytes(data).attribute.title == "ab"
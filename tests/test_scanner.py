@@ -0,0 +1,121 @@
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from dspy_tool.cli.utils import scanner
+from dspy_tool.cli.utils.scanner import DspScanner, dedupe_roots
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """``root/a.dsp``, ``root/sub/b.dsp``, ``root/sub/deep/c.dsp`` and a file that is not a DSP file."""
+    root = tmp_path / "root"
+    for name in ("a.dsp", "sub/b.dsp", "sub/deep/c.dsp", "sub/notes.txt"):
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_bytes(b"")
+    return root
+
+
+def names(paths, root):
+    return sorted(Path(path).relative_to(root).as_posix() for path in paths)
+
+
+@pytest.fixture
+def count_listings(monkeypatch):
+    """Count the directories listed with ``os.scandir`` and the archives listed."""
+    listed = []
+    scandir, list_members = os.scandir, scanner.list_members
+
+    def counting_scandir(path):
+        listed.append(path)
+        return scandir(path)
+
+    def counting_list_members(path):
+        listed.append(path)
+        return list_members(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", counting_scandir)
+    monkeypatch.setattr(scanner, "list_members", counting_list_members)
+    return listed
+
+
+def test_dedupe_roots(tree, tmp_path):
+    (tmp_path / "link").symlink_to(tree / "sub", target_is_directory=True)
+    roots = [tree / "sub", tree, tree / "sub" / ".." / "sub", tmp_path / "link", tmp_path / "other"]
+
+    assert sorted(dedupe_roots(roots)) == [tmp_path / "other", tree]
+    # A root only sharing a name prefix is not nested.
+    assert sorted(dedupe_roots([tree, tmp_path / "root2"])) == [tree, tmp_path / "root2"]
+
+
+def test_scan_yields_each_file_once(tree, tmp_path):
+    (tmp_path / "link").symlink_to(tree, target_is_directory=True)
+
+    found = list(DspScanner().scan([tree / "sub", tmp_path / "link", tree]))
+
+    assert names(found, tree) == ["a.dsp", "sub/b.dsp", "sub/deep/c.dsp"]
+
+
+def test_scan_does_not_follow_directory_symlinks(tree, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "x.dsp").write_bytes(b"")
+    (tree / "sub" / "outside").symlink_to(outside, target_is_directory=True)
+    # A loop would never end if links were followed.
+    (tree / "sub" / "loop").symlink_to(tree, target_is_directory=True)
+    (tree / "linked.dsp").symlink_to(outside / "x.dsp")
+
+    found = list(DspScanner().scan([tree]))
+
+    assert names(found, tree) == ["a.dsp", "linked.dsp", "sub/b.dsp", "sub/deep/c.dsp"]
+
+
+def test_scan_exclude_and_max_depth(tree):
+    assert names(DspScanner(["deep"]).scan([tree]), tree) == ["a.dsp", "sub/b.dsp"]
+    assert names(DspScanner(["*/sub/b.dsp"]).scan([tree]), tree) == ["a.dsp", "sub/deep/c.dsp"]
+    assert names(DspScanner(max_depth=1).scan([tree]), tree) == ["a.dsp", "sub/b.dsp"]
+
+
+def test_scan_reuses_state_of_unchanged_dirs(tree, count_listings):
+    first = DspScanner()
+    assert len(list(first.scan([tree]))) == 3
+    assert len(count_listings) == 3
+
+    count_listings.clear()
+    second = DspScanner(state=first.new_state)
+    assert names(second.scan([tree]), tree) == ["a.dsp", "sub/b.dsp", "sub/deep/c.dsp"]
+    assert count_listings == []
+    assert second.new_state == first.new_state
+
+
+def test_scan_relists_changed_dirs(tree, count_listings):
+    first = DspScanner()
+    list(first.scan([tree]))
+    count_listings.clear()
+
+    (tree / "sub" / "new.dsp").write_bytes(b"")
+    # Make sure the mtime differs even on file systems with a coarse clock.
+    mtime_ns = first.new_state[str(tree / "sub")][0] + 10**9
+    os.utime(tree / "sub", ns=(mtime_ns, mtime_ns))
+    second = DspScanner(state=first.new_state)
+
+    assert names(second.scan([tree]), tree) == ["a.dsp", "sub/b.dsp", "sub/deep/c.dsp", "sub/new.dsp"]
+    assert count_listings == [str(tree / "sub")]
+    assert second.new_state[str(tree / "sub")][0] == mtime_ns
+
+
+def test_scan_archives(tree, count_listings):
+    with zipfile.ZipFile(tree / "team.zip", "w") as zip_file:
+        zip_file.writestr("round1/x.dsp", b"")
+        zip_file.writestr("skip/y.dsp", b"")
+        zip_file.writestr("notes.txt", b"")
+
+    first = DspScanner(["skip"])
+    assert names(first.scan([tree]), tree) == ["a.dsp", "sub/b.dsp", "sub/deep/c.dsp", "team.zip/round1/x.dsp"]
+    assert str(tree / "team.zip") in count_listings
+
+    count_listings.clear()
+    assert len(list(DspScanner(["skip"], state=first.new_state).scan([tree]))) == 4
+    assert count_listings == []
@@ -0,0 +1,65 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from dspy_tool.dsp_codec.file import DspFile
+from dspy_tool.dsp_codec.internal.dji import Dji
+from dspy_tool.dsp_codec.internal.serializer import CDATA_END_SPLIT, escape_cdata
+
+CDATA_HEAD = "![CDATA["
+
+
+@pytest.fixture
+def element_tree_cdata(monkeypatch):
+    """The ElementTree CDATA patch the serializer replaced, scoped to one test."""
+    original = ET._serialize_xml
+
+    def serialize_xml(write, elem, qnames, namespaces, short_empty_elements, **kwargs):
+        if elem.tag == CDATA_HEAD:
+            write(f"<{CDATA_HEAD}{elem.text}]]>")
+            return
+        return original(write, elem, qnames, namespaces, short_empty_elements, **kwargs)
+
+    monkeypatch.setattr(ET, "_serialize_xml", serialize_xml)
+    monkeypatch.setitem(ET._serialize, "xml", serialize_xml)
+
+
+def element_tree_xml(dji: Dji) -> str:
+    """Serialize ``dji`` the way the ElementTree path did."""
+    root = ET.Element("dji")
+    root.append(dji.attribute.get_xml_element())
+    code = ET.SubElement(root, "code")
+    for tag, text in (("python_code", dji.code.python_code), ("scratch_description", dji.code.scratch_description)):
+        cdata = ET.Element(CDATA_HEAD)
+        cdata.text = text
+        ET.SubElement(code, tag).append(cdata)
+    return ET.tostring(root, encoding="unicode", short_empty_elements=False)
+
+
+@pytest.mark.parametrize(
+    "title, creator, python_code",
+    [
+        ("Untitled", "Anonymous", "print(1)\n"),
+        ("a & b <c> d", "<me> & \"you\" 'x'", "if a < b and c > d & e:\n    pass\n"),
+        ("Untitled", "Anonymous", ""),
+        ("标题", "作者", "速度 = 1\n"),
+    ],
+)
+def test_serializer_matches_element_tree(element_tree_cdata, title, creator, python_code):
+    dji = DspFile.new_with_python_code(creator, title, python_code).dji
+
+    assert dji.get_xml_string().encode() == element_tree_xml(dji).encode()
+
+
+def test_cdata_end_is_split():
+    assert escape_cdata("a]]>b") == "<![CDATA[a" + CDATA_END_SPLIT + "b]]>"
+    assert escape_cdata("") == "<![CDATA[]]>"
+
+
+@pytest.mark.parametrize("python_code", ["x = a[b[0]]>1\n", "]]>", "]]>]]>", "a]]]>b"])
+def test_cdata_end_round_trip(python_code):
+    dji = DspFile.new_with_python_code("Anonymous", "Untitled", python_code).dji
+    xml = dji.get_xml_string()
+
+    assert ET.fromstring(xml).find("code/python_code").text == python_code
+    assert Dji.from_xml_string(xml).code.python_code == python_code
@@ -0,0 +1,84 @@
+import hashlib
+from datetime import datetime
+
+import pytest
+
+from dspy_tool.dsp_codec.file import DSP_MKEY, DspFile
+from dspy_tool.dsp_codec.internal.code import Code
+from dspy_tool.dsp_codec.internal.code_type import CodeType
+from dspy_tool.dsp_codec.internal.fvd import FirmwareVersionDependency
+
+
+def uncached_signature(dsp_file: DspFile) -> str:
+    """The signature computed from scratch, as before it was cached."""
+    attribute, code = dsp_file.dji.attribute, dsp_file.dji.code
+    source = (
+        DSP_MKEY
+        + attribute.creation_date.strftime("%Y/%m/%d")
+        + attribute.title
+        + attribute.creator
+        + attribute.firmware_version_dependency.value
+        + attribute.guid
+        + code.python_code
+        + code.scratch_description
+        + attribute.code_type.name.lower()
+    )
+    return hashlib.md5(source.encode()).hexdigest()[7:23]
+
+
+def set_value(obj, name, value):
+    setattr(obj, name, value)
+
+
+CHANGES = {
+    "creation_date": lambda d: set_value(d.dji.attribute, "creation_date", datetime(2001, 2, 3)),
+    "title": lambda d: set_value(d.dji.attribute, "title", "Other"),
+    "creator": lambda d: set_value(d.dji.attribute, "creator", "Someone"),
+    "guid": lambda d: set_value(d.dji.attribute, "guid", DspFile.compute_guid()),
+    "code_type": lambda d: set_value(d.dji.attribute, "code_type", CodeType.SCRATCH_CODE),
+    "firmware_version": lambda d: set_value(
+        d.dji.attribute, "firmware_version_dependency", FirmwareVersionDependency(1, 2, 3)
+    ),
+    "firmware_version_in_place": lambda d: set_value(
+        d.dji.attribute.firmware_version_dependency, "value", "09.09.0009"
+    ),
+    "python_code": lambda d: d.set_python_code("print(2)\n"),
+    "scratch_description": lambda d: set_value(d.dji.code, "scratch_description", "x"),
+    "code_object": lambda d: set_value(d.dji, "code", Code("print(3)\n")),
+    "attribute_object": lambda d: set_value(
+        d.dji, "attribute", DspFile.new_with_python_code("Other", "Other").dji.attribute
+    ),
+}
+
+
+@pytest.fixture(params=["new", "loaded"])
+def dsp_file(request, make_dsp, tmp_path):
+    if request.param == "new":
+        return DspFile.new_with_python_code("Anonymous", "Untitled", "print(1)\n")
+    return DspFile.load(str(make_dsp(tmp_path / "a.dsp", "print(1)\n")))
+
+
+@pytest.mark.parametrize("change", CHANGES.values(), ids=CHANGES.keys())
+def test_signature_follows_signed_fields(dsp_file, change):
+    before = dsp_file.calc_signature()
+    assert before == uncached_signature(dsp_file)
+
+    change(dsp_file)
+
+    assert dsp_file.calc_signature() == uncached_signature(dsp_file) != before
+
+
+def test_unsigned_field_keeps_signature(dsp_file):
+    before = dsp_file.calc_signature()
+    dsp_file.dji.attribute.modify_time = datetime(2001, 2, 3)
+
+    assert dsp_file.calc_signature() == before == uncached_signature(dsp_file)
+
+
+def test_saved_signature_is_current(dsp_file, tmp_path):
+    dsp_file.calc_signature()
+    dsp_file.set_python_code("print(2)\n")
+    dsp_file.save(str(tmp_path), "b.dsp")
+
+    saved = DspFile.load(str(tmp_path / "b.dsp"))
+    assert saved.dji.attribute.sign == uncached_signature(saved)